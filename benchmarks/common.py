@@ -0,0 +1,103 @@
+import asyncio
+import platform
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+class LatencyProbe:
+    # Tags the first sample of each buffer with a sequence number (from 1, so
+    # untagged buffers read as 0), which float32 represents exactly, and
+    # matches it on the receiving side. `expected` counts frames. The
+    # window bounds buffers in flight so latency is measured under load
+    # without unbounded queueing.
+    def __init__(self, sent: Dict[int, float], expected: int, window: int = 8):
+        self.sent = sent
+        self.expected = expected
+        self.window = asyncio.Semaphore(window)
+        self.latencies: List[float] = []
+        self.received = 0
+        self.received_frames = 0
+        self.stalls = 0
+        self.last_received: Optional[float] = None
+        self.done = asyncio.Event()
+
+    async def acquire(self, timeout: float = 1.0):
+        try:
+            await asyncio.wait_for(self.window.acquire(), timeout)
+        except asyncio.TimeoutError:
+            self.stalls += 1
+
+    def receive(self, audio: np.ndarray):
+        now = time.perf_counter()
+        audio = np.asarray(audio)
+        seq = int(audio.reshape(len(audio), -1)[0, 0])
+        sent = self.sent.get(seq)
+        if sent is not None:
+            self.latencies.append(now - sent)
+            self.window.release()
+        self.last_received = now
+        self.received += 1
+        self.received_frames += len(audio)
+        if self.received_frames >= self.expected:
+            self.done.set()
+
+    @property
+    def lost_frames(self) -> int:
+        return max(0, self.expected - self.received_frames)
+
+    def elapsed(self, started: float) -> float:
+        # Measured up to the last arrival so waiting out lost buffers does not
+        # count against throughput.
+        return (self.last_received or time.perf_counter()) - started
+
+
+def tag(buffer: np.ndarray, seq: int, sent: Dict[int, float]) -> np.ndarray:
+    buffer[0, 0] = seq
+    sent[seq] = time.perf_counter()
+    return buffer
+
+
+def audio_buffer(frames: int, channels: int = 1) -> np.ndarray:
+    return np.full((frames, channels), 0.25, dtype=np.float32)
+
+
+def result(
+    transport: str,
+    clients: int,
+    frames_per_buffer: int,
+    buffers: int,
+    frames: int,
+    elapsed: float,
+    bytes_per_frame: int = 4,
+    latencies: Optional[List[float]] = None,
+    **extra: Any,
+) -> Dict[str, Any]:
+    latencies_ms = np.array(latencies or [], dtype=np.float64) * 1000
+    return dict(
+        transport=transport,
+        clients=clients,
+        frames_per_buffer=frames_per_buffer,
+        buffers=buffers,
+        frames=frames,
+        elapsed=elapsed,
+        frames_per_second=frames / elapsed if elapsed else 0.0,
+        mb_per_second=frames * bytes_per_frame / elapsed / 1e6 if elapsed else 0.0,
+        latency_p50_ms=(
+            float(np.percentile(latencies_ms, 50)) if len(latencies_ms) else None
+        ),
+        latency_p99_ms=(
+            float(np.percentile(latencies_ms, 99)) if len(latencies_ms) else None
+        ),
+        **extra,
+    )
+
+
+def environment() -> Dict[str, Any]:
+    return dict(
+        python=platform.python_version(),
+        numpy=np.__version__,
+        platform=platform.platform(),
+        machine=platform.machine(),
+    )
@@ -0,0 +1,59 @@
+import argparse
+import json
+import sys
+from typing import Any, Dict, Tuple
+
+Key = Tuple[str, int, int]
+
+
+def _load(path: str) -> Dict[Key, Dict[str, Any]]:
+    with open(path) as f:
+        report = json.load(f)
+    return {
+        (result["transport"], result["clients"], result["frames_per_buffer"]): result
+        for result in report["results"]
+    }
+
+
+def _change(baseline, current) -> float:
+    if not baseline or current is None:
+        return 0.0
+    return (current - baseline) / baseline
+
+
+def compare(baseline_path: str, current_path: str, threshold: float) -> int:
+    # Returns the number of regressions: throughput dropping or p99 latency
+    # rising by more than `threshold` relative to the baseline.
+    baseline = _load(baseline_path)
+    current = _load(current_path)
+    regressions = 0
+    for key in sorted(baseline.keys() & current.keys()):
+        before, after = baseline[key], current[key]
+        throughput = _change(before["frames_per_second"], after["frames_per_second"])
+        latency = _change(before["latency_p99_ms"], after["latency_p99_ms"])
+        regressed = throughput < -threshold or latency > threshold
+        regressions += regressed
+        transport, clients, frames = key
+        print(
+            f"{'REGRESSION' if regressed else 'ok':10} {transport:28}"
+            f" clients={clients:<3} frames={frames:<6}"
+            f" throughput={throughput:+7.1%} p99={latency:+7.1%}"
+        )
+    for key in sorted(baseline.keys() - current.keys()):
+        print(f"{'missing':10} {key[0]:28} clients={key[1]:<3} frames={key[2]:<6}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare two benchmark JSON reports for regressions"
+    )
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args()
+    sys.exit(1 if compare(args.baseline, args.current, args.threshold) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+import argparse
+import asyncio
+import itertools
+import json
+import shutil
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+from aioaudio.ffmpeg import FFmpegAudioSink, FFmpegWorker
+from aioaudio.rtp_native import NativeRTPAudioSink, NativeRTPAudioSource
+from aioaudio.void import VoidAudioSink
+from aioaudio.websocket import (
+    WebsocketClientAudioSink,
+    WebsocketClientAudioSource,
+    WebsocketServerAudioSink,
+    WebsocketServerAudioSource,
+)
+
+from common import LatencyProbe, audio_buffer, environment, result, tag
+
+SAMPLING_RATE = 48000
+STUB_FFMPEG = "import sys\nwhile sys.stdin.buffer.read(65536):\n    pass\n"
+
+ports = itertools.count(19000)
+
+
+async def _consume(source, probe: LatencyProbe):
+    async for audio in source:
+        probe.receive(audio)
+
+
+async def _finish(probes: List[LatencyProbe], timeout: float):
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(*(probe.done.wait() for probe in probes)), timeout
+        )
+    except asyncio.TimeoutError:
+        pass
+
+
+async def void_baseline(frames: int, buffers: int, clients: int = 1):
+    # One sink per client, the floor for the broadcast benchmarks.
+    sinks = [VoidAudioSink() for _ in range(clients)]
+    buffer = audio_buffer(frames)
+    started = time.perf_counter()
+    latencies = []
+    for _ in range(buffers):
+        write_started = time.perf_counter()
+        for sink in sinks:
+            await sink.write(buffer)
+        latencies.append(time.perf_counter() - write_started)
+    elapsed = time.perf_counter() - started
+    return result(
+        "void",
+        clients,
+        frames,
+        buffers,
+        frames * buffers * clients,
+        elapsed,
+        4,
+        latencies,
+    )
+
+
+async def websocket_client_to_server(frames: int, buffers: int, clients: int = 1):
+    port = next(ports)
+    sent: Dict[int, float] = {}
+    probe = LatencyProbe(sent, frames * buffers * clients, window=8 * clients)
+    async with WebsocketServerAudioSource(SAMPLING_RATE, port=port) as source:
+        consumer = asyncio.create_task(_consume(source, probe))
+        sinks = [
+            WebsocketClientAudioSink(SAMPLING_RATE, url=f"ws://localhost:{port}")
+            for _ in range(clients)
+        ]
+        for sink in sinks:
+            await sink.__aenter__()
+
+        seqs = itertools.count(1)
+
+        async def send(sink):
+            buffer = audio_buffer(frames)
+            for _ in range(buffers):
+                await probe.acquire()
+                await sink.write(tag(buffer, next(seqs), sent))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(send(sink) for sink in sinks))
+        await _finish([probe], 10)
+        elapsed = probe.elapsed(started)
+
+        for sink in sinks:
+            await sink.__aexit__(None, None, None)
+        consumer.cancel()
+
+    return result(
+        "websocket-client-to-server",
+        clients,
+        frames,
+        buffers * clients,
+        probe.received_frames,
+        elapsed,
+        4,
+        probe.latencies,
+        lost_frames=probe.lost_frames,
+        stalls=probe.stalls,
+    )
+
+
+async def websocket_server_broadcast(frames: int, buffers: int, clients: int = 1):
+    port = next(ports)
+    sent: Dict[int, float] = {}
+    probes = [LatencyProbe(sent, frames * buffers) for _ in range(clients)]
+    async with WebsocketServerAudioSink(
+        SAMPLING_RATE, port=port, client_queue_size=buffers
+    ) as sink:
+        sources = [
+            WebsocketClientAudioSource(SAMPLING_RATE, url=f"ws://localhost:{port}")
+            for _ in range(clients)
+        ]
+        for source in sources:
+            await source.__aenter__()
+        while len(sink.clients) < clients:
+            await asyncio.sleep(0.01)
+        consumers = [
+            asyncio.create_task(_consume(source, probe))
+            for source, probe in zip(sources, probes)
+        ]
+
+        buffer = audio_buffer(frames)
+        started = time.perf_counter()
+        for seq in range(1, buffers + 1):
+            for probe in probes:
+                await probe.acquire()
+            await sink.write(tag(buffer, seq, sent))
+        await _finish(probes, 10)
+        elapsed = max(probe.elapsed(started) for probe in probes)
+
+        for consumer in consumers:
+            consumer.cancel()
+        for source in sources:
+            await source.__aexit__(None, None, None)
+
+    return result(
+        "websocket-server-broadcast",
+        clients,
+        frames,
+        buffers,
+        sum(probe.received_frames for probe in probes),
+        elapsed,
+        4,
+        [latency for probe in probes for latency in probe.latencies],
+        lost_frames=sum(probe.lost_frames for probe in probes),
+        stalls=sum(probe.stalls for probe in probes),
+    )
+
+
+async def rtp_native(frames: int, buffers: int, clients: int = 1):
+    port = next(ports)
+    url = f"rtp://127.0.0.1:{port}"
+    sent: Dict[int, float] = {}
+    probe = LatencyProbe(sent, frames * buffers)
+    async with NativeRTPAudioSource(
+        SAMPLING_RATE, url=url, payload="F32", max_queue_size=4096
+    ) as source:
+        consumer = asyncio.create_task(_consume(source, probe))
+        async with NativeRTPAudioSink(SAMPLING_RATE, url=url, payload="F32") as sink:
+            buffer = audio_buffer(frames)
+            started = time.perf_counter()
+            for seq in range(1, buffers + 1):
+                await probe.acquire()
+                await sink.write(tag(buffer, seq, sent))
+                # Datagrams are sent without backpressure, yield so the
+                # receiver can drain the socket.
+                await asyncio.sleep(0)
+            await _finish([probe], 2)
+            elapsed = probe.elapsed(started)
+        consumer.cancel()
+        dropped = source.protocol.dropped
+
+    return result(
+        "rtp-native",
+        1,
+        frames,
+        buffers,
+        probe.received_frames,
+        elapsed,
+        4,
+        probe.latencies,
+        lost_frames=probe.lost_frames,
+        stalls=probe.stalls,
+        dropped=dropped,
+    )
+
+
+async def ffmpeg_sink(frames: int, buffers: int, clients: int = 1):
+    executable = shutil.which("ffmpeg")
+    if executable is not None:
+        args = ["-loglevel", "error", "-f", "f32le", "-ar", str(SAMPLING_RATE)]
+        args += ["-ac", "1", "-i", "-", "-f", "null", "-"]
+    else:
+        executable, args = sys.executable, ["-c", STUB_FFMPEG]
+
+    sink = FFmpegAudioSink(FFmpegWorker(*args, executable=executable))
+    buffer = audio_buffer(frames)
+    latencies = []
+    async with sink:
+        started = time.perf_counter()
+        for _ in range(buffers):
+            write_started = time.perf_counter()
+            await sink.write(buffer)
+            latencies.append(time.perf_counter() - write_started)
+            while sink.worker.queue_depth > 8:
+                await asyncio.sleep(0)
+    # Closing waits for the process to consume everything that was queued.
+    elapsed = time.perf_counter() - started
+
+    return result(
+        "ffmpeg-sink" if executable != sys.executable else "ffmpeg-sink-stub",
+        1,
+        frames,
+        buffers,
+        frames * buffers,
+        elapsed,
+        4,
+        latencies,
+        restarts=sink.worker.restarts,
+        dropped=sink.worker.dropped,
+    )
+
+
+BENCHMARKS: Dict[str, Callable[..., Any]] = {
+    "void": void_baseline,
+    "websocket-client-to-server": websocket_client_to_server,
+    "websocket-server-broadcast": websocket_server_broadcast,
+    "rtp-native": rtp_native,
+    "ffmpeg-sink": ffmpeg_sink,
+}
+MULTI_CLIENT = {"void", "websocket-client-to-server", "websocket-server-broadcast"}
+
+
+async def run(args) -> List[Dict[str, Any]]:
+    results = []
+    for name in args.transports:
+        for frames in args.frames:
+            for clients in args.clients if name in MULTI_CLIENT else [1]:
+                buffers = max(args.min_buffers, args.total_frames // frames)
+                result = await BENCHMARKS[name](frames, buffers, clients)
+                results.append(result)
+                print(
+                    f"{result['transport']:28} clients={result['clients']:<3}"
+                    f" frames={frames:<6}"
+                    f" {result['frames_per_second']:>12.0f} frames/s"
+                    f" {result['mb_per_second']:>8.2f} MB/s"
+                    f" p50={_ms(result['latency_p50_ms'])}"
+                    f" p99={_ms(result['latency_p99_ms'])}",
+                    file=sys.stderr,
+                )
+    return results
+
+
+def _ms(value) -> str:
+    return "-" if value is None else f"{value:.3f}ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark aioaudio transports over local loopback"
+    )
+    parser.add_argument(
+        "--transports", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS)
+    )
+    parser.add_argument("--frames", nargs="+", type=int, default=[160, 960, 4800])
+    parser.add_argument("--clients", nargs="+", type=int, default=[1, 4, 16])
+    parser.add_argument("--total-frames", type=int, default=SAMPLING_RATE * 10)
+    parser.add_argument("--min-buffers", type=int, default=100)
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    report = dict(
+        environment=environment(), sampling_rate=SAMPLING_RATE, results=results
+    )
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,11 @@
 from .base import AudioSink, AudioSource
+from .channels import as_frames, deinterleave, interleave, remix
+from .convert import convert, decode, encode
+from .executor import DSPExecutor
+from .fanout import AudioFanout, tee
+from .features import FeatureExtractor, extract_features, mel_filterbank
+from .file_config import FileAudioSinkConfig, FileAudioSourceConfig
+from .frame import AudioFrame, AudioFrameClock
 from .loader import (
     AudioSinkConfig,
     AudioSourceConfig,
@@ -6,22 +13,73 @@ from .loader import (
     load_audio_source,
 )
 from .local_config import LocalAudioSinkConfig, LocalAudioSourceConfig
+from .metrics import MetricsRegistry, default_registry, prometheus_text
+from .mixer import AudioMixer, soft_clip
+from .pacer import PacedAudioSink
+from .pipeline import Pipeline, load_pipeline, run_pipeline
+from .pipeline_config import PipelineConfig
+from .resample import Resampler, resample
+from .ring import AudioRingBuffer, reframe
 from .rtmp_config import RTMPAudioSinkConfig
 from .rtp_config import RTPAudioSinkConfig, RTPAudioSourceConfig
-from .websocket_config import WebsocketClientAuduioConfig, WebsocketServerAudioConfig
+from .shm_config import SharedMemoryAudioSinkConfig, SharedMemoryAudioSourceConfig
+from .vad import VoiceActivityDetector, gate
+from .vad_config import VADConfig
+from .websocket_config import (
+    WebsocketClientAuduioConfig,
+    WebsocketReconnectConfig,
+    WebsocketServerAudioConfig,
+)
 
 __all__ = [
+    "as_frames",
+    "AudioFanout",
+    "AudioFrame",
+    "AudioFrameClock",
+    "AudioMixer",
+    "AudioRingBuffer",
     "AudioSink",
     "AudioSource",
     "AudioSinkConfig",
     "AudioSourceConfig",
+    "convert",
+    "decode",
+    "default_registry",
+    "deinterleave",
+    "DSPExecutor",
+    "encode",
+    "extract_features",
+    "FeatureExtractor",
+    "FileAudioSinkConfig",
+    "FileAudioSourceConfig",
+    "gate",
+    "interleave",
     "load_audio_sink",
     "load_audio_source",
+    "load_pipeline",
     "LocalAudioSinkConfig",
     "LocalAudioSourceConfig",
+    "mel_filterbank",
+    "MetricsRegistry",
+    "PacedAudioSink",
+    "Pipeline",
+    "PipelineConfig",
+    "prometheus_text",
+    "reframe",
+    "remix",
+    "resample",
+    "Resampler",
     "RTMPAudioSinkConfig",
     "RTPAudioSinkConfig",
     "RTPAudioSourceConfig",
+    "run_pipeline",
+    "SharedMemoryAudioSinkConfig",
+    "SharedMemoryAudioSourceConfig",
+    "soft_clip",
+    "tee",
+    "VADConfig",
+    "VoiceActivityDetector",
     "WebsocketClientAuduioConfig",
+    "WebsocketReconnectConfig",
     "WebsocketServerAudioConfig",
 ]
@@ -0,0 +1,24 @@
+import argparse
+import asyncio
+import logging
+
+from .pipeline import run_pipeline
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python -m aioaudio", description="Run an audio pipeline config"
+    )
+    parser.add_argument("config", help="Path to a PipelineConfig JSON file")
+    parser.add_argument("--log-level", default="INFO")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level.upper())
+    try:
+        asyncio.run(run_pipeline(args.config))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
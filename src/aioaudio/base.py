@@ -1,7 +1,19 @@
 from abc import abstractmethod
-from typing import AsyncContextManager, AsyncIterable, AsyncIterator
+from typing import (
+    TYPE_CHECKING,
+    AsyncContextManager,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Optional,
+)
 import numpy as np
 
+from .ring import reframe
+
+if TYPE_CHECKING:
+    from .metrics import MetricsRegistry
+
 
 class AudioSource(AsyncContextManager, AsyncIterable[np.ndarray]):
     @abstractmethod
@@ -12,12 +24,52 @@ class AudioSource(AsyncContextManager, AsyncIterable[np.ndarray]):
     def __aiter__(self) -> AsyncIterator[np.ndarray]:
         raise NotImplementedError()
 
+    def reframe(
+        self, frames: int, hop: Optional[int] = None, channels: int = 1
+    ) -> AsyncIterator[np.ndarray]:
+        return reframe(self, frames, hop, channels=channels)
+
+    def instrument(
+        self, registry: Optional["MetricsRegistry"] = None, name: Optional[str] = None
+    ) -> "AudioSource":
+        from .metrics import instrument_source
+
+        return instrument_source(self, registry, name)
+
+    def process(
+        self,
+        function: Callable[..., np.ndarray],
+        executor: str = "thread",
+        workers: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+    ) -> "AudioSource":
+        from .executor import DSPExecutor, ProcessedAudioSource
+
+        return ProcessedAudioSource(
+            self, DSPExecutor(function, executor, workers, max_in_flight)
+        )
+
+    def features(self, channels: int = 1, **kwargs) -> AsyncIterator[np.ndarray]:
+        from .features import FeatureExtractor, extract_features
+
+        sampling_rate = getattr(self, "sampling_rate")
+        return extract_features(
+            self, FeatureExtractor(sampling_rate, channels=channels, **kwargs)
+        )
+
 
 class AudioSink(AsyncContextManager):
     @abstractmethod
     async def write(self, audio: np.ndarray):
         raise NotImplementedError()
 
+    def instrument(
+        self, registry: Optional["MetricsRegistry"] = None, name: Optional[str] = None
+    ) -> "AudioSink":
+        from .metrics import instrument_sink
+
+        return instrument_sink(self, registry, name)
+
     async def __call__(self, audio_stream: AsyncIterable[np.ndarray]):
         async for audio in audio_stream:
             await self.write(audio)
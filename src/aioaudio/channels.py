@@ -0,0 +1,34 @@
+from typing import Tuple
+
+import numpy as np
+
+
+def as_frames(audio: np.ndarray, channels: int = 1) -> np.ndarray:
+    if audio.ndim == 2 and audio.shape[1] == channels:
+        return audio
+    return audio.reshape(-1, channels)
+
+
+def interleave(audio: np.ndarray) -> np.ndarray:
+    return audio.reshape(-1)
+
+
+def deinterleave(audio: np.ndarray, channels: int) -> Tuple[np.ndarray, ...]:
+    frames = as_frames(audio, channels)
+    return tuple(frames[:, channel] for channel in range(channels))
+
+
+def remix(audio: np.ndarray, channels: int) -> np.ndarray:
+    source_channels = audio.shape[1]
+    if source_channels == channels:
+        return audio
+    if channels == 1:
+        return audio.mean(axis=1, keepdims=True, dtype=np.float32)
+    if source_channels == 1:
+        return np.broadcast_to(audio, (len(audio), channels))
+    if source_channels > channels:
+        return audio[:, :channels]
+
+    remixed = np.zeros((len(audio), channels), dtype=audio.dtype)
+    remixed[:, :source_channels] = audio
+    return remixed
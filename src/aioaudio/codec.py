@@ -0,0 +1,148 @@
+import struct
+from typing import Dict, List, Optional, Sequence, Type
+
+import numpy as np
+
+from .convert import decode, encode
+
+
+class WireCodec:
+    name = ""
+
+    def __init__(self, sampling_rate: int, channels: int = 1):
+        self.sampling_rate = sampling_rate
+        self.channels = channels
+
+    @classmethod
+    def is_available(cls, sampling_rate: int) -> bool:
+        return True
+
+    def encode(self, audio: np.ndarray) -> bytes:
+        raise NotImplementedError()
+
+    def decode(self, data: bytes) -> np.ndarray:
+        raise NotImplementedError()
+
+
+class F32Codec(WireCodec):
+    name = "f32"
+
+    def encode(self, audio: np.ndarray) -> bytes:
+        return encode(audio, "f32").tobytes()
+
+    def decode(self, data: bytes) -> np.ndarray:
+        return decode(data, "f32")
+
+
+class S16Codec(WireCodec):
+    name = "s16"
+
+    def encode(self, audio: np.ndarray) -> bytes:
+        return encode(audio, "s16").tobytes()
+
+    def decode(self, data: bytes) -> np.ndarray:
+        return decode(data, "s16")
+
+
+class MuLawCodec(WireCodec):
+    name = "mulaw"
+
+    def encode(self, audio: np.ndarray) -> bytes:
+        return encode(audio, "mulaw").tobytes()
+
+    def decode(self, data: bytes) -> np.ndarray:
+        return decode(data, "mulaw")
+
+
+class ALawCodec(WireCodec):
+    name = "alaw"
+
+    def encode(self, audio: np.ndarray) -> bytes:
+        return encode(audio, "alaw").tobytes()
+
+    def decode(self, data: bytes) -> np.ndarray:
+        return decode(data, "alaw")
+
+
+class OpusCodec(WireCodec):
+    name = "opus"
+    sampling_rates = (8000, 12000, 16000, 24000, 48000)
+    packet_header = struct.Struct("<H")
+
+    def __init__(self, sampling_rate: int, channels: int = 1):
+        import opuslib
+
+        super().__init__(sampling_rate, channels)
+        self.frame_size = sampling_rate // 50
+        self.max_frame_size = sampling_rate * 120 // 1000
+        self.encoder = opuslib.Encoder(
+            sampling_rate, channels, opuslib.APPLICATION_AUDIO
+        )
+        self.decoder = opuslib.Decoder(sampling_rate, channels)
+        self.pending = np.zeros(0, dtype=np.int16)
+
+    @classmethod
+    def is_available(cls, sampling_rate: int) -> bool:
+        try:
+            import opuslib  # noqa: F401
+        except Exception:  # opuslib raises a bare Exception without libopus
+            return False
+        return sampling_rate in cls.sampling_rates
+
+    def encode(self, audio: np.ndarray) -> bytes:
+        pcm = np.concatenate([self.pending, encode(audio, "s16")])
+        samples_per_packet = self.frame_size * self.channels
+
+        packets = []
+        end = len(pcm) - len(pcm) % samples_per_packet
+        for start in range(0, end, samples_per_packet):
+            packet = self.encoder.encode(
+                pcm[start : start + samples_per_packet].tobytes(), self.frame_size
+            )
+            packets.append(self.packet_header.pack(len(packet)))
+            packets.append(packet)
+        self.pending = pcm[end:]
+        return b"".join(packets)
+
+    def decode(self, data: bytes) -> np.ndarray:
+        frames = []
+        offset = 0
+        while offset < len(data):
+            (length,) = self.packet_header.unpack_from(data, offset)
+            offset += self.packet_header.size
+            pcm = self.decoder.decode(
+                data[offset : offset + length], self.max_frame_size
+            )
+            frames.append(pcm)
+            offset += length
+        return decode(b"".join(frames), "s16")
+
+
+WIRE_CODECS: Dict[str, Type[WireCodec]] = {
+    codec.name: codec
+    for codec in (F32Codec, S16Codec, MuLawCodec, ALawCodec, OpusCodec)
+}
+
+
+def available_formats(formats: Sequence[str], sampling_rate: int) -> List[str]:
+    for format in formats:
+        if format not in WIRE_CODECS:
+            raise ValueError(f"Unknown wire format: {format}")
+    return [
+        format for format in formats if WIRE_CODECS[format].is_available(sampling_rate)
+    ]
+
+
+def negotiate_format(
+    server_formats: Optional[Sequence[str]], client_formats: Optional[Sequence[str]]
+) -> str:
+    if server_formats is None or client_formats is None:
+        return F32Codec.name
+    for format in server_formats:
+        if format in client_formats:
+            return format
+    return F32Codec.name
+
+
+def load_codec(format: str, sampling_rate: int, channels: int = 1) -> WireCodec:
+    return WIRE_CODECS[format](sampling_rate, channels)
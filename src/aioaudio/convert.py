@@ -0,0 +1,271 @@
+from typing import Dict, Optional, Union
+
+import numpy as np
+
+# Bytes per sample. s24 is packed, three bytes per sample.
+SAMPLE_WIDTHS: Dict[str, int] = {
+    "u8": 1,
+    "s16": 2,
+    "s24": 3,
+    "s32": 4,
+    "f32": 4,
+    "f64": 8,
+    "mulaw": 1,
+    "alaw": 1,
+}
+
+# Storage dtypes for formats numpy can view directly, without byte order.
+_DTYPES: Dict[str, str] = {
+    "u8": "u1",
+    "s16": "i2",
+    "s32": "i4",
+    "f32": "f4",
+    "f64": "f8",
+    "mulaw": "u1",
+    "alaw": "u1",
+}
+
+_FULL_SCALE: Dict[str, float] = {
+    "u8": 128.0,
+    "s16": 32768.0,
+    "s24": 8388608.0,
+    "s32": 2147483648.0,
+}
+
+MULAW_BIAS = 0x84
+MULAW_CLIP = 8158
+
+_rng = np.random.default_rng()
+
+Buffer = Union[bytes, bytearray, memoryview, np.ndarray]
+
+
+def _mulaw_decode_table() -> np.ndarray:
+    u = ~np.arange(256, dtype=np.int32) & 0xFF
+    exponent = (u >> 4) & 0x07
+    mantissa = u & 0x0F
+    magnitude = (((mantissa << 3) + MULAW_BIAS) << exponent) - MULAW_BIAS
+    return np.where(u & 0x80, -magnitude, magnitude).astype(np.int16)
+
+
+def _mulaw_encode_table() -> np.ndarray:
+    # Indexed by the 14 bit sample, (s16 >> 2) + 8192.
+    pcm = np.arange(-8192, 8192, dtype=np.int32)
+    exponents = np.array(
+        [max(i.bit_length() - 1, 0) for i in range(256)], dtype=np.int32
+    )
+    sign = np.where(pcm < 0, 0x80, 0)
+    magnitude = np.minimum(np.abs(pcm), MULAW_CLIP) * 4 + MULAW_BIAS
+    exponent = exponents[(magnitude >> 7) & 0xFF]
+    mantissa = (magnitude >> (exponent + 3)) & 0x0F
+    return (~(sign | (exponent << 4) | mantissa) & 0xFF).astype(np.uint8)
+
+
+def _alaw_decode_table() -> np.ndarray:
+    a = np.arange(256, dtype=np.int32) ^ 0x55
+    exponent = (a & 0x7F) >> 4
+    mantissa = a & 0x0F
+    mantissa = np.where(exponent > 0, mantissa + 16, mantissa)
+    magnitude = (mantissa << 4) + 0x08
+    magnitude = np.where(
+        exponent > 1, magnitude << np.maximum(exponent - 1, 0), magnitude
+    )
+    return np.where(a & 0x80, magnitude, -magnitude).astype(np.int16)
+
+
+def _alaw_encode_table() -> np.ndarray:
+    # Indexed by the 12 bit sample, (s16 >> 4) + 2048, as in ITU-T G.191.
+    pcm = np.arange(-2048, 2048, dtype=np.int32)
+    magnitude = np.where(pcm < 0, ~pcm, pcm)
+    exponent = np.maximum(np.array([i.bit_length() for i in magnitude.tolist()]) - 4, 0)
+    mantissa = np.where(
+        exponent > 0, (magnitude >> np.maximum(exponent - 1, 0)) - 16, magnitude
+    )
+    code = mantissa + (exponent << 4)
+    code = np.where(pcm >= 0, code | 0x80, code)
+    return (code ^ 0x55).astype(np.uint8)
+
+
+_MULAW_DECODE = _mulaw_decode_table()
+_MULAW_ENCODE = _mulaw_encode_table()
+_ALAW_DECODE = _alaw_decode_table()
+_ALAW_ENCODE = _alaw_encode_table()
+# Float tables so decoding is a single gather.
+_MULAW_DECODE_F32 = _MULAW_DECODE.astype(np.float32) / 32768
+_ALAW_DECODE_F32 = _ALAW_DECODE.astype(np.float32) / 32768
+
+
+def _check_format(format: str):
+    if format not in SAMPLE_WIDTHS:
+        raise ValueError(f"Unsupported sample format: {format}")
+
+
+def _flat(out: np.ndarray) -> np.ndarray:
+    # Reshaping anything but a contiguous array would copy and lose writes.
+    if not out.flags.c_contiguous:
+        raise ValueError("out must be C contiguous")
+    return out.reshape(-1)
+
+
+def _samples(data: Buffer, format: str, byteorder: str) -> np.ndarray:
+    if format == "s24":
+        return np.frombuffer(data, dtype=np.uint8).reshape(-1, 3)
+    dtype = sample_dtype(format, byteorder)
+    if isinstance(data, np.ndarray):
+        data = data.reshape(-1)
+        if data.dtype != dtype:
+            data = data.view(np.uint8).view(dtype)
+        return data
+    return np.frombuffer(data, dtype=dtype)
+
+
+def _s16(audio: np.ndarray) -> np.ndarray:
+    pcm = np.multiply(audio, 32768, dtype=np.float32)
+    np.rint(pcm, out=pcm)
+    np.clip(pcm, -32768, 32767, out=pcm)
+    return pcm.astype(np.int16)
+
+
+def sample_dtype(format: str, byteorder: str = "<") -> np.dtype:
+    # The dtype `encode` writes, s24 is stored as three uint8 per sample.
+    _check_format(format)
+    if format == "s24":
+        return np.dtype(np.uint8)
+    return np.dtype(_DTYPES[format]).newbyteorder(byteorder)
+
+
+def tpdf_dither(samples: int) -> np.ndarray:
+    # Triangular noise of +-1 LSB peak.
+    noise = _rng.random(samples, dtype=np.float32)
+    noise -= _rng.random(samples, dtype=np.float32)
+    return noise
+
+
+def decode(
+    data: Buffer,
+    format: str,
+    out: Optional[np.ndarray] = None,
+    byteorder: str = "<",
+) -> np.ndarray:
+    # Returns flat float32 samples in [-1, 1). Native float32 input is
+    # returned without a copy unless `out` is given.
+    _check_format(format)
+    samples = _samples(data, format, byteorder)
+    if out is not None:
+        out = _flat(out)
+        if out.dtype != np.float32:
+            raise ValueError("out must be a float32 array")
+    match format:
+        case "f32" | "f64":
+            if out is None:
+                return samples.astype(np.float32, copy=False)
+            out[...] = samples
+            return out
+        case "mulaw":
+            return np.take(_MULAW_DECODE_F32, samples, out=out)
+        case "alaw":
+            return np.take(_ALAW_DECODE_F32, samples, out=out)
+        case "s24":
+            # The three bytes go into the top of an int32, which is then
+            # scaled like s32.
+            padded = np.zeros((len(samples), 4), dtype=np.uint8)
+            if byteorder == "<":
+                padded[:, 1:] = samples
+            else:
+                padded[:, :3] = samples
+            samples = padded.view(np.dtype("i4").newbyteorder(byteorder))[:, 0]
+            scale = 1 / _FULL_SCALE["s32"]
+        case _:
+            scale = 1 / _FULL_SCALE[format]
+
+    out = np.multiply(samples, scale, out=out, dtype=np.float32, casting="unsafe")
+    if format == "u8":
+        out -= 1.0
+    return out
+
+
+def encode(
+    audio: np.ndarray,
+    format: str,
+    out: Optional[np.ndarray] = None,
+    dither: bool = False,
+    byteorder: str = "<",
+) -> np.ndarray:
+    # Returns a flat array in the storage dtype, or uint8 bytes for s24.
+    # `dither` adds TPDF dither to the 8, 16 and 24 bit linear formats.
+    _check_format(format)
+    audio = np.asarray(audio, dtype=np.float32).reshape(-1)
+    if out is not None:
+        out = _flat(out)
+    match format:
+        case "f32" | "f64":
+            if out is None:
+                return audio.astype(sample_dtype(format, byteorder), copy=False)
+            out[...] = audio
+            return out
+        case "mulaw":
+            index = _s16(audio) >> 2
+            index += 8192
+            return np.take(_MULAW_ENCODE, index, out=out)
+        case "alaw":
+            index = _s16(audio) >> 4
+            index += 2048
+            return np.take(_ALAW_ENCODE, index, out=out)
+
+    full_scale = _FULL_SCALE[format]
+    # float32 cannot hold every 32 bit sample value.
+    scaled = np.multiply(
+        audio, full_scale, dtype=np.float64 if format == "s32" else np.float32
+    )
+    if dither and format != "s32":
+        scaled += tpdf_dither(len(scaled))
+    np.rint(scaled, out=scaled)
+    np.clip(scaled, -full_scale, full_scale - 1, out=scaled)
+
+    if format == "s24":
+        pcm = scaled.astype(np.dtype("i4").newbyteorder(byteorder))
+        pcm = pcm.view(np.uint8).reshape(-1, 4)
+        pcm = pcm[:, :3] if byteorder == "<" else pcm[:, 1:]
+        if out is None:
+            return pcm.reshape(-1)
+        out.reshape(-1, 3)[...] = pcm
+        return out
+
+    if format == "u8":
+        scaled += 128
+    if out is None:
+        return scaled.astype(sample_dtype(format, byteorder))
+    np.copyto(out, scaled, casting="unsafe")
+    return out
+
+
+def convert(
+    data: Buffer,
+    from_format: str,
+    to_format: str,
+    dither: bool = False,
+    from_byteorder: str = "<",
+    to_byteorder: str = "<",
+) -> np.ndarray:
+    return encode(
+        decode(data, from_format, byteorder=from_byteorder),
+        to_format,
+        dither=dither,
+        byteorder=to_byteorder,
+    )
+
+
+def mulaw_encode(audio: np.ndarray) -> np.ndarray:
+    return encode(audio, "mulaw")
+
+
+def mulaw_decode(data: np.ndarray) -> np.ndarray:
+    return decode(data, "mulaw")
+
+
+def alaw_encode(audio: np.ndarray) -> np.ndarray:
+    return encode(audio, "alaw")
+
+
+def alaw_decode(data: np.ndarray) -> np.ndarray:
+    return decode(data, "alaw")
@@ -0,0 +1,257 @@
+import asyncio
+import functools
+import importlib
+import os
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Optional,
+    Tuple,
+)
+
+import numpy as np
+
+from .base import AudioSource
+from .channels import remix
+from .frame import AudioFrame
+from .mixer import soft_clip
+from .shm import attach_shared_memory, release_shared_memory
+
+DSPFunction = Callable[..., np.ndarray]
+
+
+def gain(audio: np.ndarray, gain: float = 1.0) -> np.ndarray:
+    return np.multiply(audio, gain, dtype=np.float32)
+
+
+BUILTIN_FUNCTIONS: Dict[str, DSPFunction] = {
+    "gain": gain,
+    "remix": remix,
+    "soft_clip": soft_clip,
+}
+
+
+def load_function(name: str, kwargs: Optional[Dict[str, Any]] = None) -> DSPFunction:
+    # Built-in names or "package.module:function"; keyword arguments are bound
+    # with functools.partial so the result stays picklable for process pools.
+    if name in BUILTIN_FUNCTIONS:
+        function = BUILTIN_FUNCTIONS[name]
+    else:
+        module, _, attribute = name.partition(":")
+        if not attribute:
+            raise ValueError(f"Unknown DSP function: {name}")
+        function = getattr(importlib.import_module(module), attribute)
+    return functools.partial(function, **kwargs) if kwargs else function
+
+
+# Per worker process state, installed once by the pool initializer so that
+# tasks only carry a slot index and the buffer shape.
+_worker: Optional[Tuple[DSPFunction, SharedMemory, int]] = None
+
+
+def _initialize_worker(function: DSPFunction, name: str, slot_bytes: int):
+    global _worker
+    _worker = function, attach_shared_memory(name, track=True), slot_bytes
+
+
+def _process_slot(slot: int, shape: Tuple[int, ...], dtype: str):
+    assert _worker is not None
+    function, shm, slot_bytes = _worker
+    offset = slot * 2 * slot_bytes
+    audio = np.ndarray(shape, dtype, buffer=shm.buf, offset=offset)
+    result = np.asarray(function(audio))
+    del audio
+    if result.nbytes > slot_bytes or result.dtype.hasobject:
+        return result
+    output = np.ndarray(
+        result.shape, result.dtype, buffer=shm.buf, offset=offset + slot_bytes
+    )
+    output[...] = result
+    return result.shape, result.dtype.str
+
+
+def _process_array(audio: np.ndarray) -> np.ndarray:
+    assert _worker is not None
+    return np.asarray(_worker[0](audio))
+
+
+class DSPExecutor:
+    # Runs `function` on every buffer of a stream in a thread or process pool
+    # while yielding results in input order. At most `max_in_flight` buffers
+    # are queued or running; in process mode each one owns a shared memory
+    # slot holding its input and output, so only the slot index, shape and
+    # dtype are pickled. Buffers or results larger than `slot_bytes` fall
+    # back to pickling.
+    def __init__(
+        self,
+        function: DSPFunction,
+        executor: str = "thread",
+        workers: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+        slot_bytes: int = 1 << 18,
+    ):
+        if executor not in ("thread", "process"):
+            raise ValueError(f"Unknown executor: {executor}")
+        self.function = function
+        self.executor = executor
+        self.workers = workers or os.cpu_count() or 1
+        self.max_in_flight = max_in_flight or self.workers * 2
+        self.slot_bytes = slot_bytes
+        self.processed = 0
+        self.pickled = 0
+
+    async def __aenter__(self):
+        self.free_slots: asyncio.Queue[int] = asyncio.Queue()
+        for slot in range(self.max_in_flight):
+            self.free_slots.put_nowait(slot)
+
+        self.pool: Executor
+        if self.executor == "thread":
+            self.pool = ThreadPoolExecutor(self.workers)
+            return self
+
+        self.shm = SharedMemory(
+            f"aioaudio-dsp-{uuid.uuid4().hex[:16]}",
+            create=True,
+            size=self.max_in_flight * 2 * self.slot_bytes,
+        )
+        self.pool = ProcessPoolExecutor(
+            self.workers,
+            initializer=_initialize_worker,
+            initargs=(self.function, self.shm.name, self.slot_bytes),
+        )
+        return self
+
+    async def __aexit__(self, *_, **__):
+        await asyncio.to_thread(self.pool.shutdown, True, cancel_futures=True)
+        if self.executor == "process":
+            release_shared_memory(self.shm, unlink=True)
+
+    @property
+    def queue_depth(self) -> int:
+        return self.max_in_flight - self.free_slots.qsize()
+
+    def _submit(self, audio: np.ndarray, slot: int) -> "asyncio.Future[Any]":
+        loop = asyncio.get_running_loop()
+        if self.executor == "thread":
+            return loop.run_in_executor(self.pool, self.function, audio)
+
+        data = np.asarray(audio)
+        if data.nbytes > self.slot_bytes or data.dtype.hasobject:
+            self.pickled += 1
+            return loop.run_in_executor(self.pool, _process_array, data)
+        view = np.ndarray(
+            data.shape,
+            data.dtype,
+            buffer=self.shm.buf,
+            offset=slot * 2 * self.slot_bytes,
+        )
+        view[...] = data
+        return loop.run_in_executor(
+            self.pool, _process_slot, slot, data.shape, data.dtype.str
+        )
+
+    def _result(self, slot: int, result: Any) -> np.ndarray:
+        if self.executor == "thread" or isinstance(result, np.ndarray):
+            if self.executor == "process":
+                self.pickled += 1
+            return np.asarray(result)
+        shape, dtype = result
+        # Copied out so the slot can be reused as soon as it is released.
+        return np.ndarray(
+            shape,
+            dtype,
+            buffer=self.shm.buf,
+            offset=slot * 2 * self.slot_bytes + self.slot_bytes,
+        ).copy()
+
+    async def process(
+        self, stream: AsyncIterable[np.ndarray]
+    ) -> AsyncIterator[np.ndarray]:
+        pending: asyncio.Queue[Optional[Tuple[Any, int, asyncio.Future]]] = (
+            asyncio.Queue()
+        )
+
+        async def feed():
+            try:
+                async for audio in stream:
+                    slot = await self.free_slots.get()
+                    try:
+                        future = self._submit(audio, slot)
+                    except BaseException:
+                        self.free_slots.put_nowait(slot)
+                        raise
+                    pending.put_nowait((audio, slot, future))
+            finally:
+                pending.put_nowait(None)
+
+        feeder = asyncio.create_task(feed())
+        try:
+            while True:
+                item = await pending.get()
+                if item is None:
+                    break
+                audio, slot, future = item
+                try:
+                    result = self._result(slot, await future)
+                finally:
+                    self.free_slots.put_nowait(slot)
+                self.processed += 1
+                yield _wrap(audio, result)
+            # Surfaces errors raised by the source.
+            await feeder
+        finally:
+            feeder.cancel()
+            while not pending.empty():
+                item = pending.get_nowait()
+                if item is not None:
+                    item[2].cancel()
+                    self.free_slots.put_nowait(item[1])
+            await asyncio.gather(feeder, return_exceptions=True)
+
+    def __call__(self, stream: AsyncIterable[np.ndarray]) -> AsyncIterator[np.ndarray]:
+        return self.process(stream)
+
+
+def _wrap(audio: Any, result: np.ndarray) -> Any:
+    if not isinstance(audio, AudioFrame):
+        return result
+    channels = result.shape[1] if result.ndim == 2 else audio.channels
+    return audio.replace(data=result, channels=channels)
+
+
+class ProcessedAudioSource(AudioSource):
+    def __init__(self, source: AudioSource, executor: DSPExecutor):
+        self.source = source
+        self.executor = executor
+
+    async def __aenter__(self):
+        await self.source.__aenter__()
+        try:
+            await self.executor.__aenter__()
+        except BaseException:
+            await self.source.__aexit__(None, None, None)
+            raise
+        return self
+
+    async def __aexit__(self, *args, **kwargs):
+        try:
+            await self.executor.__aexit__(*args, **kwargs)
+        finally:
+            await self.source.__aexit__(*args, **kwargs)
+
+    async def __aiter__(self) -> AsyncIterator[np.ndarray]:
+        async for audio in self.executor.process(self.source):
+            yield audio
+
+    def is_active(self) -> bool:
+        return self.source.is_active()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.source, name)
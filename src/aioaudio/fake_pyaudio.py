@@ -0,0 +1,122 @@
+import threading
+import time
+from typing import Callable, Optional
+
+import numpy as np
+
+from .convert import SAMPLE_WIDTHS, encode
+
+paFloat32 = 1
+paInt32 = 2
+paInt24 = 4
+paInt16 = 8
+paUInt8 = 32
+paContinue = 0
+paComplete = 1
+paAbort = 2
+
+SAMPLE_FORMATS = {
+    paFloat32: "f32",
+    paInt32: "s32",
+    paInt24: "s24",
+    paInt16: "s16",
+    paUInt8: "u8",
+}
+
+
+def sine(frequency: float = 440, amplitude: float = 0.1):
+    def generate(start: int, frames: int, rate: int, channels: int) -> np.ndarray:
+        t = np.arange(start, start + frames) / rate
+        audio = amplitude * np.sin(2 * np.pi * frequency * t, dtype=np.float32)
+        return np.repeat(audio, channels).astype(np.float32)
+
+    return generate
+
+
+class FakeStream:
+    def __init__(
+        self,
+        rate: int,
+        channels: int = 1,
+        format: int = paFloat32,
+        input: bool = False,
+        output: bool = False,
+        frames_per_buffer: int = 1024,
+        stream_callback: Optional[Callable] = None,
+        signal: Optional[Callable] = None,
+        **_,
+    ):
+        self.rate = rate
+        self.channels = channels
+        self.sample_format = SAMPLE_FORMATS[format]
+        self.input = input
+        self.output = output
+        self.frames_per_buffer = frames_per_buffer
+        self.stream_callback = stream_callback
+        self.signal = signal or sine()
+        self.position = 0
+        self.written = bytearray()
+        self.active = False
+        self.thread: Optional[threading.Thread] = None
+
+    def _generate(self, frames: int) -> bytes:
+        audio = self.signal(self.position, frames, self.rate, self.channels)
+        self.position += frames
+        return encode(audio, self.sample_format).tobytes()
+
+    def _run(self):
+        assert self.stream_callback is not None
+        interval = self.frames_per_buffer / self.rate
+        deadline = time.monotonic()
+        while self.active:
+            deadline += interval
+            time.sleep(max(0, deadline - time.monotonic()))
+            in_data = self._generate(self.frames_per_buffer) if self.input else None
+            out_data, flag = self.stream_callback(
+                in_data, self.frames_per_buffer, {}, 0
+            )
+            if self.output and out_data:
+                self.written += out_data
+            if flag != paContinue:
+                self.active = False
+
+    def start_stream(self):
+        self.active = True
+        if self.stream_callback is not None:
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+
+    def stop_stream(self):
+        self.active = False
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join()
+
+    def close(self):
+        self.active = False
+
+    def is_active(self) -> bool:
+        return self.active
+
+    def read(self, frames: int, exception_on_overflow: bool = True) -> bytes:
+        time.sleep(frames / self.rate)
+        return self._generate(frames)
+
+    def write(self, data: bytes, *_, **__):
+        width = SAMPLE_WIDTHS[self.sample_format]
+        time.sleep(len(data) / width / self.channels / self.rate)
+        self.written += data
+
+
+class PyAudio:
+    def __init__(self, signal: Optional[Callable] = None):
+        self.signal = signal
+        self.streams = []
+
+    def open(self, *args, **kwargs) -> FakeStream:
+        stream = FakeStream(*args, signal=self.signal, **kwargs)
+        self.streams.append(stream)
+        return stream
+
+    def terminate(self):
+        for stream in self.streams:
+            stream.close()
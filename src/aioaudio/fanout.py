@@ -0,0 +1,156 @@
+import asyncio
+from contextlib import AsyncExitStack
+import logging
+import time
+from typing import Any, AsyncIterable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .base import AudioSink
+from .frame import AudioFrame
+
+logger = logging.getLogger(__name__)
+
+
+class AudioFanoutBranch:
+    def __init__(
+        self,
+        sink: AudioSink,
+        max_queue_size: int = 32,
+        overflow_policy: str = "drop-oldest",
+    ):
+        if overflow_policy not in ("block", "drop-oldest", "drop-newest"):
+            raise ValueError(f"Unknown overflow policy: {overflow_policy}")
+        self.sink = sink
+        self.overflow_policy = overflow_policy
+        self.queue: asyncio.Queue[Tuple[float, np.ndarray]] = asyncio.Queue(
+            max_queue_size
+        )
+        self.error: Optional[BaseException] = None
+        self.written = 0
+        self.written_frames = 0
+        self.dropped = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self.started = time.monotonic()
+
+    async def put(self, audio: np.ndarray):
+        if self.error is not None:
+            return
+
+        item = (time.monotonic(), audio)
+        if not self.queue.full() or self.overflow_policy == "block":
+            await self.queue.put(item)
+            return
+
+        match self.overflow_policy:
+            case "drop-oldest":
+                self.queue.get_nowait()
+                self.queue.task_done()
+            case "drop-newest":
+                self.dropped += 1
+                return
+        self.dropped += 1
+        self.queue.put_nowait(item)
+
+    async def run(self):
+        while True:
+            queued_at, audio = await self.queue.get()
+            try:
+                await self.sink.write(audio)
+            except Exception as e:
+                logger.exception(f"Sink {self.sink} failed, detaching it from fanout")
+                self.error = e
+                self._drain()
+                return
+            finally:
+                self.queue.task_done()
+
+            self.written += 1
+            self.written_frames += len(audio)
+            self.last_latency = time.monotonic() - queued_at
+            self.max_latency = max(self.max_latency, self.last_latency)
+
+    def _drain(self):
+        while not self.queue.empty():
+            self.queue.get_nowait()
+            self.queue.task_done()
+
+    def stats(self) -> Dict[str, Any]:
+        elapsed = time.monotonic() - self.started
+        return dict(
+            sink=type(self.sink).__name__,
+            queued=self.queue.qsize(),
+            written=self.written,
+            written_frames=self.written_frames,
+            frames_per_second=self.written_frames / elapsed if elapsed > 0 else 0.0,
+            dropped=self.dropped,
+            last_latency=self.last_latency,
+            max_latency=self.max_latency,
+            failed=self.error is not None,
+        )
+
+
+class AudioFanout(AudioSink):
+    # Every branch receives the same read-only array, so sources must yield
+    # arrays they do not reuse (reframe views have to be copied first).
+    def __init__(
+        self,
+        sinks: Sequence[AudioSink],
+        max_queue_size: int = 32,
+        overflow_policy: Union[str, Sequence[str]] = "drop-oldest",
+        flush_timeout: Optional[float] = 5.0,
+    ):
+        self.flush_timeout = flush_timeout
+        policies = (
+            [overflow_policy] * len(sinks)
+            if isinstance(overflow_policy, str)
+            else list(overflow_policy)
+        )
+        if len(policies) != len(sinks):
+            raise ValueError("overflow_policy must have one entry per sink")
+        self.branches: List[AudioFanoutBranch] = [
+            AudioFanoutBranch(sink, max_queue_size, policy)
+            for sink, policy in zip(sinks, policies)
+        ]
+
+    async def __aenter__(self):
+        self.stack = AsyncExitStack()
+        await self.stack.__aenter__()
+        for branch in self.branches:
+            await self.stack.enter_async_context(branch.sink)
+        self.tasks = [asyncio.create_task(branch.run()) for branch in self.branches]
+        return self
+
+    async def __aexit__(self, *args, **kwargs):
+        try:
+            await asyncio.wait_for(self.flush(), self.flush_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Timed out flushing fanout queues, dropping the rest")
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        await self.stack.__aexit__(*args, **kwargs)
+
+    async def flush(self):
+        await asyncio.gather(
+            *(branch.queue.join() for branch in self.branches if branch.error is None)
+        )
+
+    async def write(self, audio: np.ndarray):
+        data = np.asarray(audio).view()
+        data.flags.writeable = False
+        audio = audio.replace(data=data) if isinstance(audio, AudioFrame) else data
+        for branch in self.branches:
+            await branch.put(audio)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [branch.stats() for branch in self.branches]
+
+
+async def tee(
+    source: AsyncIterable[np.ndarray], sinks: Sequence[AudioSink], **kwargs
+) -> AudioFanout:
+    async with AudioFanout(sinks, **kwargs) as fanout:
+        await fanout(source)
+    return fanout
@@ -0,0 +1,213 @@
+from functools import lru_cache
+from typing import AsyncIterable, AsyncIterator, Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .channels import as_frames, remix
+
+FEATURE_KINDS = ("stft", "magnitude", "power", "mel", "log-mel")
+
+
+@lru_cache(maxsize=32)
+def analysis_window(
+    n_fft: int, window: str = "hann", win_length: Optional[int] = None
+) -> np.ndarray:
+    win_length = win_length or n_fft
+    if win_length > n_fft:
+        raise ValueError("win_length must not exceed n_fft")
+    match window:
+        case "hann":
+            # Periodic, as used for spectral analysis.
+            values = np.hanning(win_length + 1)[:-1]
+        case "hamming":
+            values = np.hamming(win_length + 1)[:-1]
+        case "rectangular":
+            values = np.ones(win_length)
+        case _:
+            raise ValueError(f"Unknown window: {window}")
+    # Shorter windows are centred within the FFT frame.
+    padded = np.zeros(n_fft, dtype=np.float32)
+    start = (n_fft - win_length) // 2
+    padded[start : start + win_length] = values
+    padded.flags.writeable = False
+    return padded
+
+
+def hz_to_mel(frequency):
+    return 2595 * np.log10(1 + np.asarray(frequency) / 700)
+
+
+def mel_to_hz(mel):
+    return 700 * (10 ** (np.asarray(mel) / 2595) - 1)
+
+
+@lru_cache(maxsize=32)
+def mel_filterbank(
+    sampling_rate: int,
+    n_fft: int,
+    n_mels: int = 80,
+    fmin: float = 0.0,
+    fmax: Optional[float] = None,
+) -> np.ndarray:
+    # Triangular HTK mel filters with unit area, shaped (bins, n_mels) so a
+    # batch of power spectra is projected with one matrix product.
+    fmax = fmax or sampling_rate / 2
+    bins = np.fft.rfftfreq(n_fft, 1 / sampling_rate)
+    edges = mel_to_hz(np.linspace(hz_to_mel(fmin), hz_to_mel(fmax), n_mels + 2))
+    lower, center, upper = edges[:-2, None], edges[1:-1, None], edges[2:, None]
+    rising = (bins - lower) / (center - lower)
+    falling = (upper - bins) / (upper - center)
+    weights = np.maximum(0, np.minimum(rising, falling))
+    weights *= 2 / (upper - lower)
+    bank = np.ascontiguousarray(weights.T, dtype=np.float32)
+    bank.flags.writeable = False
+    return bank
+
+
+class FeatureExtractor:
+    # Streaming STFT features. Input is appended after the tail carried over
+    # from the previous call, analysis frames are strided views into that
+    # buffer and all complete frames are transformed in one batched rFFT.
+    # Output is (frames, bins), or (frames, channels, bins) when `downmix`
+    # is off.
+    def __init__(
+        self,
+        sampling_rate: int,
+        n_fft: int = 400,
+        hop: Optional[int] = None,
+        kind: str = "log-mel",
+        n_mels: int = 80,
+        window: str = "hann",
+        win_length: Optional[int] = None,
+        fmin: float = 0.0,
+        fmax: Optional[float] = None,
+        channels: int = 1,
+        downmix: bool = True,
+        log_floor: float = 1e-10,
+    ):
+        if kind not in FEATURE_KINDS:
+            raise ValueError(f"Unknown feature kind: {kind}")
+        self.sampling_rate = sampling_rate
+        self.n_fft = n_fft
+        self.hop = hop or sampling_rate // 100
+        self.kind = kind
+        self.channels = channels
+        self.downmix = downmix
+        self.log_floor = log_floor
+        self.window = analysis_window(n_fft, window, win_length)
+        self.filterbank = (
+            mel_filterbank(sampling_rate, n_fft, n_mels, fmin, fmax)
+            if kind in ("mel", "log-mel")
+            else None
+        )
+        self.buffer = np.zeros(
+            (2 * n_fft, 1 if downmix else channels), dtype=np.float32
+        )
+        self.buffered = 0
+        # Leading buffered frames already analysed by the previous frame.
+        self.covered = 0
+        # Input still to be skipped when the hop is longer than the frame.
+        self.skip = 0
+        self.frames = 0
+
+    @property
+    def bins(self) -> int:
+        if self.filterbank is not None:
+            return self.filterbank.shape[1]
+        return self.n_fft // 2 + 1
+
+    def _append(self, audio: np.ndarray):
+        audio = as_frames(audio, self.channels)
+        if self.downmix:
+            audio = remix(audio, 1)
+        if self.skip:
+            skipped = min(self.skip, len(audio))
+            audio = audio[skipped:]
+            self.skip -= skipped
+        end = self.buffered + len(audio)
+        if end > len(self.buffer):
+            grown = np.zeros((2 * end, self.buffer.shape[1]), dtype=np.float32)
+            grown[: self.buffered] = self.buffer[: self.buffered]
+            self.buffer = grown
+        self.buffer[self.buffered : end] = audio
+        self.buffered = end
+
+    def _transform(self, frames: np.ndarray) -> np.ndarray:
+        # frames: (frames, channels, n_fft) strided view.
+        spectrum = np.fft.rfft(frames * self.window, axis=-1)
+        if self.kind == "stft":
+            return spectrum.astype(np.complex64)
+        if self.kind == "magnitude":
+            return np.abs(spectrum).astype(np.float32)
+        power = np.square(spectrum.real, dtype=np.float32)
+        power += np.square(spectrum.imag, dtype=np.float32)
+        if self.filterbank is None:
+            return power
+        mel = power @ self.filterbank
+        if self.kind == "log-mel":
+            np.log(np.maximum(mel, self.log_floor, out=mel), out=mel)
+        return mel
+
+    def process(self, audio: np.ndarray) -> np.ndarray:
+        self._append(np.asarray(audio, dtype=np.float32))
+        count = (
+            (self.buffered - self.n_fft) // self.hop + 1
+            if self.buffered >= self.n_fft
+            else 0
+        )
+        if count == 0:
+            return self._empty()
+
+        frames = sliding_window_view(self.buffer[: self.buffered], self.n_fft, axis=0)[
+            : (count - 1) * self.hop + 1 : self.hop
+        ]
+        features = self._transform(frames)
+
+        consumed = count * self.hop
+        tail = self.buffered - consumed
+        if tail > 0:
+            self.buffer[:tail] = self.buffer[consumed : self.buffered]
+        self.buffered = max(tail, 0)
+        self.skip = max(-tail, 0)
+        self.covered = min(max(self.n_fft - self.hop, 0), self.buffered)
+        self.frames += count
+        return features[:, 0] if self.downmix else features
+
+    def flush(self) -> np.ndarray:
+        # Zero pads the remaining tail into one last frame.
+        if self.buffered <= self.covered:
+            self.reset()
+            return self._empty()
+        end = max(self.buffered, self.n_fft)
+        self.buffer[self.buffered : end] = 0
+        self.buffered = end
+        features = self.process(np.zeros((0, self.channels), dtype=np.float32))
+        self.reset()
+        return features
+
+    def reset(self):
+        self.buffered = 0
+        self.covered = 0
+        self.skip = 0
+
+    def _empty(self) -> np.ndarray:
+        dtype = np.complex64 if self.kind == "stft" else np.float32
+        if self.downmix:
+            return np.zeros((0, self.bins), dtype=dtype)
+        return np.zeros((0, self.channels, self.bins), dtype=dtype)
+
+
+async def extract_features(
+    source: AsyncIterable[np.ndarray],
+    extractor: FeatureExtractor,
+    flush: bool = True,
+) -> AsyncIterator[np.ndarray]:
+    async for audio in source:
+        features = extractor.process(audio)
+        if len(features):
+            yield features
+    if flush:
+        features = extractor.flush()
+        if len(features):
+            yield features
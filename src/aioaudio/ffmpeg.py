@@ -1,7 +1,18 @@
 import asyncio
 from asyncio import subprocess
+from asyncio.subprocess import Process
+from collections import deque
+import logging
+import time
+from typing import Deque, Optional
+
 import numpy as np
 
+from .base import AudioSink
+from .convert import encode
+
+logger = logging.getLogger(__name__)
+
 
 async def ffmpeg(*args: str, **kwargs):
     return await asyncio.create_subprocess_exec("ffmpeg", *args, **kwargs)
@@ -33,8 +44,216 @@ async def ffmpeg_sink(*args: str):
     return ffmpeg, pipe
 
 
-F2N = {
-    "s16le": np.int16,
-    "f32le": np.float32,
+class FFmpegWorker:
+    # Keeps an ffmpeg process fed from a bounded queue and respawns it when it
+    # exits, so a dropped ingest only costs the frames that overflow the queue.
+    def __init__(
+        self,
+        *args: str,
+        executable: str = "ffmpeg",
+        max_queue_size: int = 256,
+        warm_spare: bool = False,
+        initial_backoff: float = 0.1,
+        max_backoff: float = 10.0,
+        stable_seconds: float = 5.0,
+    ):
+        self.args = args
+        self.executable = executable
+        self.max_queue_size = max_queue_size
+        self.warm_spare = warm_spare
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.stable_seconds = stable_seconds
+        self.queue: Deque[bytes] = deque()
+        self.ready = asyncio.Event()
+        self.process: Optional[Process] = None
+        self.spare: Optional[Process] = None
+        self.spare_task: Optional[asyncio.Task] = None
+        self.closing = False
+        self.restarts = 0
+        self.dropped = 0
+        self.drain_seconds = 0.0
+        self.max_drain_seconds = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self.queue)
+
+    async def _spawn(self) -> Process:
+        return await asyncio.create_subprocess_exec(
+            self.executable, *self.args, stdin=subprocess.PIPE
+        )
+
+    def _take_spare(self) -> Optional[Process]:
+        spare, self.spare = self.spare, None
+        if spare is None or spare.returncode is not None:
+            return None
+        return spare
+
+    async def _spawn_spare(self, delay: float = 0.0):
+        if delay:
+            await asyncio.sleep(delay)
+        if self.closing or self.spare is not None:
+            return
+        # The spare is only an optimisation, the primary runs without it.
+        try:
+            self.spare = await self._spawn()
+        except OSError as e:
+            logger.warning(f"Failed to spawn spare ffmpeg: {e}")
+
+    async def _acquire(self) -> Process:
+        process = self._take_spare() or await self._spawn()
+        if self.warm_spare:
+            await self._spawn_spare()
+        return process
+
+    async def start(self):
+        self.process = await self._acquire()
+        self.supervisor = asyncio.create_task(self._run(self.process))
+
+    async def _run(self, process: Process):
+        backoff = self.initial_backoff
+        while True:
+            started = time.monotonic()
+            self.process = process
+            await self._pump(process)
+            if self.closing:
+                return
+
+            self.restarts += 1
+            stable = time.monotonic() - started >= self.stable_seconds
+            if stable:
+                backoff = self.initial_backoff
+            spare = self._take_spare()
+            if spare is not None:
+                # The warm spare takes over at once; only its replacement, a
+                # cold spawn, waits out the backoff.
+                logger.warning("ffmpeg exited, switching to the warm spare")
+                process = spare
+                if self.spare_task is not None:
+                    self.spare_task.cancel()
+                self.spare_task = asyncio.create_task(
+                    self._spawn_spare(0.0 if stable else backoff)
+                )
+                if not stable:
+                    backoff = min(backoff * 2, self.max_backoff)
+                continue
+
+            if stable:
+                logger.warning("ffmpeg exited, restarting")
+            else:
+                logger.warning(f"ffmpeg exited, restarting in {backoff:.2f}s")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+
+            while not self.closing:
+                try:
+                    process = await self._acquire()
+                    break
+                except OSError as e:
+                    logger.warning(f"Failed to spawn ffmpeg: {e}")
+                    await asyncio.sleep(backoff)
+                    backoff = min(backoff * 2, self.max_backoff)
+            if self.closing:
+                return
+
+    async def _pump(self, process: Process):
+        pipe = process.stdin
+        assert pipe is not None
+        exited = asyncio.create_task(process.wait())
+        try:
+            while True:
+                while not self.queue:
+                    if self.closing:
+                        pipe.close()
+                        await exited
+                        return
+                    self.ready.clear()
+                    ready = asyncio.create_task(self.ready.wait())
+                    await asyncio.wait(
+                        (exited, ready), return_when=asyncio.FIRST_COMPLETED
+                    )
+                    ready.cancel()
+                    if exited.done():
+                        return
+
+                started = time.perf_counter()
+                try:
+                    pipe.write(self.queue[0])
+                    await pipe.drain()
+                except (BrokenPipeError, ConnectionResetError):
+                    await exited
+                    return
+                elapsed = time.perf_counter() - started
+                self.drain_seconds += elapsed
+                self.max_drain_seconds = max(self.max_drain_seconds, elapsed)
+                self.queue.popleft()
+        finally:
+            exited.cancel()
+
+    async def write(self, data: bytes):
+        if len(self.queue) >= self.max_queue_size:
+            self.queue.popleft()
+            self.dropped += 1
+        self.queue.append(data)
+        self.ready.set()
+
+    def is_running(self) -> bool:
+        return (
+            not self.closing
+            and self.process is not None
+            and self.process.returncode is None
+        )
+
+    async def close(self, timeout: Optional[float] = 5.0):
+        self.closing = True
+        self.ready.set()
+        try:
+            await asyncio.wait_for(asyncio.shield(self.supervisor), timeout)
+        except asyncio.TimeoutError:
+            self.supervisor.cancel()
+            if self.process is not None and self.process.returncode is None:
+                self.process.kill()
+                await self.process.wait()
+        if self.spare_task is not None:
+            self.spare_task.cancel()
+            await asyncio.gather(self.spare_task, return_exceptions=True)
+        if self.spare is not None and self.spare.returncode is None:
+            self.spare.kill()
+            await self.spare.wait()
+
+
+class FFmpegAudioSink(AudioSink):
+    def __init__(self, worker: FFmpegWorker, format: str = "f32le"):
+        self.worker = worker
+        self.sample_format, self.byteorder = FFMPEG_SAMPLE_FORMATS[format]
+
+    async def __aenter__(self):
+        await self.worker.start()
+        return self
+
+    async def __aexit__(self, *_, **__):
+        await self.worker.close()
+
+    async def write(self, audio: np.ndarray):
+        await self.worker.write(
+            encode(audio, self.sample_format, byteorder=self.byteorder).tobytes()
+        )
+
+
+# Raw ffmpeg sample formats as aioaudio.convert formats and byte orders.
+FFMPEG_SAMPLE_FORMATS = {
+    "u8": ("u8", "<"),
+    "s16le": ("s16", "<"),
+    "s16be": ("s16", ">"),
+    "s24le": ("s24", "<"),
+    "s24be": ("s24", ">"),
+    "s32le": ("s32", "<"),
+    "s32be": ("s32", ">"),
+    "f32le": ("f32", "<"),
+    "f32be": ("f32", ">"),
+    "f64le": ("f64", "<"),
+    "f64be": ("f64", ">"),
+    "mulaw": ("mulaw", "<"),
+    "alaw": ("alaw", "<"),
 }
-N2F = {v: k for k, v in F2N.items()}
@@ -0,0 +1,292 @@
+import asyncio
+import os
+import queue
+import struct
+import threading
+import time
+from typing import AsyncIterator, BinaryIO, NamedTuple, Optional
+
+import numpy as np
+
+from .base import AudioSink, AudioSource
+from .channels import as_frames, remix
+from .convert import SAMPLE_WIDTHS, decode, encode, sample_dtype
+from .frame import AudioFrame, AudioFrameClock
+
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_IEEE_FLOAT = 3
+WAVE_FORMAT_ALAW = 6
+WAVE_FORMAT_MULAW = 7
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+WAV_SAMPLE_FORMATS = {
+    (WAVE_FORMAT_PCM, 8): "u8",
+    (WAVE_FORMAT_PCM, 16): "s16",
+    (WAVE_FORMAT_PCM, 24): "s24",
+    (WAVE_FORMAT_PCM, 32): "s32",
+    (WAVE_FORMAT_IEEE_FLOAT, 32): "f32",
+    (WAVE_FORMAT_IEEE_FLOAT, 64): "f64",
+    (WAVE_FORMAT_ALAW, 8): "alaw",
+    (WAVE_FORMAT_MULAW, 8): "mulaw",
+}
+WAV_FORMAT_TAGS = {
+    sample_format: tag for (tag, _), sample_format in WAV_SAMPLE_FORMATS.items()
+}
+
+WAV_HEADER = struct.Struct("<4sI4s4sIHHIIHH4sI")
+
+
+class WavInfo(NamedTuple):
+    sample_format: str
+    sampling_rate: int
+    channels: int
+    offset: int
+    frames: int
+
+
+def read_wav_info(f: BinaryIO) -> WavInfo:
+    riff, _, wave = struct.unpack("<4sI4s", f.read(12))
+    if riff != b"RIFF" or wave != b"WAVE":
+        raise ValueError("Not a RIFF/WAVE file")
+
+    file_size = os.fstat(f.fileno()).st_size
+    format_info = None
+    while True:
+        header = f.read(8)
+        if len(header) < 8:
+            raise ValueError("WAV file has no data chunk")
+        chunk_id, size = struct.unpack("<4sI", header)
+        if chunk_id == b"fmt ":
+            chunk = f.read(size)
+            tag, channels, rate, _, block_align, bits = struct.unpack_from(
+                "<HHIIHH", chunk
+            )
+            if tag == WAVE_FORMAT_EXTENSIBLE and len(chunk) >= 26:
+                # The sub format GUID starts with the actual format tag.
+                (tag,) = struct.unpack_from("<H", chunk, 24)
+            sample_format = WAV_SAMPLE_FORMATS.get((tag, bits))
+            if sample_format is None:
+                raise ValueError(f"Unsupported WAV format {tag} with {bits} bits")
+            format_info = sample_format, rate, channels, block_align
+        elif chunk_id == b"data":
+            if format_info is None:
+                raise ValueError("WAV data chunk before fmt chunk")
+            sample_format, rate, channels, block_align = format_info
+            offset = f.tell()
+            # Unfinished recordings leave the size at 0 or 0xFFFFFFFF.
+            if size in (0, 0xFFFFFFFF) or offset + size > file_size:
+                size = file_size - offset
+            return WavInfo(sample_format, rate, channels, offset, size // block_align)
+        else:
+            f.seek(size + (size & 1), os.SEEK_CUR)
+
+
+def wav_header(
+    sample_format: str, sampling_rate: int, channels: int, data_size: int = 0
+) -> bytes:
+    width = SAMPLE_WIDTHS[sample_format]
+    block_align = width * channels
+    data_size = min(data_size, 0xFFFFFFFF - WAV_HEADER.size + 8)
+    return WAV_HEADER.pack(
+        b"RIFF",
+        WAV_HEADER.size - 8 + data_size,
+        b"WAVE",
+        b"fmt ",
+        16,
+        WAV_FORMAT_TAGS[sample_format],
+        channels,
+        sampling_rate,
+        sampling_rate * block_align,
+        block_align,
+        width * 8,
+        b"data",
+        data_size,
+    )
+
+
+class FileAudioSource(AudioSource):
+    def __init__(
+        self,
+        sampling_rate: int,
+        path: str,
+        format: str = "wav",
+        sample_format: str = "f32",
+        channels: int = 1,
+        frames_per_buffer: Optional[int] = None,
+        pacing: str = "realtime",
+        loop: bool = False,
+    ):
+        self.sampling_rate = sampling_rate
+        self.path = path
+        self.format = format
+        self.sample_format = sample_format
+        self.channels = channels
+        self.frames_per_buffer = frames_per_buffer or sampling_rate // 50
+        self.pacing = pacing
+        self.loop = loop
+        self.finished = False
+
+    async def __aenter__(self):
+        sample_format = self.sample_format
+        file_channels = self.channels
+        offset = 0
+        if self.format == "wav":
+            with open(self.path, "rb") as f:
+                info = read_wav_info(f)
+            if info.sampling_rate != self.sampling_rate:
+                raise ValueError(
+                    f"{self.path} is at {info.sampling_rate} Hz, "
+                    f"expected {self.sampling_rate} Hz"
+                )
+            sample_format = info.sample_format
+            file_channels = info.channels
+            offset = info.offset
+
+        frame_bytes = SAMPLE_WIDTHS[sample_format] * file_channels
+        frames = (os.path.getsize(self.path) - offset) // frame_bytes
+        if self.format == "wav":
+            frames = min(frames, info.frames)
+        if frames == 0:
+            raise ValueError(f"{self.path} contains no audio")
+
+        self.file_sample_format = sample_format
+        self.file_channels = file_channels
+        # Mapped as raw bytes per frame; float32 files decode without a copy.
+        self.audio = np.memmap(
+            self.path, np.uint8, mode="r", offset=offset, shape=(frames, frame_bytes)
+        )
+        self.clock = AudioFrameClock(self.sampling_rate, self.channels)
+        return self
+
+    async def __aexit__(self, *_, **__):
+        del self.audio
+
+    def _decode(self, audio: np.ndarray) -> np.ndarray:
+        audio = decode(audio, self.file_sample_format)
+        return remix(as_frames(audio, self.file_channels), self.channels)
+
+    async def __aiter__(self) -> AsyncIterator[AudioFrame]:
+        audio = self.audio.view(np.ndarray)
+        frames = len(audio)
+        rate = self.sampling_rate
+        origin = time.monotonic()
+        sent = 0
+        offset = 0
+        while True:
+            if offset >= frames:
+                if not self.loop:
+                    self.finished = True
+                    return
+                offset = 0
+
+            end = min(offset + self.frames_per_buffer, frames)
+            if self.pacing == "realtime":
+                delay = origin + sent / rate - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                capture_time = origin + sent / rate
+            else:
+                # Still yield to the event loop so other tasks are not starved.
+                await asyncio.sleep(0)
+                capture_time = None
+            yield self.clock.stamp(self._decode(audio[offset:end]), capture_time)
+            sent += end - offset
+            offset = end
+
+    def is_active(self) -> bool:
+        return not self.finished
+
+
+class FileAudioSink(AudioSink):
+    # Frames are coalesced into `batch_frames` blocks and written by a
+    # background thread, so the event loop only ever copies into memory.
+    def __init__(
+        self,
+        sampling_rate: int,
+        path: str,
+        format: str = "wav",
+        sample_format: str = "f32",
+        channels: int = 1,
+        batch_frames: Optional[int] = None,
+        max_queue_size: int = 16,
+        dither: bool = False,
+    ):
+        self.sampling_rate = sampling_rate
+        self.path = path
+        self.format = format
+        self.sample_format = sample_format
+        self.channels = channels
+        self.batch_frames = batch_frames or sampling_rate
+        self.max_queue_size = max_queue_size
+        self.dither = dither
+        self.frame_bytes = SAMPLE_WIDTHS[sample_format] * channels
+        self.dtype = sample_dtype(sample_format)
+        self.frames_written = 0
+
+    async def __aenter__(self):
+        self.file = open(self.path, "wb")
+        if self.format == "wav":
+            self.file.write(
+                wav_header(self.sample_format, self.sampling_rate, self.channels)
+            )
+        self.batch = self._new_batch()
+        self.batch_size = 0
+        self.queue: queue.Queue[Optional[np.ndarray]] = queue.Queue(self.max_queue_size)
+        self.writer = threading.Thread(target=self._write_loop, daemon=True)
+        self.writer.start()
+        return self
+
+    async def __aexit__(self, *args, **kwargs):
+        if self.batch_size:
+            await self._flush()
+        await asyncio.to_thread(self.queue.put, None)
+        await asyncio.to_thread(self.writer.join)
+        await asyncio.to_thread(self._finalize)
+
+    def _new_batch(self) -> np.ndarray:
+        return np.empty((self.batch_frames, self.frame_bytes), dtype=np.uint8)
+
+    def _write_loop(self):
+        while True:
+            batch = self.queue.get()
+            if batch is None:
+                return
+            self.file.write(batch.data)
+            self.frames_written += len(batch)
+
+    def _finalize(self):
+        if self.format == "wav":
+            data_size = self.frames_written * self.frame_bytes
+            self.file.seek(0)
+            self.file.write(
+                wav_header(
+                    self.sample_format, self.sampling_rate, self.channels, data_size
+                )
+            )
+        self.file.close()
+
+    async def _flush(self):
+        batch = self.batch[: self.batch_size]
+        self.batch = self._new_batch()
+        self.batch_size = 0
+        try:
+            self.queue.put_nowait(batch)
+        except queue.Full:
+            await asyncio.to_thread(self.queue.put, batch)
+
+    async def write(self, audio: np.ndarray):
+        audio = as_frames(np.asarray(audio, dtype=np.float32), self.channels)
+        offset = 0
+        while offset < len(audio):
+            n = min(len(audio) - offset, self.batch_frames - self.batch_size)
+            # Encoded straight into the batch.
+            encode(
+                audio[offset : offset + n],
+                self.sample_format,
+                out=self.batch[self.batch_size : self.batch_size + n].view(self.dtype),
+                dither=self.dither,
+            )
+            self.batch_size += n
+            offset += n
+            if self.batch_size == self.batch_frames:
+                await self._flush()
@@ -0,0 +1,29 @@
+from typing import Literal
+
+from .base_config import AudioSinkBaseModel, AudioSourceBaseModel
+
+SampleFormat = Literal["u8", "s16", "s24", "s32", "f32", "f64", "mulaw", "alaw"]
+
+
+class FileAudioSourceConfig(AudioSourceBaseModel):
+    mode: Literal["file"] = "file"
+    path: str
+    format: Literal["wav", "raw"] = "wav"
+    # Only used for raw files, WAV files carry their own format.
+    sample_format: SampleFormat = "f32"
+    channels: int = 1
+    milliseconds_per_buffer: float = 20
+    pacing: Literal["realtime", "fast"] = "realtime"
+    loop: bool = False
+
+
+class FileAudioSinkConfig(AudioSinkBaseModel):
+    mode: Literal["file"] = "file"
+    path: str
+    format: Literal["wav", "raw"] = "wav"
+    sample_format: SampleFormat = "f32"
+    channels: int = 1
+    batch_milliseconds: float = 1000
+    max_queue_size: int = 16
+    # TPDF dither when writing 8, 16 or 24 bit samples.
+    dither: bool = False
@@ -0,0 +1,109 @@
+import time
+from typing import Any, Optional
+
+import numpy as np
+from numpy.lib.mixins import NDArrayOperatorsMixin
+
+
+class AudioFrame(NDArrayOperatorsMixin):
+    # Behaves like its `data` array for numpy functions, operators and array
+    # attributes; results of those operations are plain ndarrays.
+    __slots__ = (
+        "data",
+        "sample_rate",
+        "channels",
+        "pts",
+        "capture_time",
+        "seq",
+        "speech",
+    )
+
+    def __init__(
+        self,
+        data: np.ndarray,
+        sample_rate: int,
+        channels: int = 1,
+        pts: int = 0,
+        capture_time: Optional[float] = None,
+        seq: int = 0,
+        speech: Optional[bool] = None,
+    ):
+        self.data = data
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.pts = pts
+        self.capture_time = time.monotonic() if capture_time is None else capture_time
+        self.seq = seq
+        # Set by voice activity detection, None when it has not run.
+        self.speech = speech
+
+    def __repr__(self) -> str:
+        return (
+            f"AudioFrame(shape={self.data.shape}, dtype={self.data.dtype}, "
+            f"sample_rate={self.sample_rate}, channels={self.channels}, "
+            f"pts={self.pts}, seq={self.seq})"
+        )
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __getitem__(self, key) -> np.ndarray:
+        return self.data[key]
+
+    def __getattr__(self, name: str) -> Any:
+        if name in AudioFrame.__slots__:
+            raise AttributeError(name)
+        return getattr(self.data, name)
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        if dtype is None or dtype == self.data.dtype:
+            return self.data.copy() if copy else self.data
+        return self.data.astype(dtype)
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        inputs = tuple(_unwrap(input) for input in inputs)
+        if "out" in kwargs:
+            kwargs["out"] = tuple(_unwrap(out) for out in kwargs["out"])
+        return getattr(ufunc, method)(*inputs, **kwargs)
+
+    @property
+    def frames(self) -> int:
+        return len(self.data)
+
+    @property
+    def duration(self) -> float:
+        return len(self.data) / self.sample_rate
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.capture_time
+
+    def replace(self, **changes) -> "AudioFrame":
+        fields = {name: getattr(self, name) for name in self.__slots__}
+        fields.update(changes)
+        return AudioFrame(**fields)
+
+
+class AudioFrameClock:
+    # Stamps consecutive buffers of one stream with running pts and seq.
+    __slots__ = ("sample_rate", "channels", "pts", "seq")
+
+    def __init__(self, sample_rate: int, channels: int = 1):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.pts = 0
+        self.seq = 0
+
+    def stamp(
+        self, data: np.ndarray, capture_time: Optional[float] = None
+    ) -> AudioFrame:
+        frame = AudioFrame(
+            data, self.sample_rate, self.channels, self.pts, capture_time, self.seq
+        )
+        self.pts += len(data)
+        self.seq += 1
+        return frame
+
+
+def _unwrap(value):
+    return value.data if isinstance(value, AudioFrame) else value
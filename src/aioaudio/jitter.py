@@ -0,0 +1,252 @@
+import asyncio
+import math
+import time
+from bisect import bisect_left, insort
+from collections import deque
+from typing import AsyncIterable, AsyncIterator, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .channels import as_frames
+from .frame import AudioFrame
+
+
+def _extend(value: int, reference: int, bits: int) -> int:
+    mask = (1 << bits) - 1
+    delta = (value - reference) & mask
+    if delta >= 1 << (bits - 1):
+        delta -= 1 << bits
+    return reference + delta
+
+
+class JitterBuffer(AsyncIterable[AudioFrame]):
+    def __init__(
+        self,
+        sampling_rate: int,
+        channels: int = 1,
+        min_delay: float = 0.02,
+        max_delay: float = 0.2,
+        window: int = 64,
+        concealment: str = "fade",
+        max_concealment: int = 5,
+        jitter_factor: float = 3.0,
+        delay_percentile: float = 95.0,
+    ):
+        if concealment not in ("repeat", "fade", "silence"):
+            raise ValueError(f"Unknown concealment: {concealment}")
+        self.sampling_rate = sampling_rate
+        self.channels = channels
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.window = window
+        self.concealment = concealment
+        self.max_concealment = max_concealment
+        self.jitter_factor = jitter_factor
+        self.delay_percentile = delay_percentile
+
+        self.frames: Dict[int, Tuple[int, np.ndarray, float]] = {}
+        self.jitter = 0.0
+        self.target_delay = min_delay
+        self.received = 0
+        self.late = 0
+        self.lost = 0
+        self.concealed = 0
+        self.duplicated = 0
+        self.overflowed = 0
+
+        self._event = asyncio.Event()
+        self._closed = False
+        self._buffered_frames = 0
+        self._base_time: Optional[float] = None
+        # Arrival offsets of the last `window` packets in arrival order and
+        # sorted, so the delay percentile is an index lookup.
+        self._offsets: deque = deque()
+        self._sorted_offsets: List[float] = []
+        self._highest_seq: Optional[int] = None
+        self._highest_ts = 0
+        self._previous_arrival = 0.0
+        self._previous_ts = 0
+        self._next_seq: Optional[int] = None
+        self._next_ts = 0
+        self._last_frame: Optional[np.ndarray] = None
+        self._concealment_run = 0
+
+    @property
+    def depth(self) -> float:
+        return self._buffered_frames / self.sampling_rate
+
+    def put(
+        self,
+        sequence_number: int,
+        timestamp: int,
+        frame: np.ndarray,
+        arrival: Optional[float] = None,
+    ):
+        if arrival is None:
+            arrival = time.monotonic()
+        capture_time = frame.capture_time if isinstance(frame, AudioFrame) else arrival
+        frame = as_frames(np.asarray(frame), self.channels)
+
+        if self._highest_seq is None:
+            seq, ts = sequence_number, timestamp
+            self._highest_seq, self._highest_ts = seq, ts
+            self._base_time = arrival - ts / self.sampling_rate
+            self._next_seq, self._next_ts = seq, ts
+        else:
+            seq = _extend(sequence_number, self._highest_seq, 16)
+            ts = _extend(timestamp, self._highest_ts, 32)
+
+            transit = (arrival - self._previous_arrival) - (
+                ts - self._previous_ts
+            ) / self.sampling_rate
+            self.jitter += (abs(transit) - self.jitter) / 16
+
+            if seq > self._highest_seq:
+                self._highest_seq, self._highest_ts = seq, ts
+
+        self._previous_arrival, self._previous_ts = arrival, ts
+        self.received += 1
+        offset = arrival - ts / self.sampling_rate
+        self._update_target(offset)
+
+        assert self._next_seq is not None and self._base_time is not None
+        if abs(seq - self._next_seq) > self.window:
+            self._reset(seq, ts, arrival)
+        elif seq < self._next_seq:
+            self.late += 1
+            return
+        elif seq in self.frames:
+            self.duplicated += 1
+            return
+
+        if offset < self._base_time:
+            self._base_time = offset
+        elif offset - self._base_time > self.target_delay:
+            self._base_time = offset - self.target_delay
+        self.frames[seq] = (ts, frame, capture_time)
+        self._buffered_frames += len(frame)
+
+        while self.depth > self.max_delay and len(self.frames) > 1:
+            self.overflowed += 1
+            self._skip_to(min(self.frames) + 1)
+
+        self._event.set()
+
+    def _update_target(self, offset: float):
+        # The smoothed RFC 3550 jitter follows the spread of arrivals, the
+        # percentile of delays over the earliest arrival in the window covers
+        # packets that are late or reordered steadily, which the mean hides.
+        offsets = self._sorted_offsets
+        if len(self._offsets) >= self.window:
+            del offsets[bisect_left(offsets, self._offsets.popleft())]
+        self._offsets.append(offset)
+        insort(offsets, offset)
+        # Nearest rank at or above the percentile.
+        rank = math.ceil(self.delay_percentile / 100 * (len(offsets) - 1))
+        delay = offsets[rank] - offsets[0]
+        self.target_delay = min(
+            max(self.jitter_factor * self.jitter, delay + self.jitter, self.min_delay),
+            self.max_delay,
+        )
+
+    def close(self):
+        self._closed = True
+        self._event.set()
+
+    def _reset(self, seq: int, ts: int, arrival: float):
+        self.lost += len(self.frames)
+        self.frames.clear()
+        self._buffered_frames = 0
+        self._base_time = arrival - ts / self.sampling_rate
+        self._offsets.clear()
+        self._offsets.append(self._base_time)
+        self._sorted_offsets[:] = [self._base_time]
+        self._highest_seq, self._highest_ts = seq, ts
+        self._next_seq, self._next_ts = seq, ts
+
+    def _skip_to(self, seq: int):
+        assert self._next_seq is not None
+        while self._next_seq < seq:
+            entry = self.frames.pop(self._next_seq, None)
+            if entry is not None:
+                ts, frame, _ = entry
+                self._buffered_frames -= len(frame)
+                self._next_ts = ts + len(frame)
+            else:
+                self.lost += 1
+            self._next_seq += 1
+
+    def _conceal(self) -> Optional[np.ndarray]:
+        if self._last_frame is None or self._concealment_run >= self.max_concealment:
+            return None
+
+        last = self._last_frame
+        match self.concealment:
+            case "repeat":
+                frame = last
+            case "fade":
+                start = 0.5**self._concealment_run
+                gain = np.linspace(
+                    start, start / 2, len(last), endpoint=False, dtype=np.float32
+                )
+                frame = last * gain[:, None]
+            case _:
+                frame = np.zeros_like(last)
+
+        self._concealment_run += 1
+        self.concealed += 1
+        return frame.astype(last.dtype, copy=False)
+
+    async def _wait(self, timeout: Optional[float]):
+        self._event.clear()
+        # Not wait_for, which can swallow a cancellation that races with the
+        # event being set.
+        event = asyncio.ensure_future(self._event.wait())
+        try:
+            await asyncio.wait((event,), timeout=timeout)
+        finally:
+            event.cancel()
+
+    async def __aiter__(self) -> AsyncIterator[AudioFrame]:
+        while True:
+            if self._next_seq is None or self._base_time is None:
+                if self._closed:
+                    return
+                await self._wait(None)
+                continue
+
+            entry = self.frames.get(self._next_seq)
+            if entry is None and self._closed and not self.frames:
+                return
+
+            ts = entry[0] if entry is not None else self._next_ts
+            deadline = self._base_time + ts / self.sampling_rate + self.target_delay
+            now = time.monotonic()
+            if now < deadline and not self._closed:
+                await self._wait(deadline - now)
+                continue
+
+            if entry is not None:
+                ts, frame, capture_time = self.frames.pop(self._next_seq)
+                seq = self._next_seq
+                self._buffered_frames -= len(frame)
+                self._next_seq += 1
+                self._next_ts = ts + len(frame)
+                self._last_frame = frame
+                self._concealment_run = 0
+                yield AudioFrame(
+                    frame, self.sampling_rate, self.channels, ts, capture_time, seq
+                )
+                continue
+
+            frame = self._conceal()
+            if frame is not None:
+                ts, seq = self._next_ts, self._next_seq
+                self.lost += 1
+                self._next_seq += 1
+                self._next_ts += len(frame)
+                yield AudioFrame(frame, self.sampling_rate, self.channels, ts, now, seq)
+            elif self.frames:
+                self._skip_to(min(self.frames))
+            else:
+                await self._wait(None)
@@ -0,0 +1,14 @@
+from typing import Literal
+
+from pydantic import BaseModel
+
+
+class JitterBufferConfig(BaseModel):
+    min_delay: float = 0.02
+    max_delay: float = 0.2
+    window: int = 64
+    concealment: Literal["repeat", "fade", "silence"] = "fade"
+    max_concealment: int = 5
+    jitter_factor: float = 3.0
+    # Percentile of packet delays in the window the target delay covers.
+    delay_percentile: float = 95.0
@@ -4,9 +4,11 @@ from pydantic import Field
 from typing_extensions import Annotated, deprecated
 
 from .base import AudioSink, AudioSource
+from .file_config import FileAudioSinkConfig, FileAudioSourceConfig
 from .local_config import LocalAudioSinkConfig, LocalAudioSourceConfig
 from .rtmp_config import RTMPAudioSinkConfig
 from .rtp_config import RTPAudioSinkConfig, RTPAudioSourceConfig
+from .shm_config import SharedMemoryAudioSinkConfig, SharedMemoryAudioSourceConfig
 from .void import VoidAudioSink, VoidAudioSource
 from .websocket_config import WebsocketClientAuduioConfig, WebsocketServerAudioConfig
 
@@ -16,6 +18,8 @@ AudioSourceConfig = Annotated[
         WebsocketServerAudioConfig,
         WebsocketClientAuduioConfig,
         RTPAudioSourceConfig,
+        SharedMemoryAudioSourceConfig,
+        FileAudioSourceConfig,
     ],
     Field(discriminator="mode"),
 ]
@@ -27,6 +31,8 @@ AudioSinkConfig = Annotated[
         WebsocketClientAuduioConfig,
         RTPAudioSinkConfig,
         RTMPAudioSinkConfig,
+        SharedMemoryAudioSinkConfig,
+        FileAudioSinkConfig,
     ],
     Field(discriminator="mode"),
 ]
@@ -45,18 +51,38 @@ def load_audio_source(
             return VoidAudioSource()
         case LocalAudioSourceConfig(
             seconds_per_buffer=seconds_per_buffer,
+            milliseconds_per_buffer=milliseconds_per_buffer,
+            ring_buffer_milliseconds=ring_buffer_milliseconds,
+            callback=callback,
             input_device_index=input_device_index,
+            backend=backend,
+            channels=channels,
+            sample_format=sample_format,
         ):
             from .local import LocalAudioSource
 
+            if seconds_per_buffer is not None:
+                milliseconds_per_buffer = seconds_per_buffer * 1000
+
             return LocalAudioSource(
                 sampling_rate,
-                int(seconds_per_buffer * sampling_rate),
+                int(milliseconds_per_buffer * sampling_rate / 1000),
                 input_device_index=input_device_index,
+                callback=callback,
+                ring_buffer_frames=int(ring_buffer_milliseconds * sampling_rate / 1000),
+                backend=backend,
+                channels=channels,
+                sample_format=sample_format,
             )
         case WebsocketServerAudioConfig(
             host=host,
             port=port,
+            formats=formats,
+            jitter_buffer=jitter_buffer,
+            max_queue_size=max_queue_size,
+            overflow_policy=overflow_policy,
+            channels=channels,
+            vad=vad,
         ):
             from .websocket import WebsocketServerAudioSource
 
@@ -64,15 +90,122 @@ def load_audio_source(
                 sampling_rate,
                 host=host,
                 port=port,
+                formats=formats,
+                jitter_buffer=jitter_buffer,
+                max_queue_size=max_queue_size,
+                overflow_policy=overflow_policy,
+                channels=channels,
+                vad=vad,
             )
         case WebsocketClientAuduioConfig(
             url=url,
+            formats=formats,
+            jitter_buffer=jitter_buffer,
+            max_queue_size=max_queue_size,
+            overflow_policy=overflow_policy,
+            channels=channels,
+            vad=vad,
+            reconnect=reconnect,
+            multiplex=multiplex,
         ):
-            from .websocket import WebsocketServerAudioSource
+            from .websocket import WebsocketClientAudioSource
 
-            return WebsocketServerAudioSource(
+            return WebsocketClientAudioSource(
+                sampling_rate,
+                url=url,
+                formats=formats,
+                jitter_buffer=jitter_buffer,
+                max_queue_size=max_queue_size,
+                overflow_policy=overflow_policy,
+                channels=channels,
+                vad=vad,
+                reconnect=reconnect,
+                multiplex=multiplex,
+            )
+        case RTPAudioSourceConfig(
+            engine="native",
+            url=url,
+            payload=payload,
+            payload_type=payload_type,
+            channels=channels,
+            vad=vad,
+            jitter_buffer=jitter_buffer,
+            clock_rate=clock_rate,
+            max_queue_size=max_queue_size,
+        ):
+            from .rtp_native import NativeRTPAudioSource
+
+            return NativeRTPAudioSource(
                 sampling_rate,
                 url=url,
+                payload=payload,
+                payload_type=payload_type,
+                channels=channels,
+                vad=vad,
+                jitter_buffer=jitter_buffer,
+                clock_rate=clock_rate,
+                max_queue_size=max_queue_size,
+            )
+        case RTPAudioSourceConfig(
+            engine="ffmpeg",
+            seconds_per_buffer=seconds_per_buffer,
+            url=url,
+            format=format,
+            payload=payload,
+            payload_type=payload_type,
+            channels=channels,
+            clock_rate=clock_rate,
+        ):
+            from .rtp import RTPAudioSource, rtp_sdp
+
+            return RTPAudioSource(
+                rtp_sdp(
+                    url,
+                    clock_rate or sampling_rate,
+                    channels,
+                    payload,
+                    payload_type,
+                ),
+                format=format,
+                frames_per_buffer=int(seconds_per_buffer * sampling_rate),
+                sampling_rate=sampling_rate,
+                channels=channels,
+            )
+        case SharedMemoryAudioSourceConfig(
+            name=name,
+            channels=channels,
+            copy_frames=copy_frames,
+            attach_timeout=attach_timeout,
+        ):
+            from .shm import SharedMemoryAudioSource
+
+            return SharedMemoryAudioSource(
+                sampling_rate,
+                name=name,
+                channels=channels,
+                copy=copy_frames,
+                attach_timeout=attach_timeout,
+            )
+        case FileAudioSourceConfig(
+            path=path,
+            format=format,
+            sample_format=sample_format,
+            channels=channels,
+            milliseconds_per_buffer=milliseconds_per_buffer,
+            pacing=pacing,
+            loop=loop,
+        ):
+            from .file import FileAudioSource
+
+            return FileAudioSource(
+                sampling_rate,
+                path=path,
+                format=format,
+                sample_format=sample_format,
+                channels=channels,
+                frames_per_buffer=int(milliseconds_per_buffer * sampling_rate / 1000),
+                pacing=pacing,
+                loop=loop,
             )
         case _:
             raise NotImplementedError("Unknown audio source for config %s", config)
@@ -89,16 +222,33 @@ def load_audio_sink(config: Optional[AudioSinkConfig], sampling_rate: int) -> Au
             return VoidAudioSink()
         case LocalAudioSinkConfig(
             output_device_index=output_device_index,
+            milliseconds_per_buffer=milliseconds_per_buffer,
+            max_queue_size=max_queue_size,
+            backend=backend,
+            channels=channels,
+            sample_format=sample_format,
+            dither=dither,
         ):
             from .local import LocalAudioSink
 
             return LocalAudioSink(
                 sampling_rate,
                 output_device_index=output_device_index,
+                frames_per_buffer=int(milliseconds_per_buffer * sampling_rate / 1000),
+                max_queue_size=max_queue_size,
+                backend=backend,
+                channels=channels,
+                sample_format=sample_format,
+                dither=dither,
             )
         case WebsocketServerAudioConfig(
             host=host,
             port=port,
+            formats=formats,
+            client_queue_size=client_queue_size,
+            slow_client_policy=slow_client_policy,
+            channels=channels,
+            vad=vad,
         ):
             from .websocket import WebsocketServerAudioSink
 
@@ -106,32 +256,83 @@ def load_audio_sink(config: Optional[AudioSinkConfig], sampling_rate: int) -> Au
                 sampling_rate,
                 host=host,
                 port=port,
+                formats=formats,
+                client_queue_size=client_queue_size,
+                slow_client_policy=slow_client_policy,
+                channels=channels,
+                vad=vad,
             )
         case WebsocketClientAuduioConfig(
             url=url,
+            formats=formats,
+            channels=channels,
+            vad=vad,
+            reconnect=reconnect,
+            multiplex=multiplex,
         ):
             from .websocket import WebsocketClientAudioSink
 
             return WebsocketClientAudioSink(
                 sampling_rate,
                 url=url,
+                formats=formats,
+                channels=channels,
+                vad=vad,
+                reconnect=reconnect,
+                multiplex=multiplex,
+            )
+        case RTPAudioSinkConfig(
+            engine="native",
+            url=url,
+            payload=payload,
+            payload_type=payload_type,
+            channels=channels,
+            vad=vad,
+            clock_rate=clock_rate,
+        ):
+            from .rtp_native import NativeRTPAudioSink
+
+            return NativeRTPAudioSink(
+                sampling_rate,
+                url=url,
+                payload=payload,
+                payload_type=payload_type,
+                channels=channels,
+                vad=vad,
+                clock_rate=clock_rate,
             )
         case RTPAudioSinkConfig(
+            engine="ffmpeg",
             format=format,
             channels=channels,
             url=url,
+            payload=payload,
+            payload_type=payload_type,
+            clock_rate=clock_rate,
+            max_queue_size=max_queue_size,
+            warm_spare=warm_spare,
         ):
             from .rtp import RTPAudioSink
 
             return RTPAudioSink(
                 sampling_rate,
+                format=format,
+                channels=channels,
                 url=url,
+                payload=payload,
+                payload_type=payload_type,
+                clock_rate=clock_rate,
+                max_queue_size=max_queue_size,
+                warm_spare=warm_spare,
             )
         case RTMPAudioSinkConfig(
             format=format,
             channels=channels,
             url=url,
             keep_alive_interval=keep_alive_interval,
+            max_queue_size=max_queue_size,
+            warm_spare=warm_spare,
+            paced=paced,
         ):
             from .rtmp import RTMPAudioSink
 
@@ -141,6 +342,45 @@ def load_audio_sink(config: Optional[AudioSinkConfig], sampling_rate: int) -> Au
                 channels=channels,
                 url=url,
                 keep_alive_interval=keep_alive_interval,
+                max_queue_size=max_queue_size,
+                warm_spare=warm_spare,
+                paced=paced,
+            )
+        case SharedMemoryAudioSinkConfig(
+            name=name,
+            channels=channels,
+            ring_buffer_milliseconds=ring_buffer_milliseconds,
+            slots=slots,
+        ):
+            from .shm import SharedMemoryAudioSink
+
+            return SharedMemoryAudioSink(
+                sampling_rate,
+                name=name,
+                channels=channels,
+                capacity=int(ring_buffer_milliseconds * sampling_rate / 1000),
+                slots=slots,
+            )
+        case FileAudioSinkConfig(
+            path=path,
+            format=format,
+            sample_format=sample_format,
+            channels=channels,
+            batch_milliseconds=batch_milliseconds,
+            max_queue_size=max_queue_size,
+            dither=dither,
+        ):
+            from .file import FileAudioSink
+
+            return FileAudioSink(
+                sampling_rate,
+                path=path,
+                format=format,
+                sample_format=sample_format,
+                channels=channels,
+                batch_frames=int(batch_milliseconds * sampling_rate / 1000),
+                max_queue_size=max_queue_size,
+                dither=dither,
             )
         case _:
             raise NotImplementedError("Unknown audio sink for config %s", config)
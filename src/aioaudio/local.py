@@ -1,9 +1,46 @@
 import asyncio
+import queue
+import threading
+import time
 from typing import AsyncIterator, Optional
 
 import numpy as np
 
 from .base import AudioSink, AudioSource
+from .channels import as_frames
+from .convert import SAMPLE_WIDTHS, decode, encode
+from .frame import AudioFrame, AudioFrameClock
+from .ring import AudioRingBuffer
+
+
+def load_backend(name: str):
+    match name:
+        case "pyaudio":
+            import pyaudio
+
+            return pyaudio
+        case "fake":
+            from . import fake_pyaudio
+
+            return fake_pyaudio
+        case _:
+            raise ValueError(f"Unknown audio backend: {name}")
+
+
+def pyaudio_format(pyaudio, sample_format: str) -> int:
+    match sample_format:
+        case "f32":
+            return pyaudio.paFloat32
+        case "s32":
+            return pyaudio.paInt32
+        case "s24":
+            return pyaudio.paInt24
+        case "s16":
+            return pyaudio.paInt16
+        case "u8":
+            return pyaudio.paUInt8
+        case _:
+            raise ValueError(f"Unsupported device sample format: {sample_format}")
 
 
 class LocalAudioSource(AudioSource):
@@ -12,40 +49,109 @@ class LocalAudioSource(AudioSource):
         sampling_rate: int,
         frames_per_buffer: int,
         input_device_index: Optional[int] = None,
+        callback: bool = True,
+        ring_buffer_frames: Optional[int] = None,
+        backend: str = "pyaudio",
+        channels: int = 1,
+        sample_format: str = "f32",
     ):
         self.sampling_rate = sampling_rate
+        self.channels = channels
+        self.sample_format = sample_format
         self.frames_per_buffer = frames_per_buffer
         self.input_device_index = input_device_index
+        self.callback = callback
+        self.ring_buffer_frames = ring_buffer_frames or max(
+            frames_per_buffer * 16, sampling_rate // 2
+        )
+        self.backend = backend
+        self.overflowed = 0
 
     async def __aenter__(self):
-        import pyaudio
-
+        pyaudio = load_backend(self.backend)
+
+        self.loop = asyncio.get_running_loop()
+        self.ready = asyncio.Event()
+        self.waiting = False
+        self.closed = False
+        self.ring = AudioRingBuffer(self.ring_buffer_frames, self.channels)
+        self.clock = AudioFrameClock(self.sampling_rate, self.channels)
+        self.pyaudio = pyaudio
         self.pa = pyaudio.PyAudio()
         self.stream = self.pa.open(
             rate=self.sampling_rate,
-            channels=1,
-            format=pyaudio.paFloat32,
+            channels=self.channels,
+            format=pyaudio_format(pyaudio, self.sample_format),
             input=True,
             frames_per_buffer=self.frames_per_buffer,
             input_device_index=self.input_device_index,
+            stream_callback=self._on_audio if self.callback else None,
         )
         self.stream.start_stream()
         return self
 
     async def __aexit__(self, *_, **__):
+        # Wakes a consumer waiting for audio so it sees the source closed.
+        self.closed = True
+        self.ready.set()
         self.stream.stop_stream()
         self.stream.close()
         self.pa.terminate()
 
-    async def __aiter__(self) -> AsyncIterator[np.ndarray]:
-        while self.stream.is_active():
-            audio_bytes = await asyncio.to_thread(
-                self.stream.read, self.frames_per_buffer
-            )
-            yield np.frombuffer(audio_bytes, dtype=np.float32)
+    def _decode(self, data: bytes) -> np.ndarray:
+        return as_frames(decode(data, self.sample_format), self.channels)
+
+    def _on_audio(self, in_data: bytes, frame_count: int, time_info, status):
+        audio = self._decode(in_data)
+        written = self.ring.write(audio, overwrite=False)
+        self.overflowed += len(audio) - written
+
+        if self.waiting and len(self.ring) >= self.frames_per_buffer:
+            self.waiting = False
+            self.loop.call_soon_threadsafe(self.ready.set)
+        return None, self.pyaudio.paContinue
+
+    async def __aiter__(self) -> AsyncIterator[AudioFrame]:
+        if not self.callback:
+            while self.stream.is_active():
+                audio_bytes = await asyncio.to_thread(
+                    self.stream.read, self.frames_per_buffer
+                )
+                yield self.clock.stamp(
+                    self._decode(audio_bytes),
+                    time.monotonic() - self.frames_per_buffer / self.sampling_rate,
+                )
+            return
+
+        # PyAudio has no stream finished notification, so waits time out after
+        # a few buffers to check whether the stream is still running.
+        timeout = 4 * self.frames_per_buffer / self.sampling_rate
+        while True:
+            if len(self.ring) < self.frames_per_buffer:
+                if not self.is_active():
+                    return
+                self.ready.clear()
+                self.waiting = True
+                if len(self.ring) < self.frames_per_buffer and not self.closed:
+                    # Not wait_for, which can swallow a cancellation that races
+                    # with the event being set and keep the loop running.
+                    ready = asyncio.ensure_future(self.ready.wait())
+                    try:
+                        await asyncio.wait((ready,), timeout=timeout)
+                    finally:
+                        ready.cancel()
+                self.waiting = False
+                continue
+
+            # The newest buffered frame was just captured, so the oldest one is
+            # as old as the ring is long.
+            capture_time = time.monotonic() - len(self.ring) / self.sampling_rate
+            audio = self.ring.peek(self.frames_per_buffer).copy()
+            self.ring.consume(self.frames_per_buffer)
+            yield self.clock.stamp(audio, capture_time)
 
     def is_active(self) -> bool:
-        return self.stream.is_active()
+        return not self.closed and self.stream.is_active()
 
 
 class LocalAudioSink(AudioSink):
@@ -53,29 +159,60 @@ class LocalAudioSink(AudioSink):
         self,
         sampling_rate: int,
         output_device_index: Optional[int] = None,
+        frames_per_buffer: int = 1024,
+        max_queue_size: int = 8,
+        backend: str = "pyaudio",
+        channels: int = 1,
+        sample_format: str = "f32",
+        dither: bool = False,
     ):
+        if sample_format not in SAMPLE_WIDTHS:
+            raise ValueError(f"Unsupported device sample format: {sample_format}")
         self.sampling_rate = sampling_rate
+        self.channels = channels
+        self.sample_format = sample_format
+        self.dither = dither
         self.output_device_index = output_device_index
+        self.frames_per_buffer = frames_per_buffer
+        self.max_queue_size = max_queue_size
+        self.backend = backend
 
     async def __aenter__(self):
-        import pyaudio
+        pyaudio = load_backend(self.backend)
 
         self.pa = pyaudio.PyAudio()
         self.stream = self.pa.open(
             rate=self.sampling_rate,
-            channels=1,
-            format=pyaudio.paFloat32,
+            channels=self.channels,
+            format=pyaudio_format(pyaudio, self.sample_format),
             output=True,
+            frames_per_buffer=self.frames_per_buffer,
             output_device_index=self.output_device_index,
         )
 
         self.stream.start_stream()
+        self.queue: queue.Queue[Optional[bytes]] = queue.Queue(self.max_queue_size)
+        self.writer = threading.Thread(target=self._write_loop, daemon=True)
+        self.writer.start()
         return self
 
     async def __aexit__(self, *args, **kwargs):
+        await asyncio.to_thread(self.queue.put, None)
+        await asyncio.to_thread(self.writer.join)
         self.stream.stop_stream()
         self.stream.close()
         self.pa.terminate()
 
+    def _write_loop(self):
+        while True:
+            data = self.queue.get()
+            if data is None:
+                return
+            self.stream.write(data)
+
     async def write(self, audio: np.ndarray):
-        await asyncio.to_thread(self.stream.write, audio.tobytes())
+        data = encode(audio, self.sample_format, dither=self.dither).tobytes()
+        try:
+            self.queue.put_nowait(data)
+        except queue.Full:
+            await asyncio.to_thread(self.queue.put, data)
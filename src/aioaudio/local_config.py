@@ -2,13 +2,28 @@ from typing import Literal, Optional
 
 from .base_config import AudioSinkBaseModel, AudioSourceBaseModel
 
+DeviceSampleFormat = Literal["f32", "s32", "s24", "s16", "u8"]
+
 
 class LocalAudioSourceConfig(AudioSourceBaseModel):
     mode: Literal["local"] = "local"
-    seconds_per_buffer: float = 10
+    seconds_per_buffer: Optional[float] = None
+    milliseconds_per_buffer: float = 20
+    ring_buffer_milliseconds: float = 500
+    callback: bool = True
     input_device_index: Optional[int] = None
+    channels: int = 1
+    backend: Literal["pyaudio", "fake"] = "pyaudio"
+    # Sample format requested from the device, converted to float32.
+    sample_format: DeviceSampleFormat = "f32"
 
 
 class LocalAudioSinkConfig(AudioSinkBaseModel):
     mode: Literal["local"] = "local"
     output_device_index: Optional[int] = None
+    channels: int = 1
+    milliseconds_per_buffer: float = 20
+    max_queue_size: int = 8
+    backend: Literal["pyaudio", "fake"] = "pyaudio"
+    sample_format: DeviceSampleFormat = "f32"
+    dither: bool = False
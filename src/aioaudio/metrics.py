@@ -0,0 +1,318 @@
+import asyncio
+from bisect import bisect_left
+import logging
+import time
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import numpy as np
+
+from .base import AudioSink, AudioSource
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (
+    0.0001,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+)
+
+# Attributes that sources, sinks and their helpers already keep up to date and
+# that are read, not pushed, whenever a snapshot is taken.
+GAUGE_ATTRIBUTES = (
+    "queue_depth",
+    "dropped",
+    "dropped_frames",
+    "coalesced_frames",
+    "overflowed",
+    "underruns",
+    "restarts",
+    "reconnects",
+    "drain_seconds",
+    "max_drain_seconds",
+)
+
+Snapshot = Dict[str, Dict[str, Any]]
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        cumulative = np.cumsum(self.counts).tolist()
+        return dict(
+            buckets=list(zip([*self.buckets, float("inf")], cumulative)),
+            sum=self.sum,
+            count=self.count,
+        )
+
+
+class AudioMetrics:
+    def __init__(self, name: str, kind: str, target: Any):
+        self.name = name
+        self.kind = kind
+        self.target = target
+        self.buffers = 0
+        self.frames = 0
+        self.bytes = 0
+        self.errors = 0
+        self.latency = Histogram()
+        self.age = Histogram()
+
+    def record(self, audio, elapsed: float):
+        self.buffers += 1
+        self.frames += len(audio)
+        self.bytes += audio.nbytes
+        self.latency.observe(elapsed)
+        capture_time = getattr(audio, "capture_time", None)
+        if capture_time is not None:
+            self.age.observe(time.monotonic() - capture_time)
+
+    def gauges(self) -> Dict[str, float]:
+        gauges: Dict[str, float] = {}
+        for target in (self.target, getattr(self.target, "worker", None)):
+            if target is None:
+                continue
+            for attribute in GAUGE_ATTRIBUTES:
+                value = getattr(target, attribute, None)
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    gauges[attribute] = gauges.get(attribute, 0) + value
+        return gauges
+
+    def snapshot(self) -> Dict[str, Any]:
+        return dict(
+            kind=self.kind,
+            type=type(self.target).__name__,
+            buffers=self.buffers,
+            frames=self.frames,
+            bytes=self.bytes,
+            errors=self.errors,
+            latency=self.latency.snapshot(),
+            age=self.age.snapshot(),
+            gauges=self.gauges(),
+        )
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: Dict[str, AudioMetrics] = {}
+        self.exporters: List[Callable[[Snapshot], Any]] = []
+
+    def register(self, target: Any, kind: str, name: Optional[str] = None):
+        if name is None:
+            name = f"{type(target).__name__}-{len(self.metrics)}"
+        if name in self.metrics:
+            raise ValueError(f"Metrics name already registered: {name}")
+        metrics = self.metrics[name] = AudioMetrics(name, kind, target)
+        return metrics
+
+    def unregister(self, name: str):
+        self.metrics.pop(name, None)
+
+    def snapshot(self) -> Snapshot:
+        return {name: metrics.snapshot() for name, metrics in self.metrics.items()}
+
+    def add_exporter(self, exporter: Callable[[Snapshot], Any]):
+        self.exporters.append(exporter)
+
+    def export(self):
+        snapshot = self.snapshot()
+        for exporter in self.exporters:
+            try:
+                exporter(snapshot)
+            except Exception:
+                logger.exception(f"Metrics exporter {exporter} failed")
+
+    async def export_periodically(self, interval: float = 10.0):
+        while True:
+            await asyncio.sleep(interval)
+            self.export()
+
+    def prometheus(self) -> str:
+        return prometheus_text(self.snapshot())
+
+
+default_registry = MetricsRegistry()
+
+
+class InstrumentedAudioSource(AudioSource):
+    # Wraps a source because `async for` resolves __aiter__ on the type, so
+    # the counting cannot be patched onto the instance like sink writes.
+    def __init__(self, source: AudioSource, metrics: AudioMetrics):
+        self.source = source
+        self.metrics = metrics
+
+    async def __aenter__(self):
+        await self.source.__aenter__()
+        return self
+
+    async def __aexit__(self, *args, **kwargs):
+        return await self.source.__aexit__(*args, **kwargs)
+
+    async def __aiter__(self) -> AsyncIterator[np.ndarray]:
+        metrics = self.metrics
+        started = time.perf_counter()
+        async for audio in self.source:
+            now = time.perf_counter()
+            metrics.record(audio, now - started)
+            yield audio
+            started = time.perf_counter()
+
+    def is_active(self) -> bool:
+        return self.source.is_active()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.source, name)
+
+
+def instrument_source(
+    source: AudioSource,
+    registry: Optional[MetricsRegistry] = None,
+    name: Optional[str] = None,
+) -> InstrumentedAudioSource:
+    metrics = (registry or default_registry).register(source, "source", name)
+    return InstrumentedAudioSource(source, metrics)
+
+
+def instrument_sink(
+    sink: AudioSink,
+    registry: Optional[MetricsRegistry] = None,
+    name: Optional[str] = None,
+) -> AudioSink:
+    metrics = (registry or default_registry).register(sink, "sink", name)
+    write = sink.write
+
+    async def instrumented_write(audio):
+        started = time.perf_counter()
+        try:
+            await write(audio)
+        except Exception:
+            metrics.errors += 1
+            raise
+        metrics.record(audio, time.perf_counter() - started)
+
+    sink.write = instrumented_write  # type: ignore[method-assign]
+    sink.metrics = metrics  # type: ignore[attr-defined]
+    return sink
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    pairs = (
+        '{}="{}"'.format(
+            key, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        )
+        for key, value in labels.items()
+    )
+    return "{" + ",".join(pairs) + "}"
+
+
+def prometheus_text(snapshot: Snapshot, prefix: str = "aioaudio") -> str:
+    families: Dict[Tuple[str, str], List[str]] = {}
+
+    def sample(metric: str, type: str, labels: Dict[str, str], value, suffix=""):
+        name = f"{prefix}_{metric}"
+        families.setdefault((name, type), []).append(
+            f"{name}{suffix}{_labels(labels)} {value}"
+        )
+
+    for name, metrics in snapshot.items():
+        labels = dict(name=name, kind=metrics["kind"], type=metrics["type"])
+        for counter in ("buffers", "frames", "bytes", "errors"):
+            sample(f"{counter}_total", "counter", labels, metrics[counter])
+        for key, metric in (("latency", "blocked_seconds"), ("age", "age_seconds")):
+            histogram = metrics[key]
+            for bound, count in histogram["buckets"]:
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                sample(metric, "histogram", {**labels, "le": le}, count, "_bucket")
+            sample(metric, "histogram", labels, histogram["sum"], "_sum")
+            sample(metric, "histogram", labels, histogram["count"], "_count")
+        for gauge, value in metrics["gauges"].items():
+            sample(gauge, "gauge", labels, value)
+
+    lines = []
+    for (metric, type), samples in families.items():
+        lines.append(f"# TYPE {metric} {type}")
+        lines.extend(samples)
+    return "\n".join(lines) + "\n"
+
+
+class OpenTelemetryExporter:
+    # Publishes registry snapshots through OpenTelemetry observable
+    # instruments; requires the optional opentelemetry-api package.
+    def __init__(
+        self, registry: Optional[MetricsRegistry] = None, meter_name: str = "aioaudio"
+    ):
+        from opentelemetry import metrics
+        from opentelemetry.metrics import Observation
+
+        self.registry = registry or default_registry
+        self.observation = Observation
+        meter = metrics.get_meter(meter_name)
+        for counter in ("buffers", "frames", "bytes", "errors"):
+            meter.create_observable_counter(
+                f"aioaudio.{counter}", callbacks=[self._callback(counter)]
+            )
+        for gauge in GAUGE_ATTRIBUTES:
+            meter.create_observable_gauge(
+                f"aioaudio.{gauge}", callbacks=[self._gauge_callback(gauge)]
+            )
+
+    @staticmethod
+    def is_available() -> bool:
+        try:
+            import opentelemetry.metrics  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def _attributes(self, name: str, metrics: Dict[str, Any]) -> Dict[str, str]:
+        return dict(name=name, kind=metrics["kind"], type=metrics["type"])
+
+    def _callback(self, counter: str):
+        def callback(options):
+            return [
+                self.observation(metrics[counter], self._attributes(name, metrics))
+                for name, metrics in self.registry.snapshot().items()
+            ]
+
+        return callback
+
+    def _gauge_callback(self, gauge: str):
+        def callback(options):
+            return [
+                self.observation(
+                    metrics["gauges"][gauge], self._attributes(name, metrics)
+                )
+                for name, metrics in self.registry.snapshot().items()
+                if gauge in metrics["gauges"]
+            ]
+
+        return callback
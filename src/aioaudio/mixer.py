@@ -0,0 +1,164 @@
+import asyncio
+from contextlib import AsyncExitStack
+import time
+from typing import AsyncIterator, List, Optional, Sequence
+
+import numpy as np
+
+from .base import AudioSource
+from .channels import remix
+from .frame import AudioFrame, AudioFrameClock
+from .ring import AudioRingBuffer
+
+
+def soft_clip(audio: np.ndarray, threshold: float = 0.8) -> np.ndarray:
+    # Linear below the threshold, tanh knee above it, never exceeds +-1. A
+    # threshold of 1 or more leaves no room for a knee and clips hard.
+    if threshold < 0:
+        raise ValueError("threshold must not be negative")
+    if threshold >= 1:
+        return np.clip(audio, -1, 1)
+    magnitude = np.abs(audio)
+    knee = 1 - threshold
+    compressed = threshold + knee * np.tanh((magnitude - threshold) / knee)
+    return np.where(magnitude > threshold, np.copysign(compressed, audio), audio)
+
+
+class AudioMixerInput:
+    def __init__(
+        self,
+        source: AudioSource,
+        capacity: int,
+        channels: int,
+    ):
+        self.source = source
+        self.ring = AudioRingBuffer(capacity, channels)
+        # Set by the mixer after each read so a waiting writer can continue.
+        self.space = asyncio.Event()
+        self.primed = False
+        self.underruns = 0
+
+    async def write(self, audio: np.ndarray):
+        # Inputs faster than real time wait for the mixer instead of
+        # overwriting audio it has not read yet.
+        audio = remix(audio.reshape(len(audio), -1), self.ring.channels)
+        while True:
+            audio = audio[self.ring.write(audio, overwrite=False) :]
+            if not len(audio):
+                return
+            self.space.clear()
+            await self.space.wait()
+
+    def is_active(self) -> bool:
+        return self.source.is_active() or len(self.ring) > 0
+
+
+class AudioMixer(AudioSource):
+    def __init__(
+        self,
+        sampling_rate: int,
+        sources: Sequence[AudioSource],
+        gains: Optional[Sequence[float]] = None,
+        frames_per_buffer: int = 320,
+        channels: int = 1,
+        delay_frames: Optional[int] = None,
+        ring_buffer_frames: Optional[int] = None,
+        clip_threshold: Optional[float] = 0.8,
+    ):
+        if gains is not None and len(gains) != len(sources):
+            raise ValueError("gains must have one entry per source")
+        if clip_threshold is not None and clip_threshold < 0:
+            raise ValueError("clip_threshold must not be negative")
+        self.sampling_rate = sampling_rate
+        self.frames_per_buffer = frames_per_buffer
+        self.channels = channels
+        self.delay_frames = frames_per_buffer if delay_frames is None else delay_frames
+        self.clip_threshold = clip_threshold
+        capacity = ring_buffer_frames or max(
+            4 * (frames_per_buffer + self.delay_frames), sampling_rate // 2
+        )
+        self.inputs: List[AudioMixerInput] = [
+            AudioMixerInput(source, capacity, channels) for source in sources
+        ]
+        self.gains = np.array(
+            gains if gains is not None else [1.0] * len(sources), dtype=np.float32
+        )
+        self.stack = np.zeros(
+            (len(self.inputs), frames_per_buffer, channels), dtype=np.float32
+        )
+
+    def set_gain(self, index: int, gain: float):
+        self.gains[index] = gain
+
+    async def __aenter__(self):
+        self.stack_context = AsyncExitStack()
+        await self.stack_context.__aenter__()
+        for input in self.inputs:
+            await self.stack_context.enter_async_context(input.source)
+        self.tasks = [
+            asyncio.create_task(self._forward(input)) for input in self.inputs
+        ]
+        return self
+
+    async def __aexit__(self, *args, **kwargs):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        await self.stack_context.__aexit__(*args, **kwargs)
+
+    async def _forward(self, input: AudioMixerInput):
+        async for audio in input.source:
+            await input.write(audio)
+
+    def _gather(self, input: AudioMixerInput, out: np.ndarray):
+        frames = len(out)
+        ring = input.ring
+        if not input.primed:
+            if len(ring) < frames + self.delay_frames and input.source.is_active():
+                out[:] = 0
+                return
+            input.primed = True
+
+        available = min(len(ring), frames)
+        out[:available] = ring.read(available)
+        input.space.set()
+        if available < frames:
+            out[available:] = 0
+            input.primed = False
+            if input.source.is_active():
+                input.underruns += 1
+
+    def mix(self) -> np.ndarray:
+        for input, out in zip(self.inputs, self.stack):
+            self._gather(input, out)
+        mixed = np.einsum("n,nfc->fc", self.gains, self.stack)
+        if self.clip_threshold is not None:
+            mixed = soft_clip(mixed, self.clip_threshold)
+        return mixed.astype(np.float32, copy=False)
+
+    async def __aiter__(self) -> AsyncIterator[AudioFrame]:
+        clock = AudioFrameClock(self.sampling_rate, self.channels)
+        interval = self.frames_per_buffer / self.sampling_rate
+        deadline = time.monotonic()
+        while self.is_active():
+            deadline += interval
+            delay = deadline - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            elif delay < -interval:
+                deadline = time.monotonic()
+            yield clock.stamp(self.mix())
+
+    def stats(self) -> List[dict]:
+        return [
+            dict(
+                gain=float(gain),
+                buffered=len(input.ring),
+                overflowed=input.ring.overflowed,
+                underruns=input.underruns,
+            )
+            for input, gain in zip(self.inputs, self.gains)
+        ]
+
+    def is_active(self) -> bool:
+        return any(input.is_active() for input in self.inputs)
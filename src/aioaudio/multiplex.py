@@ -0,0 +1,255 @@
+import asyncio
+import itertools
+import json
+import logging
+import struct
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple, Union
+
+from websockets.client import connect
+from websockets.exceptions import ConnectionClosed
+
+logger = logging.getLogger(__name__)
+
+# Binary messages carry the stream id in front of the payload, text messages
+# are wrapped as {"stream": id, "message": text}.
+STREAM_HEADER = struct.Struct("!I")
+
+Message = Union[bytes, str]
+
+
+class MultiplexedStream:
+    # One logical stream of a multiplexed connection. It implements the part
+    # of the websocket protocol interface the audio sources and sinks use, so
+    # they run unchanged on top of it. Received messages are queued up to
+    # `max_queue_size`; when full, "block" holds up the whole connection like
+    # a slow reader of a plain websocket would, other policies drop the oldest.
+    def __init__(
+        self,
+        multiplexer: "WebsocketMultiplexer",
+        stream_id: int,
+        max_queue_size: int = 0,
+        overflow_policy: str = "block",
+    ):
+        self.multiplexer = multiplexer
+        self.stream_id = stream_id
+        self.messages: asyncio.Queue[Optional[Message]] = asyncio.Queue(max_queue_size)
+        self.overflow_policy = overflow_policy
+        self.closed_event = asyncio.Event()
+        self.dropped_messages = 0
+
+    @property
+    def closed(self) -> bool:
+        return self.closed_event.is_set()
+
+    @property
+    def remote_address(self) -> Any:
+        return self.multiplexer.websocket.remote_address
+
+    async def send(self, message: Message):
+        if self.closed:
+            raise ConnectionClosed(None, None)
+        await self.multiplexer.send(self.stream_id, message)
+
+    async def recv(self) -> Message:
+        if self.closed and self.messages.empty():
+            raise ConnectionClosed(None, None)
+        message = await self.messages.get()
+        if message is None:
+            raise ConnectionClosed(None, None)
+        return message
+
+    async def __aiter__(self):
+        while True:
+            try:
+                yield await self.recv()
+            except ConnectionClosed:
+                return
+
+    async def close(self, code: int = 1000, reason: str = ""):
+        if self.closed:
+            return
+        self._on_closed()
+        await self.multiplexer.close_stream(self.stream_id)
+
+    async def wait_closed(self):
+        await self.closed_event.wait()
+
+    async def _put(self, message: Message):
+        if self.closed:
+            return
+        if not self.messages.full():
+            self.messages.put_nowait(message)
+            return
+        if self.overflow_policy != "block":
+            self._drop_oldest()
+            self.messages.put_nowait(message)
+            return
+        # Waits for the reader, or for the stream to close so a reader that
+        # went away does not stall the other streams forever.
+        put = asyncio.ensure_future(self.messages.put(message))
+        closed = asyncio.ensure_future(self.closed_event.wait())
+        await asyncio.wait((put, closed), return_when=asyncio.FIRST_COMPLETED)
+        put.cancel()
+        closed.cancel()
+
+    def _drop_oldest(self):
+        self.messages.get_nowait()
+        self.dropped_messages += 1
+
+    def _on_closed(self):
+        self.closed_event.set()
+        # Wakes a waiting reader.
+        if self.messages.full():
+            self._drop_oldest()
+        self.messages.put_nowait(None)
+
+
+class WebsocketMultiplexer:
+    # Demultiplexes one websocket connection into MultiplexedStreams. Servers
+    # pass `on_stream`, which runs for every stream the peer opens; clients
+    # open streams themselves and close the connection with the last one.
+    def __init__(
+        self,
+        websocket: Any,
+        on_stream: Optional[Callable[[MultiplexedStream], Awaitable[Any]]] = None,
+        max_queue_size: int = 0,
+        overflow_policy: str = "block",
+    ):
+        self.websocket = websocket
+        self.on_stream = on_stream
+        # Limits of the streams the peer opens.
+        self.max_queue_size = max_queue_size
+        self.overflow_policy = overflow_policy
+        self.streams: Dict[int, MultiplexedStream] = {}
+        self.handlers: Set[asyncio.Task] = set()
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def closed(self) -> bool:
+        return self.websocket.closed
+
+    def open(
+        self,
+        stream_id: int,
+        max_queue_size: Optional[int] = None,
+        overflow_policy: Optional[str] = None,
+    ) -> MultiplexedStream:
+        stream = self.streams[stream_id] = MultiplexedStream(
+            self,
+            stream_id,
+            self.max_queue_size if max_queue_size is None else max_queue_size,
+            overflow_policy or self.overflow_policy,
+        )
+        return stream
+
+    async def send(self, stream_id: int, message: Message):
+        if isinstance(message, str):
+            await self.websocket.send(
+                json.dumps(dict(stream=stream_id, message=message))
+            )
+        else:
+            await self.websocket.send(STREAM_HEADER.pack(stream_id) + message)
+
+    async def close_stream(self, stream_id: int):
+        self.streams.pop(stream_id, None)
+        try:
+            await self.websocket.send(json.dumps(dict(stream=stream_id, type="close")))
+            if self.on_stream is None and not self.streams:
+                await self.websocket.close()
+        except ConnectionClosed:
+            pass
+
+    async def _dispatch(self, message: Message):
+        if isinstance(message, bytes):
+            (stream_id,) = STREAM_HEADER.unpack_from(message)
+            payload: Message = message[STREAM_HEADER.size :]
+        else:
+            try:
+                envelope = json.loads(message)
+                stream_id = int(envelope["stream"])
+            except (ValueError, KeyError, TypeError):
+                logger.warning(f"Received invalid multiplexed message: {message}")
+                return
+            if envelope.get("type") == "close":
+                stream = self.streams.pop(stream_id, None)
+                if stream is not None:
+                    stream._on_closed()
+                return
+            payload = envelope.get("message", "")
+
+        stream = self.streams.get(stream_id)
+        if stream is None:
+            if self.on_stream is None:
+                return
+            stream = self.open(stream_id)
+            handler = asyncio.create_task(self.on_stream(stream))
+            self.handlers.add(handler)
+            handler.add_done_callback(self.handlers.discard)
+        await stream._put(payload)
+
+    async def run(self):
+        try:
+            async for message in self.websocket:
+                await self._dispatch(message)
+        except ConnectionClosed:
+            pass
+        finally:
+            for stream in self.streams.values():
+                stream._on_closed()
+            self.streams.clear()
+            # Handlers see their streams closed and finish on their own.
+            await asyncio.gather(*self.handlers, return_exceptions=True)
+
+
+class WebsocketConnectionPool:
+    # Shares one multiplexed connection per URL between the client sources
+    # and sinks of an event loop. Connection options are taken from whichever
+    # stream opens the connection.
+    handshake_timeout = 1.0
+
+    def __init__(self):
+        self.connections: Dict[
+            str,
+            Tuple[
+                asyncio.AbstractEventLoop, asyncio.Lock, Optional[WebsocketMultiplexer]
+            ],
+        ] = {}
+        self.stream_ids = itertools.count(1)
+
+    async def _connect(self, url: str, **kwargs) -> WebsocketMultiplexer:
+        websocket = await connect(url, **kwargs)
+        try:
+            await websocket.send(json.dumps(dict(multiplex=True)))
+            hello = json.loads(
+                await asyncio.wait_for(websocket.recv(), self.handshake_timeout)
+            )
+            if not isinstance(hello, dict) or not hello.get("multiplex"):
+                raise ConnectionError(f"{url} does not support multiplexing")
+        except BaseException:
+            await websocket.close()
+            raise
+        multiplexer = WebsocketMultiplexer(websocket)
+        multiplexer.task = asyncio.create_task(multiplexer.run())
+        return multiplexer
+
+    async def open(
+        self,
+        url: str,
+        max_queue_size: int = 0,
+        overflow_policy: str = "block",
+        **kwargs,
+    ) -> MultiplexedStream:
+        loop = asyncio.get_running_loop()
+        entry = self.connections.get(url)
+        if entry is None or entry[0] is not loop:
+            entry = self.connections[url] = loop, asyncio.Lock(), None
+        _, lock, _ = entry
+        async with lock:
+            _, _, multiplexer = self.connections[url]
+            if multiplexer is None or multiplexer.closed:
+                multiplexer = await self._connect(url, **kwargs)
+                self.connections[url] = loop, lock, multiplexer
+        return multiplexer.open(next(self.stream_ids), max_queue_size, overflow_policy)
+
+
+default_connection_pool = WebsocketConnectionPool()
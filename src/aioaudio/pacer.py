@@ -0,0 +1,149 @@
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from .base import AudioSink
+from .channels import as_frames
+from .ring import AudioRingBuffer
+
+
+class PacedAudioSink(AudioSink):
+    # Forwards audio to `sink` at the sampling rate of the wall clock. Frames
+    # written faster than real time are buffered and `write` waits while the
+    # buffer is full, gaps are filled with slices of one preallocated silence
+    # buffer so the output never stalls. Buffers passed to `sink` are reused
+    # and only valid until its write returns.
+    def __init__(
+        self,
+        sink: AudioSink,
+        sampling_rate: int,
+        channels: int = 1,
+        frames_per_buffer: Optional[int] = None,
+        max_buffer_frames: Optional[int] = None,
+        prebuffer_frames: Optional[int] = None,
+        drain_timeout: Optional[float] = None,
+        dtype=np.float32,
+    ):
+        self.sink = sink
+        self.sampling_rate = sampling_rate
+        self.channels = channels
+        self.frames_per_buffer = frames_per_buffer or sampling_rate // 50
+        self.prebuffer_frames = (
+            self.frames_per_buffer if prebuffer_frames is None else prebuffer_frames
+        )
+        self.ring = AudioRingBuffer(
+            max_buffer_frames or sampling_rate // 2, channels, dtype
+        )
+        self.silence = np.zeros((self.frames_per_buffer, channels), dtype=dtype)
+        self.silence.flags.writeable = False
+        self.output = np.empty((self.frames_per_buffer, channels), dtype=dtype)
+        # Buffered audio is played out on close for up to this long.
+        self.drain_timeout = (
+            2 * self.ring.capacity / sampling_rate
+            if drain_timeout is None
+            else drain_timeout
+        )
+        self.started = asyncio.Event()
+        self.space = asyncio.Event()
+        self.closing = False
+        self.frames_sent = 0
+        self.underruns = 0
+        self.silent_frames = 0
+        self.resyncs = 0
+        self.drift = 0.0
+        self.max_drift = 0.0
+
+    async def __aenter__(self):
+        await self.sink.__aenter__()
+        self.task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, exc_type, *args, **kwargs):
+        self.closing = True
+        if exc_type is None and len(self.ring) and not self.task.done():
+            self.started.set()
+            try:
+                await asyncio.wait_for(asyncio.shield(self.task), self.drain_timeout)
+            except asyncio.TimeoutError:
+                pass
+        self.task.cancel()
+        await asyncio.gather(self.task, return_exceptions=True)
+        await self.sink.__aexit__(exc_type, *args, **kwargs)
+
+    async def write(self, audio: np.ndarray):
+        audio = as_frames(audio, self.channels)
+        while True:
+            audio = audio[self.ring.write(audio, overwrite=False) :]
+            if len(self.ring) >= self.prebuffer_frames:
+                self.started.set()
+            if not len(audio):
+                return
+            if self.task.done():
+                # Surfaces the error of the forwarding task.
+                self.task.result()
+                raise RuntimeError("Paced sink is closed")
+            # A full buffer starts playback even below the prebuffer target.
+            self.started.set()
+            self.space.clear()
+            await self.space.wait()
+
+    def _next(self) -> np.ndarray:
+        frames = self.frames_per_buffer
+        available = min(len(self.ring), frames)
+        if available == 0:
+            self.underruns += 1
+            self.silent_frames += frames
+            return self.silence
+
+        audio = self.output
+        audio[:available] = self.ring.read(available)
+        self.space.set()
+        if available < frames:
+            audio[available:] = self.silence[: frames - available]
+            self.underruns += 1
+            self.silent_frames += frames - available
+        return audio
+
+    async def _run(self):
+        try:
+            await self._forward()
+        finally:
+            # Wakes writers waiting for space so they see the task ended.
+            self.space.set()
+
+    async def _forward(self):
+        await self.started.wait()
+        rate = self.sampling_rate
+        origin = time.monotonic()
+        sent = 0
+        while True:
+            if self.closing and not len(self.ring):
+                return
+            await self.sink.write(self._next())
+            sent += self.frames_per_buffer
+            self.frames_sent += self.frames_per_buffer
+
+            deadline = origin + sent / rate
+            self.drift = time.monotonic() - deadline
+            self.max_drift = max(self.max_drift, self.drift)
+            if self.drift > self.ring.capacity / rate:
+                # Too far behind to catch up without bursting, restart the clock.
+                self.resyncs += 1
+                origin = time.monotonic()
+                sent = 0
+            elif self.drift < 0:
+                await asyncio.sleep(-self.drift)
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(
+            buffered=len(self.ring),
+            frames_sent=self.frames_sent,
+            underruns=self.underruns,
+            silent_frames=self.silent_frames,
+            overflowed=self.ring.overflowed,
+            resyncs=self.resyncs,
+            drift=self.drift,
+            max_drift=self.max_drift,
+        )
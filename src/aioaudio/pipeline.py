@@ -0,0 +1,277 @@
+import asyncio
+from contextlib import AsyncExitStack
+from pathlib import Path
+from typing import AsyncIterable, AsyncIterator, Dict, List, NamedTuple, Union
+
+import numpy as np
+
+from .base import AudioSink, AudioSource
+from .channels import as_frames, remix
+from .convert import decode, encode
+from .executor import DSPExecutor, load_function
+from .fanout import AudioFanout
+from .loader import load_audio_sink, load_audio_source
+from .mixer import AudioMixer
+from .pacer import PacedAudioSink
+from .pipeline_config import (
+    ConvertStageConfig,
+    MixStageConfig,
+    PipelineConfig,
+    ProcessStageConfig,
+    ReframeStageConfig,
+    RemixStageConfig,
+    ResampleStageConfig,
+    StageConfig,
+    VADStageConfig,
+)
+from .resample import resample
+from .ring import reframe
+from .vad import VoiceActivityDetector, gate
+
+
+class PipelineStream(NamedTuple):
+    sampling_rate: int
+    channels: int
+
+
+class QueueAudioSource(AudioSource):
+    # Bridges a pipeline queue into APIs that expect an AudioSource; a None
+    # item marks the end of the stream.
+    def __init__(self, queue: "asyncio.Queue[Union[np.ndarray, None]]"):
+        self.queue = queue
+        self.finished = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_, **__):
+        pass
+
+    async def __aiter__(self) -> AsyncIterator[np.ndarray]:
+        while not self.finished:
+            audio = await self.queue.get()
+            if audio is None:
+                self.finished = True
+                return
+            yield audio
+
+    def is_active(self) -> bool:
+        return not self.finished
+
+
+class Pipeline:
+    def __init__(self, config: PipelineConfig):
+        self.config = config
+        self.streams: Dict[str, PipelineStream] = {}
+        self.sources: Dict[str, AudioSource] = {}
+        for name, source_config in config.sources.items():
+            self._declare(name, config.sampling_rate, _channels(source_config))
+            self.sources[name] = load_audio_source(source_config, config.sampling_rate)
+
+        for stage in config.stages:
+            self._declare(stage.name, *self._stage_stream(stage))
+
+        self.sinks: Dict[str, List[AudioSink]] = {}
+        self.overflow_policies: Dict[str, List[str]] = {}
+        for sink_config in config.sinks:
+            stream = self._input(sink_config.input)
+            sink = load_audio_sink(sink_config.sink, stream.sampling_rate)
+            if sink_config.paced:
+                sink = PacedAudioSink(sink, stream.sampling_rate, stream.channels)
+            self.sinks.setdefault(sink_config.input, []).append(sink)
+            self.overflow_policies.setdefault(sink_config.input, []).append(
+                sink_config.overflow_policy
+            )
+
+    def _declare(self, name: str, sampling_rate: int, channels: int):
+        if name in self.streams:
+            raise ValueError(f"Duplicate pipeline node name: {name}")
+        self.streams[name] = PipelineStream(sampling_rate, channels)
+
+    def _input(self, name: str) -> PipelineStream:
+        if name not in self.streams:
+            raise ValueError(f"Unknown pipeline input: {name}")
+        return self.streams[name]
+
+    def _stage_stream(self, stage: StageConfig) -> PipelineStream:
+        match stage:
+            case (
+                ReframeStageConfig(input=input)
+                | VADStageConfig(input=input)
+                | ConvertStageConfig(input=input)
+            ):
+                return self._input(input)
+            case ResampleStageConfig(input=input, sampling_rate=sampling_rate):
+                return PipelineStream(sampling_rate, self._input(input).channels)
+            case RemixStageConfig(input=input, channels=channels):
+                return PipelineStream(self._input(input).sampling_rate, channels)
+            case MixStageConfig(inputs=inputs, channels=channels):
+                rates = {self._input(input).sampling_rate for input in inputs}
+                if len(rates) != 1:
+                    raise ValueError(
+                        f"Mix stage {stage.name} inputs have different sampling "
+                        f"rates: {sorted(rates)}"
+                    )
+                return PipelineStream(rates.pop(), channels)
+            case ProcessStageConfig(input=input, channels=channels):
+                stream = self._input(input)
+                return PipelineStream(stream.sampling_rate, channels or stream.channels)
+            case _:
+                raise NotImplementedError("Unknown pipeline stage %s", stage)
+
+    def _subscribe(self, name: str) -> QueueAudioSource:
+        queue: asyncio.Queue = asyncio.Queue(self.config.max_queue_size)
+        self.queues[name].append(queue)
+        return QueueAudioSource(queue)
+
+    async def _publish(self, name: str, stream: AsyncIterable[np.ndarray]):
+        queues = self.queues[name]
+        async for audio in stream:
+            for queue in queues:
+                await queue.put(audio)
+        for queue in queues:
+            await queue.put(None)
+
+    async def _stage(
+        self, stage: StageConfig, stack: AsyncExitStack
+    ) -> AsyncIterable[np.ndarray]:
+        match stage:
+            case ReframeStageConfig(input=input, frames=frames, hop=hop):
+                channels = self.streams[input].channels
+                return _copies(
+                    reframe(self._subscribe(input), frames, hop, channels=channels)
+                )
+            case ResampleStageConfig(input=input, sampling_rate=sampling_rate):
+                stream = self.streams[input]
+                return resample(
+                    self._subscribe(input),
+                    stream.sampling_rate,
+                    sampling_rate,
+                    stream.channels,
+                )
+            case RemixStageConfig(input=input, channels=channels):
+                return _remixed(
+                    self._subscribe(input), self.streams[input].channels, channels
+                )
+            case MixStageConfig():
+                sampling_rate = self.streams[stage.name].sampling_rate
+                return await stack.enter_async_context(
+                    AudioMixer(
+                        sampling_rate,
+                        [self._subscribe(input) for input in stage.inputs],
+                        gains=stage.gains,
+                        frames_per_buffer=int(
+                            stage.milliseconds_per_buffer * sampling_rate / 1000
+                        ),
+                        channels=stage.channels,
+                        clip_threshold=stage.clip_threshold,
+                    )
+                )
+            case ProcessStageConfig(input=input):
+                executor = await stack.enter_async_context(
+                    DSPExecutor(
+                        load_function(stage.function, stage.kwargs),
+                        executor=stage.executor,
+                        workers=stage.workers,
+                        max_in_flight=stage.max_in_flight,
+                    )
+                )
+                return executor.process(self._subscribe(input))
+            case VADStageConfig(input=input, vad=vad, drop_silence=drop_silence):
+                return gate(
+                    self._subscribe(input),
+                    VoiceActivityDetector(
+                        self.streams[input].sampling_rate,
+                        **vad.model_dump(exclude={"marker_interval"}),
+                    ),
+                    drop_silence,
+                )
+            case ConvertStageConfig(
+                input=input, sample_format=sample_format, dither=dither
+            ):
+                return _converted(
+                    self._subscribe(input),
+                    self.streams[input].channels,
+                    sample_format,
+                    dither,
+                )
+            case _:
+                raise NotImplementedError("Unknown pipeline stage %s", stage)
+
+    async def run(self):
+        self.queues: Dict[str, List[asyncio.Queue]] = {
+            name: [] for name in self.streams
+        }
+        async with AsyncExitStack() as stack:
+            for source in self.sources.values():
+                await stack.enter_async_context(source)
+
+            coroutines = []
+            for stage in self.config.stages:
+                stream = await self._stage(stage, stack)
+                coroutines.append(self._publish(stage.name, stream))
+
+            for input, sinks in self.sinks.items():
+                fanout = await stack.enter_async_context(
+                    AudioFanout(
+                        sinks,
+                        max_queue_size=self.config.sink_queue_size,
+                        overflow_policy=self.overflow_policies[input],
+                    )
+                )
+                coroutines.append(fanout(self._subscribe(input)))
+
+            for name, source in self.sources.items():
+                coroutines.append(self._publish(name, source))
+
+            tasks = [asyncio.create_task(coroutine) for coroutine in coroutines]
+            try:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+                for task in done:
+                    task.result()
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _channels(config) -> int:
+    return getattr(config, "channels", 1)
+
+
+async def _copies(stream: AsyncIterable[np.ndarray]) -> AsyncIterator[np.ndarray]:
+    async for audio in stream:
+        yield audio.copy()
+
+
+async def _remixed(
+    stream: AsyncIterable[np.ndarray], source_channels: int, channels: int
+) -> AsyncIterator[np.ndarray]:
+    async for audio in stream:
+        yield remix(audio.reshape(len(audio), source_channels), channels)
+
+
+async def _converted(
+    stream: AsyncIterable[np.ndarray], channels: int, sample_format: str, dither: bool
+) -> AsyncIterator[np.ndarray]:
+    async for audio in stream:
+        data = encode(audio, sample_format, dither=dither)
+        yield as_frames(decode(data, sample_format), channels)
+
+
+def load_pipeline(config: Union[PipelineConfig, dict, str, Path]) -> Pipeline:
+    match config:
+        case PipelineConfig():
+            return Pipeline(config)
+        case dict():
+            return Pipeline(PipelineConfig.model_validate(config))
+        case str() | Path():
+            return Pipeline(
+                PipelineConfig.model_validate_json(Path(config).read_text())
+            )
+        case _:
+            raise NotImplementedError("Unknown pipeline config %s", config)
+
+
+async def run_pipeline(config: Union[PipelineConfig, dict, str, Path]):
+    await load_pipeline(config).run()
@@ -0,0 +1,102 @@
+from typing import Any, Dict, List, Literal, Optional, Union
+
+from pydantic import BaseModel, Field
+from typing_extensions import Annotated
+
+from .file_config import SampleFormat
+from .loader import AudioSinkConfig, AudioSourceConfig
+from .vad_config import VADConfig
+
+
+class ReframeStageConfig(BaseModel):
+    type: Literal["reframe"] = "reframe"
+    name: str
+    input: str
+    frames: int
+    hop: Optional[int] = None
+
+
+class ResampleStageConfig(BaseModel):
+    type: Literal["resample"] = "resample"
+    name: str
+    input: str
+    sampling_rate: int
+
+
+class RemixStageConfig(BaseModel):
+    type: Literal["remix"] = "remix"
+    name: str
+    input: str
+    channels: int
+
+
+class MixStageConfig(BaseModel):
+    type: Literal["mix"] = "mix"
+    name: str
+    inputs: List[str]
+    gains: Optional[List[float]] = None
+    milliseconds_per_buffer: float = 20
+    channels: int = 1
+    clip_threshold: Optional[float] = 0.8
+
+
+class ProcessStageConfig(BaseModel):
+    type: Literal["process"] = "process"
+    name: str
+    input: str
+    # A built-in DSP function name or "package.module:function".
+    function: str
+    kwargs: Dict[str, Any] = {}
+    executor: Literal["thread", "process"] = "thread"
+    workers: Optional[int] = None
+    max_in_flight: Optional[int] = None
+    # Output channel count when the function changes it.
+    channels: Optional[int] = None
+
+
+class VADStageConfig(BaseModel):
+    type: Literal["vad"] = "vad"
+    name: str
+    input: str
+    vad: VADConfig = VADConfig()
+    # Drop silent frames instead of only marking them.
+    drop_silence: bool = False
+
+
+class ConvertStageConfig(BaseModel):
+    type: Literal["convert"] = "convert"
+    name: str
+    input: str
+    # Audio is quantized through this format and stays float32 in the pipeline.
+    sample_format: SampleFormat
+    dither: bool = False
+
+
+StageConfig = Annotated[
+    Union[
+        ReframeStageConfig,
+        ResampleStageConfig,
+        RemixStageConfig,
+        MixStageConfig,
+        ProcessStageConfig,
+        VADStageConfig,
+        ConvertStageConfig,
+    ],
+    Field(discriminator="type"),
+]
+
+
+class PipelineSinkConfig(BaseModel):
+    input: str
+    sink: AudioSinkConfig
+    overflow_policy: Literal["block", "drop-oldest", "drop-newest"] = "drop-oldest"
+    paced: bool = False
+
+
+class PipelineConfig(BaseModel):
+    sampling_rate: int = 16000
+    max_queue_size: int = 8
+    sink_queue_size: int = 32
+    sources: Dict[str, AudioSourceConfig]
+    stages: List[StageConfig] = []
+    sinks: List[PipelineSinkConfig]
@@ -0,0 +1,85 @@
+from functools import lru_cache
+from math import gcd
+from typing import AsyncIterable, AsyncIterator, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .channels import as_frames
+
+
+@lru_cache(maxsize=64)
+def polyphase_filter(
+    up: int,
+    down: int,
+    taps_per_phase: int = 64,
+    rolloff: float = 0.95,
+    beta: float = 8.6,
+) -> np.ndarray:
+    length = up * taps_per_phase
+    cutoff = rolloff * 0.5 / max(up, down)
+    n = np.arange(length) - (length - 1) / 2
+    h = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(length, beta) * up
+    bank = h.reshape(taps_per_phase, up).T[:, ::-1]
+    bank = np.ascontiguousarray(bank, dtype=np.float32)
+    bank.flags.writeable = False
+    return bank
+
+
+def resampling_ratio(src_rate: int, dst_rate: int) -> Tuple[int, int]:
+    divisor = gcd(src_rate, dst_rate)
+    return dst_rate // divisor, src_rate // divisor
+
+
+class Resampler:
+    def __init__(
+        self,
+        src_rate: int,
+        dst_rate: int,
+        channels: int = 1,
+        taps_per_phase: int = 64,
+    ):
+        self.src_rate = src_rate
+        self.dst_rate = dst_rate
+        self.channels = channels
+        self.up, self.down = resampling_ratio(src_rate, dst_rate)
+        self.bank = polyphase_filter(self.up, self.down, taps_per_phase)
+        self.taps = taps_per_phase
+        self.history = np.zeros((taps_per_phase - 1, channels), dtype=np.float32)
+        self.position = 0
+
+    def process(self, audio: np.ndarray) -> np.ndarray:
+        audio = as_frames(audio, self.channels)
+        if self.up == self.down:
+            return audio
+
+        audio = audio.astype(np.float32, copy=False)
+        n = len(audio)
+        end = self.up * n
+        if self.position >= end:
+            self.position -= end
+            self.history = np.concatenate([self.history, audio])[n:]
+            return audio[:0]
+
+        buffer = np.concatenate([self.history, audio])
+        t = np.arange(self.position, end, self.down)
+        j, phase = np.divmod(t, self.up)
+        windows = sliding_window_view(buffer, self.taps, axis=0)[j]
+        resampled = np.einsum("mck,mk->mc", windows, self.bank[phase])
+
+        self.position = int(t[-1]) + self.down - end
+        self.history = buffer[n:]
+        return resampled
+
+
+async def resample(
+    source: AsyncIterable[np.ndarray],
+    src_rate: int,
+    dst_rate: int,
+    channels: int = 1,
+) -> AsyncIterator[np.ndarray]:
+    resampler = Resampler(src_rate, dst_rate, channels)
+    async for audio in source:
+        resampled = resampler.process(audio)
+        if len(resampled):
+            yield resampled
@@ -0,0 +1,123 @@
+from typing import AsyncIterable, AsyncIterator, Optional
+
+import numpy as np
+
+from .channels import as_frames
+
+
+class AudioRingBuffer:
+    # Every sample is stored twice, `capacity` apart, so that any window of up
+    # to `capacity` frames can be returned as one contiguous view.
+    def __init__(self, capacity: int, channels: int = 1, dtype=np.float32):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.channels = channels
+        self.dtype = np.dtype(dtype)
+        self.buffer = np.zeros((2 * capacity, channels), dtype=self.dtype)
+        self.overflowed = 0
+        self._read = 0
+        self._write = 0
+
+    def __len__(self) -> int:
+        return self._write - self._read
+
+    @property
+    def free(self) -> int:
+        return self.capacity - len(self)
+
+    def write(self, audio: np.ndarray, overwrite: bool = True) -> int:
+        audio = as_frames(audio, self.channels)
+        if len(audio) > self.free:
+            if not overwrite:
+                audio = audio[: self.free]
+            else:
+                if len(audio) > self.capacity:
+                    self.overflowed += len(audio) - self.capacity
+                    audio = audio[-self.capacity :]
+                dropped = len(audio) - self.free
+                if dropped > 0:
+                    self.overflowed += dropped
+                    self._read += dropped
+
+        n = len(audio)
+        if n == 0:
+            return 0
+
+        capacity = self.capacity
+        start = self._write % capacity
+        end = start + n
+        self.buffer[start:end] = audio
+        if end <= capacity:
+            self.buffer[start + capacity : end + capacity] = audio
+        else:
+            split = capacity - start
+            self.buffer[start + capacity :] = audio[:split]
+            self.buffer[: end - capacity] = audio[split:]
+        self._write += n
+        return n
+
+    def peek(self, frames: int) -> np.ndarray:
+        if frames > len(self):
+            raise ValueError(f"Only {len(self)} frames available, {frames} requested")
+        start = self._read % self.capacity
+        return self.buffer[start : start + frames]
+
+    def latest(self, frames: int) -> np.ndarray:
+        if frames > len(self):
+            raise ValueError(f"Only {len(self)} frames available, {frames} requested")
+        start = (self._write - frames) % self.capacity
+        return self.buffer[start : start + frames]
+
+    def consume(self, frames: int) -> int:
+        frames = min(frames, len(self))
+        self._read += frames
+        return frames
+
+    def read(self, frames: int) -> np.ndarray:
+        audio = self.peek(frames)
+        self._read += frames
+        return audio
+
+    def clear(self):
+        self._read = self._write
+
+
+async def reframe(
+    source: AsyncIterable[np.ndarray],
+    frames: int,
+    hop: Optional[int] = None,
+    channels: int = 1,
+    dtype=np.float32,
+) -> AsyncIterator[np.ndarray]:
+    # Yielded frames are views that stay valid only until the next iteration.
+    hop = hop or frames
+    ring = AudioRingBuffer(max(frames, hop) * 2, channels=channels, dtype=dtype)
+    skip = 0
+
+    async for chunk in source:
+        chunk = as_frames(chunk.astype(ring.dtype, copy=False), channels)
+
+        if skip:
+            n = min(skip, len(chunk))
+            chunk = chunk[n:]
+            skip -= n
+
+        offset = 0
+        if len(ring) == 0:
+            while offset + frames <= len(chunk):
+                yield chunk[offset : offset + frames]
+                offset += hop
+            if offset > len(chunk):
+                skip = offset - len(chunk)
+                continue
+
+        while offset < len(chunk):
+            offset += ring.write(chunk[offset:], overwrite=False)
+            while len(ring) >= frames:
+                yield ring.peek(frames)
+                skip = hop - ring.consume(hop)
+            if skip:
+                n = min(skip, len(chunk) - offset)
+                offset += n
+                skip -= n
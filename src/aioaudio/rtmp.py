@@ -1,9 +1,10 @@
 import asyncio
-from time import time
+import time
 from typing import Optional
 import numpy as np
 
-from .ffmpeg import F2N, ffmpeg_sink
+from .ffmpeg import FFmpegAudioSink, FFmpegWorker
+from .pacer import PacedAudioSink
 
 
 from .base import AudioSink
@@ -16,18 +17,25 @@ class RTMPAudioSink(AudioSink):
         format: str,
         channels: int,
         url: str,
-        keep_alive_interval: Optional[int] = None,
+        keep_alive_interval: Optional[float] = None,
+        max_queue_size: int = 256,
+        warm_spare: bool = False,
+        paced: bool = True,
     ):
+        # Paced streams never have gaps; unpaced ones get a second of silence
+        # after `keep_alive_interval` seconds without writes.
         self.sampling_rate = sampling_rate
         self.format = format
         self.channels = channels
         self.url = url
         self.keep_alive_interval = keep_alive_interval
+        self.max_queue_size = max_queue_size
+        self.warm_spare = warm_spare
+        self.paced = paced
 
     async def __aenter__(self) -> "RTMPAudioSink":
-        self.ffmpeg, self.stdin = await ffmpeg_sink(
+        worker = FFmpegWorker(
             "-y",
-            "-re",
             "-f",
             self.format,
             "-ar",
@@ -43,32 +51,35 @@ class RTMPAudioSink(AudioSink):
             "-f",
             "flv",
             self.url,
+            max_queue_size=self.max_queue_size,
+            warm_spare=self.warm_spare,
+        )
+        self.worker = worker
+        self.output: AudioSink = FFmpegAudioSink(worker, self.format)
+        if self.paced:
+            self.output = PacedAudioSink(self.output, self.sampling_rate, self.channels)
+        await self.output.__aenter__()
+        self.last_written_time = time.monotonic()
+        self.keep_alive_task = (
+            asyncio.create_task(self._keep_alive_loop(self.keep_alive_interval))
+            if self.keep_alive_interval and not self.paced
+            else None
         )
-        self.keep_alive_task = asyncio.create_task(self._keep_alive_loop())
-        self.dtype = F2N[self.format]
-        self.zeros = np.zeros((self.sampling_rate, self.channels), dtype=self.dtype)
-        self.last_written_time = 0
         return self
 
-    async def _keep_alive_loop(self) -> None:
-        if not self.keep_alive_interval:
-            return
-
-        while self.ffmpeg.returncode is None:
-            await asyncio.sleep(self.keep_alive_interval)
-            if time() - self.last_written_time < self.keep_alive_interval:
-                continue
-            await self.write(self.zeros)
+    async def _keep_alive_loop(self, interval: float) -> None:
+        silence = np.zeros((self.sampling_rate, self.channels), dtype=np.float32)
+        while True:
+            await asyncio.sleep(interval)
+            if time.monotonic() - self.last_written_time >= interval:
+                await self.write(silence)
 
     async def __aexit__(self, *args, **kwargs) -> None:
-        if self.stdin:
-            self.stdin.close()
-        else:
-            self.ffmpeg.kill()
-        await self.ffmpeg.wait()
+        if self.keep_alive_task is not None:
+            self.keep_alive_task.cancel()
+            await asyncio.gather(self.keep_alive_task, return_exceptions=True)
+        await self.output.__aexit__(*args, **kwargs)
 
     async def write(self, data: np.ndarray) -> None:
-        assert self.stdin, "Pipe not open"
-        self.stdin.write(data.tobytes())
-        self.last_written_time = time()
-        await self.stdin.drain()
+        self.last_written_time = time.monotonic()
+        await self.output.write(data)
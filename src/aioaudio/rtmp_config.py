@@ -8,4 +8,8 @@ class RTMPAudioSinkConfig(AudioSinkBaseModel):
     format: str = "f32le"
     channels: int = 1
     url: str = "rtmp://localhost:1234/live/test"
-    keep_alive_interval: Optional[int] = None
+    # Seconds without writes before silence is sent, unpaced streams only.
+    keep_alive_interval: Optional[float] = None
+    max_queue_size: int = 256
+    warm_spare: bool = False
+    paced: bool = True
@@ -1,12 +1,54 @@
 import asyncio
+import re
+import time
 from pathlib import Path
 from tempfile import TemporaryDirectory
-from typing import AsyncContextManager, AsyncIterator
+from typing import AsyncContextManager, AsyncIterator, Optional
 
 import numpy as np
 
 from .base import AudioSink, AudioSource
-from .ffmpeg import F2N, ffmpeg_sink, ffmpeg_source
+from .channels import as_frames
+from .convert import SAMPLE_WIDTHS, decode, encode
+from .ffmpeg import FFMPEG_SAMPLE_FORMATS, FFmpegWorker, ffmpeg_source
+from .frame import AudioFrame, AudioFrameClock
+from .rtp_native import parse_rtp_url
+
+RTP_FFMPEG_CODECS = {
+    "L16": "pcm_s16be",
+    "L24": "pcm_s24be",
+    "PCMU": "pcm_mulaw",
+    "PCMA": "pcm_alaw",
+}
+
+
+def rtp_sdp(
+    url: str,
+    sampling_rate: int,
+    channels: int = 1,
+    payload: str = "L16",
+    payload_type: int = 96,
+) -> str:
+    host, port = parse_rtp_url(url)
+    return "\n".join(
+        [
+            "v=0",
+            f"o=- 0 0 IN IP4 {host}",
+            "s=aioaudio",
+            f"c=IN IP4 {host}",
+            "t=0 0",
+            f"m=audio {port} RTP/AVP {payload_type}",
+            f"a=rtpmap:{payload_type} {payload}/{sampling_rate}/{channels}",
+            "",
+        ]
+    )
+
+
+def _sdp_clock_rate(sdp: str) -> int:
+    match = re.search(r"^a=rtpmap:\d+ [^/]+/(\d+)", sdp, re.MULTILINE)
+    if match is None:
+        raise ValueError("SDP has no rtpmap clock rate, pass sampling_rate")
+    return int(match.group(1))
 
 
 class RTPAudioSource(AudioSource):
@@ -15,12 +57,18 @@ class RTPAudioSource(AudioSource):
         sdp: str,
         format: str = "f32le",
         frames_per_buffer: int = 1024,
+        sampling_rate: Optional[int] = None,
+        channels: int = 1,
     ):
         self.format = format
         self.sdp = sdp
+        self.sampling_rate = sampling_rate
+        self.channels = channels
         self.frames_per_buffer = frames_per_buffer
-        self.dtype = F2N[format]
-        self.bytes_per_buffer = self.frames_per_buffer * self.dtype.itemsize
+        self.sample_format, self.byteorder = FFMPEG_SAMPLE_FORMATS[format]
+        self.bytes_per_frame = SAMPLE_WIDTHS[self.sample_format] * channels
+        self.bytes_per_buffer = self.frames_per_buffer * self.bytes_per_frame
+        self.clock = AudioFrameClock(sampling_rate or _sdp_clock_rate(sdp), channels)
 
     async def __aenter__(self):
         with TemporaryDirectory() as dir:
@@ -29,10 +77,11 @@ class RTPAudioSource(AudioSource):
 
             self.ffmpeg, self.stdout = await ffmpeg_source(
                 "-y",
-                "-protocol_whiltelist",
+                "-protocol_whitelist",
                 "file,rtp,udp",
                 "-i",
                 str(sdp_path),
+                *(["-ar", str(self.sampling_rate)] if self.sampling_rate else []),
                 "-f",
                 self.format,
                 "-",
@@ -43,10 +92,25 @@ class RTPAudioSource(AudioSource):
         self.ffmpeg.kill()
         await self.ffmpeg.wait()
 
-    async def __aiter__(self) -> AsyncIterator[np.ndarray]:
+    async def __aiter__(self) -> AsyncIterator[AudioFrame]:
         while self.is_active():
-            data = await self.stdout.read(self.bytes_per_buffer)
-            yield np.frombuffer(data, dtype=self.dtype)
+            try:
+                data = await self.stdout.readexactly(self.bytes_per_buffer)
+            except asyncio.IncompleteReadError as e:
+                data = e.partial[
+                    : len(e.partial) - len(e.partial) % self.bytes_per_frame
+                ]
+                if data:
+                    yield self._frames(data)
+                break
+            yield self._frames(data)
+
+    def _frames(self, data: bytes) -> AudioFrame:
+        audio = as_frames(
+            decode(data, self.sample_format, byteorder=self.byteorder), self.channels
+        )
+        capture_time = time.monotonic() - len(audio) / self.clock.sample_rate
+        return self.clock.stamp(audio, capture_time)
 
     def is_active(self) -> bool:
         return self.ffmpeg.returncode is None
@@ -59,36 +123,58 @@ class RTPAudioSink(AudioSink):
         format: str = "f32le",
         channels: int = 1,
         url: str = "rtp://localhost:1234",
+        payload: str = "L16",
+        payload_type: int = 96,
+        clock_rate: Optional[int] = None,
+        max_queue_size: int = 256,
+        warm_spare: bool = False,
     ):
+        if payload not in RTP_FFMPEG_CODECS:
+            raise ValueError(f"Unsupported RTP payload encoding for ffmpeg: {payload}")
         self.sampling_rate = sampling_rate
+        self.clock_rate = clock_rate or sampling_rate
         self.format = format
+        self.sample_format, self.byteorder = FFMPEG_SAMPLE_FORMATS[format]
         self.channels = channels
         self.url = url
+        self.payload = payload
+        self.payload_type = payload_type
+        self.max_queue_size = max_queue_size
+        self.warm_spare = warm_spare
 
     async def __aenter__(self):
-        self.ffmpeg, self.pipe = await ffmpeg_sink(
+        self.worker = FFmpegWorker(
             "-y",
-            "-i",
-            "pipe:0",
-            "-acodec",
-            "copy",
+            "-f",
+            self.format,
             "-ar",
             str(self.sampling_rate),
             "-ac",
             str(self.channels),
+            "-i",
+            "pipe:0",
+            "-acodec",
+            RTP_FFMPEG_CODECS[self.payload],
+            "-ar",
+            str(self.clock_rate),
+            "-payload_type",
+            str(self.payload_type),
             "-f",
             "rtp",
             self.url,
+            max_queue_size=self.max_queue_size,
+            warm_spare=self.warm_spare,
         )
+        await self.worker.start()
         return self
 
     async def __aexit__(self, *args, **kwargs):
-        self.pipe.close()
-        await self.ffmpeg.wait()
+        await self.worker.close()
 
     async def write(self, audio: np.ndarray):
-        self.pipe.write(audio.tobytes())
-        await self.pipe.drain()
+        await self.worker.write(
+            encode(audio, self.sample_format, byteorder=self.byteorder).tobytes()
+        )
 
 
 class LocalAudioToRTP(AsyncContextManager):
@@ -159,7 +245,7 @@ class RTPToLocalAudio(AsyncContextManager):
 
             self.ffplay = await asyncio.create_subprocess_exec(
                 "ffplay",
-                "-protocol_whiltelist",
+                "-protocol_whitelist",
                 "file,rtp,udp",
                 str(sdp_path),
             )
@@ -1,14 +1,44 @@
-from typing import Literal
+from typing import Literal, Optional
 
 from .base_config import AudioSinkBaseModel, AudioSourceBaseModel
+from .jitter_config import JitterBufferConfig
+from .vad_config import VADConfig
 
 
 class RTPAudioSourceConfig(AudioSourceBaseModel):
     mode: Literal["rtp"] = "rtp"
+    # The ffmpeg engine is the default for existing configs, "native" runs
+    # RTP over asyncio UDP without a subprocess.
+    engine: Literal["native", "ffmpeg"] = "ffmpeg"
     seconds_per_buffer: float = 10
     url: str = "rtp://localhost:1234"
+    # Raw sample format exchanged with ffmpeg, see FFMPEG_SAMPLE_FORMATS.
+    format: str = "f32le"
+    payload: Literal["L16", "L24", "F32", "PCMU", "PCMA"] = "L16"
+    # PCMU and PCMA peers usually expect the static payload types 0 and 8.
+    payload_type: int = 96
+    channels: int = 1
+    clock_rate: Optional[int] = None
+    jitter_buffer: Optional[JitterBufferConfig] = None
+    # Native engine only.
+    max_queue_size: int = 256
+    vad: Optional[VADConfig] = None
 
 
 class RTPAudioSinkConfig(AudioSinkBaseModel):
     mode: Literal["rtp"] = "rtp"
+    # The ffmpeg engine is the default for existing configs, "native" runs
+    # RTP over asyncio UDP without a subprocess.
+    engine: Literal["native", "ffmpeg"] = "ffmpeg"
     url: str = "rtp://localhost:1234"
+    # Raw sample format exchanged with ffmpeg, see FFMPEG_SAMPLE_FORMATS.
+    format: str = "f32le"
+    payload: Literal["L16", "L24", "F32", "PCMU", "PCMA"] = "L16"
+    # PCMU and PCMA peers usually expect the static payload types 0 and 8.
+    payload_type: int = 96
+    channels: int = 1
+    clock_rate: Optional[int] = None
+    max_queue_size: int = 256
+    warm_spare: bool = False
+    # Native engine only, sends RFC 3389 comfort noise packets during silence.
+    vad: Optional[VADConfig] = None
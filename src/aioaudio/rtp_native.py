@@ -0,0 +1,395 @@
+import asyncio
+import logging
+import random
+import struct
+from typing import AsyncIterator, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from .base import AudioSink, AudioSource
+from .channels import as_frames
+from .convert import SAMPLE_WIDTHS, decode, encode
+from .frame import AudioFrame, AudioFrameClock
+from .jitter import JitterBuffer
+from .jitter_config import JitterBufferConfig
+from .resample import Resampler
+from .vad import (
+    SILENCE_DB,
+    DTXEncoder,
+    SilenceMarker,
+    VoiceActivityDetector,
+    annotate,
+    comfort_noise,
+)
+from .vad_config import VADConfig
+
+logger = logging.getLogger(__name__)
+
+RTP_VERSION = 2
+RTP_HEADER = struct.Struct("!BBHII")
+RTP_MAX_PAYLOAD = 1400
+# RFC 3389 comfort noise, the payload is the noise level in -dBov.
+RTP_CN_PAYLOAD_TYPE = 13
+# Longest silence regenerated from one comfort noise packet; longer gaps are
+# treated as a stream restart.
+RTP_CN_MAX_SECONDS = 5
+
+
+class RTPPacket(NamedTuple):
+    payload_type: int
+    sequence_number: int
+    timestamp: int
+    ssrc: int
+    marker: bool
+    payload: bytes
+
+
+def pack_rtp(packet: RTPPacket) -> bytes:
+    return (
+        RTP_HEADER.pack(
+            RTP_VERSION << 6,
+            (int(packet.marker) << 7) | (packet.payload_type & 0x7F),
+            packet.sequence_number & 0xFFFF,
+            packet.timestamp & 0xFFFFFFFF,
+            packet.ssrc & 0xFFFFFFFF,
+        )
+        + packet.payload
+    )
+
+
+def parse_rtp(data: bytes) -> RTPPacket:
+    if len(data) < RTP_HEADER.size:
+        raise ValueError("RTP packet too short")
+
+    b0, b1, sequence_number, timestamp, ssrc = RTP_HEADER.unpack_from(data)
+    if b0 >> 6 != RTP_VERSION:
+        raise ValueError(f"Unsupported RTP version: {b0 >> 6}")
+
+    offset = RTP_HEADER.size + (b0 & 0x0F) * 4
+    if b0 & 0x10:
+        if len(data) < offset + 4:
+            raise ValueError("RTP header extension truncated")
+        (extension_length,) = struct.unpack_from("!H", data, offset + 2)
+        offset += 4 + extension_length * 4
+
+    end = len(data)
+    if b0 & 0x20:
+        end -= data[-1]
+    if end < offset:
+        raise ValueError("RTP packet truncated")
+
+    return RTPPacket(
+        payload_type=b1 & 0x7F,
+        sequence_number=sequence_number,
+        timestamp=timestamp,
+        ssrc=ssrc,
+        marker=bool(b1 & 0x80),
+        payload=data[offset:end],
+    )
+
+
+def parse_rtp_url(url: str) -> Tuple[str, int]:
+    parsed = urlsplit(url)
+    return parsed.hostname or "localhost", parsed.port or 1234
+
+
+# Network byte order sample formats of the RTP payload encodings.
+RTP_SAMPLE_FORMATS = {
+    "L16": "s16",
+    "L24": "s24",
+    "F32": "f32",
+    "PCMU": "mulaw",
+    "PCMA": "alaw",
+}
+RTP_PAYLOAD_BYTES = {
+    encoding: SAMPLE_WIDTHS[format] for encoding, format in RTP_SAMPLE_FORMATS.items()
+}
+
+
+def decode_rtp_payload(payload: bytes, encoding: str) -> np.ndarray:
+    if encoding not in RTP_SAMPLE_FORMATS:
+        raise ValueError(f"Unsupported RTP payload encoding: {encoding}")
+    return decode(payload, RTP_SAMPLE_FORMATS[encoding], byteorder=">")
+
+
+def encode_rtp_payload(audio: np.ndarray, encoding: str) -> bytes:
+    if encoding not in RTP_SAMPLE_FORMATS:
+        raise ValueError(f"Unsupported RTP payload encoding: {encoding}")
+    return encode(audio, RTP_SAMPLE_FORMATS[encoding], byteorder=">").tobytes()
+
+
+class RTPReceiverProtocol(asyncio.DatagramProtocol):
+    def __init__(self, max_queue_size: int = 256):
+        # None marks the closed transport.
+        self.queue: asyncio.Queue[Optional[RTPPacket]] = asyncio.Queue(max_queue_size)
+        self.transport: Optional[asyncio.DatagramTransport] = None
+        self.ssrc: Optional[int] = None
+        self.last_sequence_number: Optional[int] = None
+        self.received = 0
+        self.lost = 0
+        self.reordered = 0
+        self.dropped = 0
+        self.invalid = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def connection_lost(self, exc):
+        self.transport = None
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(None)
+
+    def datagram_received(self, data: bytes, addr):
+        try:
+            packet = parse_rtp(data)
+        except ValueError as e:
+            self.invalid += 1
+            logger.debug(f"Dropped invalid RTP packet from {addr}: {e}")
+            return
+
+        if packet.ssrc != self.ssrc:
+            self.ssrc = packet.ssrc
+            self.last_sequence_number = None
+
+        if self.last_sequence_number is not None:
+            delta = (packet.sequence_number - self.last_sequence_number) & 0xFFFF
+            if delta == 0 or delta >= 0x8000:
+                self.reordered += 1
+            else:
+                self.lost += delta - 1
+                self.last_sequence_number = packet.sequence_number
+        else:
+            self.last_sequence_number = packet.sequence_number
+        self.received += 1
+
+        try:
+            self.queue.put_nowait(packet)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    def is_active(self) -> bool:
+        return self.transport is not None and not self.transport.is_closing()
+
+
+class NativeRTPAudioSource(AudioSource):
+    def __init__(
+        self,
+        sampling_rate: int,
+        url: str = "rtp://localhost:1234",
+        payload: str = "L16",
+        payload_type: int = 96,
+        channels: int = 1,
+        max_queue_size: int = 256,
+        jitter_buffer: Optional[JitterBufferConfig] = None,
+        clock_rate: Optional[int] = None,
+        vad: Optional[VADConfig] = None,
+    ):
+        if payload not in RTP_PAYLOAD_BYTES:
+            raise ValueError(f"Unsupported RTP payload encoding: {payload}")
+        self.sampling_rate = sampling_rate
+        self.clock_rate = clock_rate or sampling_rate
+        self.url = url
+        self.payload = payload
+        self.payload_type = payload_type
+        self.channels = channels
+        self.max_queue_size = max_queue_size
+        self.jitter_buffer = (
+            JitterBuffer(self.clock_rate, channels, **jitter_buffer.model_dump())
+            if jitter_buffer is not None
+            else None
+        )
+        self.vad = (
+            VoiceActivityDetector(
+                sampling_rate, **vad.model_dump(exclude={"marker_interval"})
+            )
+            if vad is not None
+            else None
+        )
+
+    async def __aenter__(self):
+        loop = asyncio.get_running_loop()
+        self.transport, self.protocol = await loop.create_datagram_endpoint(
+            lambda: RTPReceiverProtocol(self.max_queue_size),
+            local_addr=parse_rtp_url(self.url),
+        )
+        return self
+
+    async def __aexit__(self, *_, **__):
+        self.transport.close()
+
+    async def packets(self) -> AsyncIterator[RTPPacket]:
+        while True:
+            packet = await self.protocol.queue.get()
+            if packet is None:
+                return
+            if packet.payload_type not in (self.payload_type, RTP_CN_PAYLOAD_TYPE):
+                continue
+            yield packet
+
+    async def _payloads(self) -> AsyncIterator[Tuple[int, int, np.ndarray]]:
+        # A comfort noise packet lasts until the next packet's timestamp, so
+        # its silence is regenerated once that packet arrives.
+        comfort_noise_packet: Optional[RTPPacket] = None
+        async for packet in self.packets():
+            if comfort_noise_packet is not None:
+                frames = (
+                    packet.timestamp - comfort_noise_packet.timestamp
+                ) & 0xFFFFFFFF
+                if 0 < frames <= self.clock_rate * RTP_CN_MAX_SECONDS:
+                    level = comfort_noise_packet.payload[:1]
+                    yield (
+                        comfort_noise_packet.sequence_number,
+                        comfort_noise_packet.timestamp,
+                        comfort_noise(
+                            frames, self.channels, -level[0] if level else SILENCE_DB
+                        ),
+                    )
+                comfort_noise_packet = None
+
+            if packet.payload_type == RTP_CN_PAYLOAD_TYPE:
+                comfort_noise_packet = packet
+                continue
+            yield packet.sequence_number, packet.timestamp, self._decode(packet)
+
+    def _decode(self, packet: RTPPacket) -> np.ndarray:
+        return as_frames(
+            decode_rtp_payload(packet.payload, self.payload), self.channels
+        )
+
+    async def _fill_jitter_buffer(self, jitter_buffer: JitterBuffer):
+        try:
+            async for sequence_number, timestamp, audio in self._payloads():
+                jitter_buffer.put(sequence_number, timestamp, audio)
+        finally:
+            jitter_buffer.close()
+
+    async def _frames(self) -> AsyncIterator[AudioFrame]:
+        if self.jitter_buffer is None:
+            clock = AudioFrameClock(self.clock_rate, self.channels)
+            async for _, _, audio in self._payloads():
+                yield clock.stamp(audio)
+            return
+
+        task = asyncio.create_task(self._fill_jitter_buffer(self.jitter_buffer))
+        try:
+            async for audio in self.jitter_buffer:
+                yield audio
+        finally:
+            task.cancel()
+
+    async def _resampled(self) -> AsyncIterator[AudioFrame]:
+        if self.clock_rate == self.sampling_rate:
+            async for audio in self._frames():
+                yield audio
+            return
+
+        resampler = Resampler(self.clock_rate, self.sampling_rate, self.channels)
+        clock = AudioFrameClock(self.sampling_rate, self.channels)
+        async for audio in self._frames():
+            resampled = resampler.process(audio.data)
+            if len(resampled):
+                yield clock.stamp(resampled, audio.capture_time)
+
+    async def __aiter__(self) -> AsyncIterator[AudioFrame]:
+        async for audio in self._resampled():
+            yield annotate(audio, self.vad) if self.vad is not None else audio
+
+    @property
+    def speech_active(self) -> Optional[bool]:
+        return self.vad.active if self.vad is not None else None
+
+    def is_active(self) -> bool:
+        return self.protocol.is_active()
+
+
+class NativeRTPAudioSink(AudioSink):
+    def __init__(
+        self,
+        sampling_rate: int,
+        url: str = "rtp://localhost:1234",
+        payload: str = "L16",
+        payload_type: int = 96,
+        channels: int = 1,
+        seconds_per_packet: float = 0.02,
+        clock_rate: Optional[int] = None,
+        vad: Optional[VADConfig] = None,
+    ):
+        if payload not in RTP_PAYLOAD_BYTES:
+            raise ValueError(f"Unsupported RTP payload encoding: {payload}")
+        self.sampling_rate = sampling_rate
+        self.clock_rate = clock_rate or sampling_rate
+        self.url = url
+        self.payload = payload
+        self.payload_type = payload_type
+        self.channels = channels
+        self.resampler = (
+            Resampler(sampling_rate, self.clock_rate, channels)
+            if self.clock_rate != sampling_rate
+            else None
+        )
+        self.frames_per_packet = max(
+            1,
+            min(
+                int(seconds_per_packet * self.clock_rate),
+                RTP_MAX_PAYLOAD // (RTP_PAYLOAD_BYTES[payload] * channels),
+            ),
+        )
+        self.dtx = (
+            DTXEncoder(self.clock_rate, **vad.model_dump()) if vad is not None else None
+        )
+        self.ssrc = random.getrandbits(32)
+        self.sequence_number = random.getrandbits(16)
+        self.timestamp = random.getrandbits(32)
+        # RTP marks the first packet of every talkspurt.
+        self.talkspurt = True
+
+    async def __aenter__(self):
+        loop = asyncio.get_running_loop()
+        self.transport, _ = await loop.create_datagram_endpoint(
+            asyncio.DatagramProtocol,
+            remote_addr=parse_rtp_url(self.url),
+        )
+        return self
+
+    async def __aexit__(self, *_, **__):
+        self.transport.close()
+
+    def _send(self, payload_type: int, payload: bytes, frames: int):
+        self.transport.sendto(
+            pack_rtp(
+                RTPPacket(
+                    payload_type=payload_type,
+                    sequence_number=self.sequence_number,
+                    timestamp=self.timestamp,
+                    ssrc=self.ssrc,
+                    marker=self.talkspurt and payload_type != RTP_CN_PAYLOAD_TYPE,
+                    payload=payload,
+                )
+            )
+        )
+        self.sequence_number = (self.sequence_number + 1) & 0xFFFF
+        self.timestamp = (self.timestamp + frames) & 0xFFFFFFFF
+
+    async def write(self, audio: np.ndarray):
+        if self.resampler is not None:
+            audio = self.resampler.process(audio)
+        audio = as_frames(audio, self.channels)
+        items = self.dtx.process(audio) if self.dtx is not None else [audio]
+        for item in items:
+            if isinstance(item, SilenceMarker):
+                level = min(max(int(round(-item.level_db)), 0), 127)
+                self._send(RTP_CN_PAYLOAD_TYPE, bytes([level]), item.frames)
+                self.talkspurt = True
+                continue
+
+            for start in range(0, len(item), self.frames_per_packet):
+                chunk = item[start : start + self.frames_per_packet]
+                self._send(
+                    self.payload_type,
+                    encode_rtp_payload(chunk, self.payload),
+                    len(chunk),
+                )
+                self.talkspurt = False
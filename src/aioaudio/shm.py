@@ -0,0 +1,408 @@
+import asyncio
+import errno
+import glob
+import logging
+import os
+import tempfile
+import time
+import uuid
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import AsyncIterator, Dict, Optional, Set
+
+import numpy as np
+
+from .base import AudioSink, AudioSource
+from .channels import as_frames
+from .frame import AudioFrame
+
+logger = logging.getLogger(__name__)
+
+SHM_MAGIC = 0x61696F6175646931  # "aioaudi1"
+
+# Header fields, one int64 each.
+MAGIC = 0
+CAPACITY = 1
+CHANNELS = 2
+SAMPLING_RATE = 3
+SLOTS = 4
+WRITTEN = 5  # total frames written
+PUBLISHED = 6  # total buffers published
+CLOSED = 7
+GENERATION = 8  # bumped by readers when they add a doorbell
+HEADER_FIELDS = 16
+
+# Descriptor fields, one int64 each; capture_time holds float64 bits.
+SEQ = 0
+START = 1
+FRAMES = 2
+CAPTURE_TIME = 3
+DESCRIPTOR_FIELDS = 4
+
+# FIFO doorbells need POSIX; elsewhere readers poll every `poll_interval`.
+HAS_DOORBELL = hasattr(os, "mkfifo")
+
+# Segments created by sinks of this process, whose tracker registration
+# belongs to the sink.
+_created: Set[str] = set()
+
+
+def _layout(capacity: int, channels: int, slots: int):
+    header = HEADER_FIELDS * 8
+    descriptors = slots * DESCRIPTOR_FIELDS * 8
+    data = 2 * capacity * channels * 4
+    return header, descriptors, header + descriptors + data
+
+
+def _views(shm: SharedMemory, capacity: int, channels: int, slots: int):
+    header_size, descriptors_size, _ = _layout(capacity, channels, slots)
+    header = np.ndarray((HEADER_FIELDS,), dtype="<i8", buffer=shm.buf)
+    descriptors = np.ndarray(
+        (slots, DESCRIPTOR_FIELDS), dtype="<i8", buffer=shm.buf, offset=header_size
+    )
+    capture_times = descriptors.view("<f8")[:, CAPTURE_TIME]
+    # Mirrored like AudioRingBuffer so every buffer is one contiguous view.
+    data = np.ndarray(
+        (2 * capacity, channels),
+        dtype=np.float32,
+        buffer=shm.buf,
+        offset=header_size + descriptors_size,
+    )
+    return header, descriptors, capture_times, data
+
+
+def attach_shared_memory(name: str, track: bool = False) -> SharedMemory:
+    # Only the creating sink may unlink the segment, but before Python 3.13
+    # attaching registers it with the resource tracker, which would unlink it
+    # when this process exits. Child processes share their parent's tracker
+    # and pass `track=True` so its registration is left alone.
+    if track:
+        return SharedMemory(name)
+    try:
+        return SharedMemory(name, track=False)  # type: ignore[call-arg]
+    except TypeError:
+        shm = SharedMemory(name)
+        # A segment created in this process shares the sink's registration,
+        # which its unlink removes.
+        if name not in _created:
+            resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore
+        return shm
+
+
+def release_shared_memory(shm: SharedMemory, unlink: bool = False):
+    if unlink:
+        shm.unlink()
+    try:
+        shm.close()
+    except BufferError:
+        # Frames handed out as views still reference the mapping; it is
+        # unmapped once they are garbage collected.
+        logger.debug(f"Shared memory {shm.name} is still referenced")
+
+
+def doorbell_pattern(name: str) -> str:
+    return os.path.join(tempfile.gettempdir(), f"aioaudio-shm-{name}-*.fifo")
+
+
+class SharedMemoryAudioSink(AudioSink):
+    # Single producer. Writes never wait for readers; a reader that falls
+    # more than `capacity` frames behind skips ahead.
+    def __init__(
+        self,
+        sampling_rate: int,
+        name: str,
+        channels: int = 1,
+        capacity: Optional[int] = None,
+        slots: int = 256,
+    ):
+        self.sampling_rate = sampling_rate
+        self.name = name
+        self.channels = channels
+        self.capacity = capacity or sampling_rate
+        self.slots = slots
+        self.doorbells: Dict[str, int] = {}
+        self.generation = -1
+        self.last_scan = 0.0
+
+    async def __aenter__(self):
+        *_, size = _layout(self.capacity, self.channels, self.slots)
+        try:
+            self.shm = SharedMemory(self.name, create=True, size=size)
+        except FileExistsError:
+            logger.warning(f"Replacing existing shared memory segment {self.name}")
+            # Tracked, since unlinking unregisters it again.
+            stale = attach_shared_memory(self.name, track=True)
+            if stale.size >= HEADER_FIELDS * 8:
+                np.ndarray((HEADER_FIELDS,), dtype="<i8", buffer=stale.buf)[CLOSED] = 1
+            release_shared_memory(stale, unlink=True)
+            self.shm = SharedMemory(self.name, create=True, size=size)
+        _created.add(self.name)
+
+        self.header, self.descriptors, self.capture_times, self.data = _views(
+            self.shm, self.capacity, self.channels, self.slots
+        )
+        self.header[:] = 0
+        self.header[CAPACITY] = self.capacity
+        self.header[CHANNELS] = self.channels
+        self.header[SAMPLING_RATE] = self.sampling_rate
+        self.header[SLOTS] = self.slots
+        self.descriptors[:, SEQ] = -1
+        # Written last so readers never see a half initialised header.
+        self.header[MAGIC] = SHM_MAGIC
+        return self
+
+    async def __aexit__(self, *_, **__):
+        self.header[CLOSED] = 1
+        self._ring()
+        for fd in self.doorbells.values():
+            os.close(fd)
+        self.doorbells.clear()
+        del self.header, self.descriptors, self.capture_times, self.data
+        release_shared_memory(self.shm, unlink=True)
+        _created.discard(self.name)
+
+    async def write(self, audio: np.ndarray):
+        capture_time = getattr(audio, "capture_time", None)
+        audio = as_frames(np.asarray(audio, dtype=np.float32), self.channels)
+        frames = len(audio)
+        if frames > self.capacity:
+            raise ValueError(
+                f"Buffer of {frames} frames exceeds shared memory capacity "
+                f"of {self.capacity} frames"
+            )
+        if frames == 0:
+            return
+
+        capacity = self.capacity
+        written = int(self.header[WRITTEN])
+        start = written % capacity
+        end = start + frames
+        self.data[start:end] = audio
+        if end <= capacity:
+            self.data[start + capacity : end + capacity] = audio
+        else:
+            split = capacity - start
+            self.data[start + capacity :] = audio[:split]
+            self.data[: end - capacity] = audio[split:]
+
+        seq = int(self.header[PUBLISHED])
+        if capture_time is None:
+            capture_time = time.monotonic()
+        # The seq is invalidated while the fields change and published last,
+        # so a reader never pairs it with another buffer's fields.
+        slot = seq % self.slots
+        descriptors = self.descriptors
+        descriptors[slot, SEQ] = -1
+        descriptors[slot, START] = written
+        descriptors[slot, FRAMES] = frames
+        self.capture_times[slot] = capture_time
+        descriptors[slot, SEQ] = seq
+        self.header[WRITTEN] = written + frames
+        self.header[PUBLISHED] = seq + 1
+        self._ring()
+
+    def _scan_doorbells(self):
+        if not HAS_DOORBELL:
+            return
+        # Readers bump the generation when they create their FIFO; the timed
+        # rescan covers concurrent bumps that cancel out.
+        generation = int(self.header[GENERATION])
+        now = time.monotonic()
+        if generation == self.generation and now - self.last_scan < 1.0:
+            return
+        self.generation = generation
+        self.last_scan = now
+        for path in glob.glob(doorbell_pattern(self.name)):
+            if path in self.doorbells:
+                continue
+            try:
+                self.doorbells[path] = os.open(path, os.O_WRONLY | os.O_NONBLOCK)
+            except OSError as e:
+                if e.errno == errno.ENXIO:
+                    # No reader holds it open anymore.
+                    os.unlink(path)
+                elif e.errno != errno.ENOENT:
+                    raise
+
+    def _ring(self):
+        self._scan_doorbells()
+        for path, fd in list(self.doorbells.items()):
+            try:
+                os.write(fd, b"\0")
+            except BlockingIOError:
+                # The reader has pending wakeups already.
+                pass
+            except BrokenPipeError:
+                os.close(fd)
+                del self.doorbells[path]
+
+
+class SharedMemoryAudioSource(AudioSource):
+    # Frames are zero-copy views into shared memory that stay valid until the
+    # producer wraps around the ring, `capacity` frames later; pass
+    # `copy=True` when frames are kept longer than that.
+    def __init__(
+        self,
+        sampling_rate: int,
+        name: str,
+        channels: int = 1,
+        copy: bool = False,
+        attach_timeout: Optional[float] = None,
+        poll_interval: float = 0.1,
+    ):
+        self.sampling_rate = sampling_rate
+        self.name = name
+        self.channels = channels
+        self.copy = copy
+        self.attach_timeout = attach_timeout
+        self.poll_interval = poll_interval
+        self.dropped = 0
+        self.closed = False
+
+    async def __aenter__(self):
+        loop = asyncio.get_running_loop()
+        deadline = (
+            None if self.attach_timeout is None else loop.time() + self.attach_timeout
+        )
+        while True:
+            try:
+                self.shm = attach_shared_memory(self.name)
+                header = np.ndarray((HEADER_FIELDS,), dtype="<i8", buffer=self.shm.buf)
+                if header[MAGIC] == SHM_MAGIC:
+                    break
+                del header
+                release_shared_memory(self.shm)
+            except FileNotFoundError:
+                pass
+            if deadline is not None and loop.time() > deadline:
+                raise TimeoutError(f"Shared memory {self.name} is not available")
+            await asyncio.sleep(self.poll_interval)
+
+        self.capacity = int(header[CAPACITY])
+        self.slots = int(header[SLOTS])
+        if int(header[CHANNELS]) != self.channels:
+            raise ValueError(
+                f"Shared memory {self.name} has {header[CHANNELS]} channels, "
+                f"expected {self.channels}"
+            )
+        if int(header[SAMPLING_RATE]) != self.sampling_rate:
+            raise ValueError(
+                f"Shared memory {self.name} is at {header[SAMPLING_RATE]} Hz, "
+                f"expected {self.sampling_rate} Hz"
+            )
+        del header
+        self.header, self.descriptors, self.capture_times, self.data = _views(
+            self.shm, self.capacity, self.channels, self.slots
+        )
+        # Start from live audio rather than replaying the ring.
+        self.seq = int(self.header[PUBLISHED])
+
+        self.ready = asyncio.Event()
+        self.doorbell: Optional[int] = None
+        if HAS_DOORBELL:
+            self._open_doorbell(loop)
+        else:
+            logger.debug(
+                f"No doorbell for shared memory {self.name} on this platform, "
+                f"polling every {self.poll_interval}s"
+            )
+        return self
+
+    def _open_doorbell(self, loop: asyncio.AbstractEventLoop):
+        self.doorbell_path = doorbell_pattern(self.name).replace("*", uuid.uuid4().hex)
+        os.mkfifo(self.doorbell_path)
+        # Opened read-write so the FIFO never reports EOF without a writer.
+        doorbell = os.open(self.doorbell_path, os.O_RDWR | os.O_NONBLOCK)
+        try:
+            loop.add_reader(doorbell, self._on_doorbell)
+        except NotImplementedError:
+            # Event loops without add_reader fall back to polling.
+            os.close(doorbell)
+            os.unlink(self.doorbell_path)
+            return
+        self.doorbell = doorbell
+        self.header[GENERATION] += 1
+
+    async def __aexit__(self, *_, **__):
+        if self.doorbell is not None:
+            asyncio.get_running_loop().remove_reader(self.doorbell)
+            os.close(self.doorbell)
+            try:
+                os.unlink(self.doorbell_path)
+            except FileNotFoundError:
+                pass
+        del self.header, self.descriptors, self.data
+        release_shared_memory(self.shm)
+
+    def _on_doorbell(self):
+        try:
+            while os.read(self.doorbell, 4096):
+                pass
+        except BlockingIOError:
+            pass
+        self.ready.set()
+
+    @property
+    def queue_depth(self) -> int:
+        return int(self.header[PUBLISHED]) - self.seq
+
+    def _resync(self):
+        # Lapped by the producer: skip to the oldest buffer still intact.
+        published = int(self.header[PUBLISHED])
+        written = int(self.header[WRITTEN])
+        seq = max(self.seq, published - self.slots)
+        while seq < published:
+            descriptor = self.descriptors[seq % self.slots]
+            if (
+                int(descriptor[SEQ]) == seq
+                and int(descriptor[START]) >= written - self.capacity
+            ):
+                break
+            seq += 1
+        self.seq = seq
+
+    def _read(self) -> Optional[AudioFrame]:
+        slot = self.seq % self.slots
+        start = int(self.descriptors[slot, START])
+        frames = int(self.descriptors[slot, FRAMES])
+        capture_time = float(self.capture_times[slot])
+        if int(self.descriptors[slot, SEQ]) != self.seq:
+            return None
+        offset = start % self.capacity
+        audio = self.data[offset : offset + frames]
+        if self.copy:
+            audio = audio.copy()
+        # The producer may have lapped the buffer while it was being read.
+        if start < int(self.header[WRITTEN]) - self.capacity:
+            return None
+        return AudioFrame(
+            audio, self.sampling_rate, self.channels, start, capture_time, self.seq
+        )
+
+    async def __aiter__(self) -> AsyncIterator[AudioFrame]:
+        while True:
+            self.ready.clear()
+            if self.seq >= int(self.header[PUBLISHED]):
+                if self.header[CLOSED]:
+                    self.closed = True
+                    return
+                # Not wait_for, which can swallow a cancellation that races
+                # with the doorbell.
+                ready = asyncio.ensure_future(self.ready.wait())
+                try:
+                    await asyncio.wait((ready,), timeout=self.poll_interval)
+                finally:
+                    ready.cancel()
+                continue
+
+            frame = self._read()
+            if frame is None:
+                seq = self.seq
+                self._resync()
+                self.dropped += self.seq - seq
+                continue
+            self.seq += 1
+            yield frame
+
+    def is_active(self) -> bool:
+        return not self.closed
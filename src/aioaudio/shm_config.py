@@ -0,0 +1,19 @@
+from typing import Literal, Optional
+
+from .base_config import AudioSinkBaseModel, AudioSourceBaseModel
+
+
+class SharedMemoryAudioSourceConfig(AudioSourceBaseModel):
+    mode: Literal["shm"] = "shm"
+    name: str
+    channels: int = 1
+    copy_frames: bool = False
+    attach_timeout: Optional[float] = None
+
+
+class SharedMemoryAudioSinkConfig(AudioSinkBaseModel):
+    mode: Literal["shm"] = "shm"
+    name: str
+    channels: int = 1
+    ring_buffer_milliseconds: float = 1000
+    slots: int = 256
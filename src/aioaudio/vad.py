@@ -0,0 +1,169 @@
+import json
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    List,
+    NamedTuple,
+    Optional,
+    Union,
+)
+
+import numpy as np
+
+from .frame import AudioFrame
+
+SILENCE_DB = -100.0
+
+_rng = np.random.default_rng()
+
+
+def energy_db(audio: np.ndarray) -> np.ndarray:
+    # Mean power over the last two axes, so a (buffers, frames, channels)
+    # batch yields one level per buffer without a Python loop.
+    audio = np.asarray(audio, dtype=np.float32)
+    if audio.ndim < 2:
+        audio = audio.reshape(-1, 1)
+    size = audio.shape[-2] * audio.shape[-1]
+    power = np.einsum("...fc,...fc->...", audio, audio) / max(size, 1)
+    return np.maximum(10 * np.log10(power + 1e-12), SILENCE_DB)
+
+
+class VoiceActivityDetector:
+    # Opens above `open_db`, stays open down to `close_db` and closes only
+    # after `hangover_seconds` below it, so word gaps are not cut out.
+    def __init__(
+        self,
+        sampling_rate: int,
+        open_db: float = -40,
+        close_db: float = -50,
+        hangover_seconds: float = 0.3,
+        noise_smoothing: float = 0.1,
+    ):
+        if close_db > open_db:
+            raise ValueError("close_db must not be above open_db")
+        self.sampling_rate = sampling_rate
+        self.open_db = open_db
+        self.close_db = close_db
+        self.hangover_frames = int(hangover_seconds * sampling_rate)
+        self.noise_smoothing = noise_smoothing
+        self.active = False
+        self.noise_db = SILENCE_DB
+        self.speech_frames = 0
+        self.silent_frames = 0
+        self._hangover = 0
+
+    def _step(self, level: float, frames: int) -> bool:
+        if level >= self.open_db or (self.active and level >= self.close_db):
+            self.active = True
+            self._hangover = self.hangover_frames
+        elif self.active:
+            self._hangover -= frames
+            self.active = self._hangover > 0
+
+        if self.active:
+            self.speech_frames += frames
+        else:
+            self.silent_frames += frames
+            self.noise_db += (level - self.noise_db) * self.noise_smoothing
+        return self.active
+
+    def update(self, audio: np.ndarray) -> bool:
+        return self._step(float(energy_db(audio)), len(audio))
+
+    def detect(self, batch: np.ndarray) -> np.ndarray:
+        # Levels are computed for the whole (buffers, frames, channels) batch
+        # at once; only the hysteresis runs per buffer.
+        frames = batch.shape[1]
+        return np.array(
+            [self._step(level, frames) for level in energy_db(batch).tolist()],
+            dtype=bool,
+        )
+
+
+class SilenceMarker(NamedTuple):
+    frames: int
+    level_db: float
+
+
+def comfort_noise(frames: int, channels: int = 1, level_db: float = SILENCE_DB):
+    if level_db <= SILENCE_DB:
+        return np.zeros((frames, channels), dtype=np.float32)
+    noise = _rng.standard_normal((frames, channels), dtype=np.float32)
+    noise *= np.float32(10 ** (level_db / 20))
+    return noise
+
+
+def silence_message(marker: SilenceMarker) -> str:
+    return json.dumps(dict(type="silence", frames=marker.frames, level=marker.level_db))
+
+
+def parse_silence_message(message: str) -> Optional[SilenceMarker]:
+    try:
+        data = json.loads(message)
+    except ValueError:
+        return None
+    if not isinstance(data, dict) or data.get("type") != "silence":
+        return None
+    return SilenceMarker(int(data["frames"]), float(data.get("level", SILENCE_DB)))
+
+
+class DTXEncoder:
+    # Passes speech through and replaces silence with markers, each covering
+    # at most `marker_interval` seconds, from which receivers regenerate
+    # comfort noise. Pending silence is flushed before speech resumes.
+    def __init__(
+        self,
+        sampling_rate: int,
+        open_db: float = -40,
+        close_db: float = -50,
+        hangover_seconds: float = 0.3,
+        marker_interval: float = 0.2,
+    ):
+        self.vad = VoiceActivityDetector(
+            sampling_rate, open_db, close_db, hangover_seconds
+        )
+        self.marker_frames = max(1, int(marker_interval * sampling_rate))
+        self.pending = 0
+        self.suppressed_frames = 0
+
+    def process(self, audio: np.ndarray) -> List[Union[np.ndarray, SilenceMarker]]:
+        if self.vad.update(audio):
+            items: List[Union[np.ndarray, SilenceMarker]] = self.flush()
+            items.append(audio)
+            return items
+
+        self.pending += len(audio)
+        self.suppressed_frames += len(audio)
+        if self.pending >= self.marker_frames:
+            return self.flush()
+        return []
+
+    def flush(self) -> List[Union[np.ndarray, SilenceMarker]]:
+        if not self.pending:
+            return []
+        marker = SilenceMarker(self.pending, self.vad.noise_db)
+        self.pending = 0
+        return [marker]
+
+
+def annotate(audio: np.ndarray, vad: VoiceActivityDetector) -> np.ndarray:
+    speech = vad.update(audio)
+    if isinstance(audio, AudioFrame):
+        audio.speech = speech
+    return audio
+
+
+async def gate(
+    stream: AsyncIterable[np.ndarray],
+    vad: VoiceActivityDetector,
+    drop_silence: bool = False,
+) -> AsyncIterator[np.ndarray]:
+    async for audio in stream:
+        speech = vad.update(audio)
+        if not speech and drop_silence:
+            continue
+        if isinstance(audio, AudioFrame):
+            # Replaced rather than updated, the frame may be shared with other
+            # consumers.
+            audio = audio.replace(speech=speech)
+        yield audio
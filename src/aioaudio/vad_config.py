@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+
+
+class VADConfig(BaseModel):
+    open_db: float = -40
+    close_db: float = -50
+    hangover_seconds: float = 0.3
+    # How much silence a single marker may cover when used for DTX.
+    marker_interval: float = 0.2
@@ -1,41 +1,167 @@
 from abc import abstractmethod
 import asyncio
+from collections import deque
+import itertools
 import json
 import logging
-from typing import AsyncContextManager, AsyncIterator, Set, Union
+import time
+from typing import (
+    Any,
+    AsyncContextManager,
+    AsyncIterable,
+    AsyncIterator,
+    Deque,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
 import numpy as np
 from websockets.client import connect, WebSocketClientProtocol
+from websockets.exceptions import ConnectionClosed, WebSocketException
 from websockets.server import WebSocketServerProtocol, serve
 
 from . import AudioSource, AudioSink
-
-WebSocketProtocol = Union[WebSocketServerProtocol, WebSocketClientProtocol]
+from .channels import as_frames, remix
+from .codec import WireCodec, available_formats, load_codec, negotiate_format
+from .frame import AudioFrame, AudioFrameClock
+from .jitter import JitterBuffer
+from .jitter_config import JitterBufferConfig
+from .multiplex import (
+    MultiplexedStream,
+    WebsocketConnectionPool,
+    WebsocketMultiplexer,
+    default_connection_pool,
+)
+from .resample import Resampler
+from .ring import AudioRingBuffer
+from .vad import (
+    DTXEncoder,
+    SilenceMarker,
+    VoiceActivityDetector,
+    annotate,
+    comfort_noise,
+    parse_silence_message,
+    silence_message,
+)
+from .vad_config import VADConfig
+from .websocket_config import WebsocketReconnectConfig
+
+WebSocketProtocol = Union[
+    WebSocketServerProtocol, WebSocketClientProtocol, MultiplexedStream
+]
 
 logger = logging.getLogger(__name__)
 
 
+class WebsocketPeer(NamedTuple):
+    format: str
+    sampling_rate: int
+    channels: int = 1
+    dtx: bool = False
+
+
 class WebsocketBaseAudioMixin(AsyncContextManager):
+    handshake_timeout = 1.0
+    # Receive queue limits of multiplexed streams, sources use their own.
+    stream_queue_size = 0
+    stream_overflow_policy = "block"
+
     def __init__(
-        self, sampling_rate: int, host: str = "localhost", port: int = 8765, **kwargs
+        self,
+        sampling_rate: int,
+        host: str = "localhost",
+        port: int = 8765,
+        formats: Sequence[str] = ("f32",),
+        channels: int = 1,
+        vad: Optional[VADConfig] = None,
+        **kwargs,
     ):
         self.sampling_rate = sampling_rate
+        self.channels = channels
+        self.formats = available_formats(formats, sampling_rate)
+        # Only sinks pass `vad` here, to replace silence with markers for
+        # peers that understand them.
+        self.dtx = (
+            DTXEncoder(sampling_rate, **vad.model_dump()) if vad is not None else None
+        )
         self.kwargs = kwargs
 
-    async def _handle(self, websocket: WebSocketProtocol):
+    async def _handle(
+        self,
+        websocket: WebSocketProtocol,
+        peer: WebsocketPeer,
+        pending: Optional[bytes],
+    ):
         raise NotImplementedError()
 
-    async def _on_connection(self, websocket: WebSocketProtocol):
-        await websocket.send(
-            json.dumps(dict(sampling_rate=self.sampling_rate, channels=1))
+    def _hello(self, **extra) -> str:
+        return json.dumps(
+            dict(
+                sampling_rate=self.sampling_rate,
+                channels=self.channels,
+                formats=self.formats,
+                dtx=True,
+                **extra,
+            )
+        )
+
+    async def _receive_hello(
+        self, websocket: WebSocketProtocol
+    ) -> Tuple[Dict[str, Any], Optional[bytes]]:
+        try:
+            message = await asyncio.wait_for(websocket.recv(), self.handshake_timeout)
+        except asyncio.TimeoutError:
+            return {}, None
+
+        if isinstance(message, bytes):
+            return {}, message
+
+        try:
+            hello = json.loads(message)
+        except ValueError:
+            logger.warning(f"Received invalid handshake: {message}")
+            return {}, None
+        return hello, None
+
+    def _peer(self, hello: Dict[str, Any], format: str) -> WebsocketPeer:
+        return WebsocketPeer(
+            format=format,
+            sampling_rate=hello.get("sampling_rate", self.sampling_rate),
+            channels=hello.get("channels", 1),
+            dtx=bool(hello.get("dtx", False)),
         )
-        await self._handle(websocket)
+
+    async def _on_connection(self, websocket: WebSocketProtocol):
+        await websocket.send(self._hello(multiplex=True))
+        hello, pending = await self._receive_hello(websocket)
+        if hello.get("multiplex") and not isinstance(websocket, MultiplexedStream):
+            # Every logical stream then runs through this handshake itself.
+            await WebsocketMultiplexer(
+                websocket,
+                self._on_connection,
+                self.stream_queue_size,
+                self.stream_overflow_policy,
+            ).run()
+            return
+        format = negotiate_format(self.formats, hello.get("formats"))
+        await self._handle(websocket, self._peer(hello, format), pending)
 
 
 class WebsocketServerAudioMixin(WebsocketBaseAudioMixin):
     def __init__(
-        self, sampling_rate: int, host: str = "localhost", port: int = 8765, **kwargs
+        self,
+        sampling_rate: int,
+        host: str = "localhost",
+        port: int = 8765,
+        formats: Sequence[str] = ("f32",),
+        **kwargs,
     ):
-        super().__init__(sampling_rate, **kwargs)
+        super().__init__(sampling_rate, formats=formats, **kwargs)
         self.host = host
         self.port = port
 
@@ -52,39 +178,229 @@ class WebsocketServerAudioMixin(WebsocketBaseAudioMixin):
 
 
 class WebsocketClientAudioMixin(WebsocketBaseAudioMixin):
-    def __init__(self, sampling_rate: int, url: str = "ws://localhost:8765", **kwargs):
-        super().__init__(sampling_rate, **kwargs)
+    def __init__(
+        self,
+        sampling_rate: int,
+        url: str = "ws://localhost:8765",
+        formats: Sequence[str] = ("f32",),
+        reconnect: Optional[WebsocketReconnectConfig] = None,
+        multiplex: bool = False,
+        **kwargs,
+    ):
+        super().__init__(sampling_rate, formats=formats, **kwargs)
         self.url = url
+        self.reconnect = reconnect
+        # Logical streams of one pooled connection per URL instead of a
+        # connection each.
+        self.connection_pool: Optional[WebsocketConnectionPool] = (
+            default_connection_pool if multiplex else None
+        )
+        self.reconnects = 0
+        self.closing = False
+        self.connected = asyncio.Event()
+
+    async def _connect(self):
+        if self.connection_pool is not None:
+            connection = await self.connection_pool.open(
+                self.url,
+                self.stream_queue_size,
+                self.stream_overflow_policy,
+                **self.kwargs,
+            )
+        else:
+            connection = await connect(self.url, **self.kwargs)
+        try:
+            await connection.send(self._hello())
+            hello, pending = await self._receive_hello(connection)
+        except BaseException:
+            await connection.close()
+            raise
+        self.connection = connection
+        self.format = negotiate_format(hello.get("formats"), self.formats)
+        self.peer = self._peer(hello, self.format)
+        self.codec = load_codec(self.format, self.sampling_rate, self.channels)
+        self.handler = asyncio.create_task(
+            self._handle(self.connection, self.peer, pending)
+        )
+
+    async def _on_connected(self):
+        pass
 
     async def __aenter__(self):
-        self.connection = await connect(self.url, **self.kwargs)
-        await self.connection.send(
-            json.dumps(dict(sampling_rate=self.sampling_rate, channels=1))
-        )
-        await self._handle(self.connection)
+        self.closing = False
+        await self._connect()
+        await self._on_connected()
+        self.connected.set()
+        if self.reconnect is not None:
+            self.supervisor = asyncio.create_task(self._supervise(self.reconnect))
         return self
 
+    async def _supervise(self, reconnect: WebsocketReconnectConfig):
+        backoff = reconnect.initial_backoff
+        while True:
+            connected_at = time.monotonic()
+            await self.connection.wait_closed()
+            self.connected.clear()
+            await asyncio.gather(self.handler, return_exceptions=True)
+            if self.closing:
+                return
+
+            if time.monotonic() - connected_at >= reconnect.stable_seconds:
+                backoff = reconnect.initial_backoff
+            while not self.closing:
+                logger.warning(
+                    f"Lost connection to {self.url}, reconnecting in {backoff:.2f}s"
+                )
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, reconnect.max_backoff)
+                try:
+                    await self._connect()
+                    await self._on_connected()
+                    break
+                except (OSError, asyncio.TimeoutError, WebSocketException) as e:
+                    logger.warning(f"Failed to reconnect to {self.url}: {e}")
+            if self.closing:
+                return
+
+            self.reconnects += 1
+            self.connected.set()
+
     async def __aexit__(self, *args, **kwargs):
+        self.closing = True
+        if self.reconnect is not None:
+            self.supervisor.cancel()
+            await asyncio.gather(self.supervisor, return_exceptions=True)
         await self.connection.close()
+        self.handler.cancel()
 
 
 class WebsocketAudioSourceMixin(AudioSource):
-    def __init__(self, sampling_rate: int, **kwargs):
+    def __init__(
+        self,
+        sampling_rate: int,
+        jitter_buffer: Optional[JitterBufferConfig] = None,
+        max_queue_size: int = 0,
+        overflow_policy: str = "block",
+        channels: int = 1,
+        vad: Optional[VADConfig] = None,
+        **kwargs,
+    ):
+        if overflow_policy not in ("block", "drop-oldest", "coalesce"):
+            raise ValueError(f"Unknown overflow policy: {overflow_policy}")
         self.sampling_rate = sampling_rate
+        self.channels = channels
         self.kwargs = kwargs
-        self.audio_queue = asyncio.Queue()
+        self.audio_queue: asyncio.Queue[np.ndarray] = asyncio.Queue(max_queue_size)
+        self.overflow_policy = overflow_policy
+        self.stream_queue_size = max_queue_size
+        self.stream_overflow_policy = overflow_policy
+        self.dropped_frames = 0
+        self.coalesced_frames = 0
+        self.jitter_buffer = (
+            JitterBuffer(sampling_rate, channels, **jitter_buffer.model_dump())
+            if jitter_buffer is not None
+            else None
+        )
+        self.vad = (
+            VoiceActivityDetector(
+                sampling_rate, **vad.model_dump(exclude={"marker_interval"})
+            )
+            if vad is not None
+            else None
+        )
+        self.sequence_number = 0
+        self.timestamp = 0
+        self.clock = AudioFrameClock(sampling_rate, channels)
+
+    async def _handle(
+        self,
+        websocket: WebSocketProtocol,
+        peer: WebsocketPeer,
+        pending: Optional[bytes],
+    ):
+        codec = load_codec(peer.format, peer.sampling_rate, peer.channels)
+        resampler = (
+            Resampler(peer.sampling_rate, self.sampling_rate, self.channels)
+            if peer.sampling_rate != self.sampling_rate
+            else None
+        )
+        if pending is not None:
+            await self._receive(self._decode(codec, peer, pending), resampler)
 
-    async def _handle(self, websocket: WebSocketProtocol):
         async for message in websocket:
             if not isinstance(message, bytes):
-                logger.warn(f"Received non-bytes message: {message}")
+                marker = parse_silence_message(message)
+                if marker is None:
+                    logger.warn(f"Received non-bytes message: {message}")
+                    continue
+                await self._receive(
+                    comfort_noise(marker.frames, self.channels, marker.level_db),
+                    resampler,
+                )
                 continue
 
-            await self.audio_queue.put(np.frombuffer(message, dtype=np.float32))
+            await self._receive(self._decode(codec, peer, message), resampler)
+
+    def _decode(self, codec: WireCodec, peer: WebsocketPeer, data: bytes) -> np.ndarray:
+        return remix(as_frames(codec.decode(data), peer.channels), self.channels)
+
+    async def _receive(self, audio: np.ndarray, resampler: Optional[Resampler] = None):
+        capture_time = time.monotonic()
+        if resampler is not None:
+            audio = resampler.process(audio)
+        if len(audio) == 0:
+            return
+        frame = self.clock.stamp(audio, capture_time)
+
+        if self.jitter_buffer is not None:
+            self.jitter_buffer.put(self.sequence_number, self.timestamp, frame)
+            self.sequence_number = (self.sequence_number + 1) & 0xFFFF
+            self.timestamp = (self.timestamp + len(audio)) & 0xFFFFFFFF
+        else:
+            await self._enqueue(frame)
+
+    @property
+    def queue_depth(self) -> int:
+        return self.audio_queue.qsize()
+
+    @property
+    def speech_active(self) -> Optional[bool]:
+        return self.vad.active if self.vad is not None else None
+
+    def _annotate(self, audio: AudioFrame) -> AudioFrame:
+        return annotate(audio, self.vad) if self.vad is not None else audio
+
+    async def _enqueue(self, audio: AudioFrame):
+        if not self.audio_queue.full() or self.overflow_policy == "block":
+            await self.audio_queue.put(audio)
+            return
+
+        match self.overflow_policy:
+            case "drop-oldest":
+                self.audio_queue.get_nowait()
+                self.audio_queue.task_done()
+                self.dropped_frames += 1
+            case "coalesce":
+                queued = [
+                    self.audio_queue.get_nowait()
+                    for _ in range(self.audio_queue.qsize())
+                ]
+                for _ in queued:
+                    self.audio_queue.task_done()
+                self.coalesced_frames += len(queued)
+                if queued:
+                    audio = queued[0].replace(data=np.concatenate([*queued, audio]))
+
+        self.audio_queue.put_nowait(audio)
+
+    async def __aiter__(self) -> AsyncIterator[AudioFrame]:
+        if self.jitter_buffer is not None:
+            async for audio in self.jitter_buffer:
+                yield self._annotate(audio)
+            return
 
-    async def __aiter__(self) -> AsyncIterator[np.ndarray]:
         while self.is_active():
-            yield await self.audio_queue.get()
+            yield self._annotate(await self.audio_queue.get())
             self.audio_queue.task_done()
 
     @abstractmethod
@@ -94,53 +410,530 @@ class WebsocketAudioSourceMixin(AudioSource):
 
 class WebsocketServerAudioSource(WebsocketServerAudioMixin, WebsocketAudioSourceMixin):
     def __init__(
-        self, sampling_rate: int, host: str = "localhost", port: int = 8765, **kwargs
+        self,
+        sampling_rate: int,
+        host: str = "localhost",
+        port: int = 8765,
+        formats: Sequence[str] = ("f32",),
+        jitter_buffer: Optional[JitterBufferConfig] = None,
+        max_queue_size: int = 0,
+        overflow_policy: str = "block",
+        channels: int = 1,
+        vad: Optional[VADConfig] = None,
+        **kwargs,
     ):
-        super().__init__(sampling_rate, host, port, **kwargs)
-        WebsocketAudioSourceMixin.__init__(self, sampling_rate, **kwargs)
+        super().__init__(
+            sampling_rate, host, port, formats=formats, channels=channels, **kwargs
+        )
+        WebsocketAudioSourceMixin.__init__(
+            self,
+            sampling_rate,
+            jitter_buffer=jitter_buffer,
+            max_queue_size=max_queue_size,
+            overflow_policy=overflow_policy,
+            channels=channels,
+            vad=vad,
+            **kwargs,
+        )
+
+    def _handle(
+        self,
+        websocket: WebSocketProtocol,
+        peer: WebsocketPeer,
+        pending: Optional[bytes],
+    ):
+        return WebsocketAudioSourceMixin._handle(self, websocket, peer, pending)
+
+    def is_active(self) -> bool:
+        return self.server.is_serving()
+
+
+class WebsocketConnectionAudioSource(WebsocketAudioSourceMixin):
+    def __init__(
+        self,
+        connection_id: int,
+        websocket: WebSocketServerProtocol,
+        sampling_rate: int,
+        **kwargs,
+    ):
+        super().__init__(sampling_rate, **kwargs)
+        self.connection_id = connection_id
+        self.websocket = websocket
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_, **__):
+        await self.websocket.close()
+
+    async def close(self):
+        if self.jitter_buffer is not None:
+            self.jitter_buffer.close()
+            return
+        # The consumer may have stopped reading, so a full queue makes room
+        # for the end marker instead of waiting.
+        if self.audio_queue.full():
+            self.audio_queue.get_nowait()
+            self.audio_queue.task_done()
+            self.dropped_frames += 1
+        self.audio_queue.put_nowait(None)
 
-    def _handle(self, websocket: WebSocketProtocol):
-        return WebsocketAudioSourceMixin._handle(self, websocket)
+    async def __aiter__(self) -> AsyncIterator[AudioFrame]:
+        if self.jitter_buffer is not None:
+            async for audio in self.jitter_buffer:
+                yield self._annotate(audio)
+            return
+
+        while True:
+            audio = await self.audio_queue.get()
+            self.audio_queue.task_done()
+            if audio is None:
+                return
+            yield self._annotate(audio)
+
+    def is_active(self) -> bool:
+        return not self.websocket.closed
+
+
+class WebsocketServerMultiAudioSource(
+    WebsocketServerAudioMixin,
+    AsyncIterable[Tuple[int, WebsocketConnectionAudioSource]],
+):
+    def __init__(
+        self,
+        sampling_rate: int,
+        host: str = "localhost",
+        port: int = 8765,
+        formats: Sequence[str] = ("f32",),
+        jitter_buffer: Optional[JitterBufferConfig] = None,
+        max_queue_size: int = 0,
+        overflow_policy: str = "block",
+        channels: int = 1,
+        vad: Optional[VADConfig] = None,
+        **kwargs,
+    ):
+        super().__init__(
+            sampling_rate, host, port, formats=formats, channels=channels, **kwargs
+        )
+        self.stream_kwargs = dict(
+            jitter_buffer=jitter_buffer,
+            max_queue_size=max_queue_size,
+            overflow_policy=overflow_policy,
+            channels=channels,
+            vad=vad,
+        )
+        self.stream_queue_size = max_queue_size
+        self.stream_overflow_policy = overflow_policy
+        self.streams: Dict[int, WebsocketConnectionAudioSource] = {}
+        self.new_streams: asyncio.Queue[WebsocketConnectionAudioSource] = (
+            asyncio.Queue()
+        )
+        self.connection_ids = itertools.count()
+        self.consuming = False
+
+    async def _handle(
+        self,
+        websocket: WebSocketServerProtocol,
+        peer: WebsocketPeer,
+        pending: Optional[bytes],
+    ):
+        stream = WebsocketConnectionAudioSource(
+            next(self.connection_ids),
+            websocket,
+            self.sampling_rate,
+            **self.stream_kwargs,
+        )
+        self.streams[stream.connection_id] = stream
+        await self.new_streams.put(stream)
+        try:
+            await stream._handle(websocket, peer, pending)
+        finally:
+            del self.streams[stream.connection_id]
+            await stream.close()
+
+    def _claim(self):
+        # New streams and their audio are handed to one consumer, a second one
+        # would silently split them.
+        if self.consuming:
+            raise RuntimeError(
+                "Only one of iteration, frames() and batches() can consume "
+                "a WebsocketServerMultiAudioSource at a time"
+            )
+        self.consuming = True
+
+    async def _new_streams(
+        self,
+    ) -> AsyncIterator[Tuple[int, WebsocketConnectionAudioSource]]:
+        while self.is_active():
+            stream = await self.new_streams.get()
+            yield stream.connection_id, stream
+
+    async def __aiter__(
+        self,
+    ) -> AsyncIterator[Tuple[int, WebsocketConnectionAudioSource]]:
+        self._claim()
+        try:
+            async for connection_id, stream in self._new_streams():
+                yield connection_id, stream
+        finally:
+            self.consuming = False
+
+    async def _accept(self, forward, tasks: Set[asyncio.Task]):
+        seen: Set[int] = set()
+        for stream in list(self.streams.values()):
+            seen.add(stream.connection_id)
+            tasks.add(asyncio.create_task(forward(stream)))
+        async for connection_id, stream in self._new_streams():
+            if connection_id not in seen:
+                tasks.add(asyncio.create_task(forward(stream)))
+
+    async def frames(self) -> AsyncIterator[Tuple[int, np.ndarray]]:
+        self._claim()
+        tagged: asyncio.Queue[Tuple[int, np.ndarray]] = asyncio.Queue()
+
+        async def forward(stream: WebsocketConnectionAudioSource):
+            async for audio in stream:
+                await tagged.put((stream.connection_id, audio))
+
+        tasks: Set[asyncio.Task] = set()
+        acceptor = asyncio.create_task(self._accept(forward, tasks))
+        try:
+            while True:
+                yield await tagged.get()
+        finally:
+            acceptor.cancel()
+            for task in tasks:
+                task.cancel()
+            self.consuming = False
+
+    async def batches(
+        self, frames: int, hop: Optional[int] = None
+    ) -> AsyncIterator[Tuple[List[int], np.ndarray]]:
+        # The stacked array is reused and only valid until the next iteration.
+        self._claim()
+        hop = hop or frames
+        rings: Dict[int, AudioRingBuffer] = {}
+        batch = np.zeros((0, frames, self.channels), dtype=np.float32)
+
+        async def forward(stream: WebsocketConnectionAudioSource):
+            ring = rings[stream.connection_id] = AudioRingBuffer(
+                2 * max(frames, hop), self.channels
+            )
+            try:
+                async for audio in stream:
+                    ring.write(audio)
+            finally:
+                rings.pop(stream.connection_id, None)
+
+        tasks: Set[asyncio.Task] = set()
+        acceptor = asyncio.create_task(self._accept(forward, tasks))
+        interval = hop / self.sampling_rate
+        deadline = time.monotonic()
+        try:
+            while self.is_active():
+                deadline += interval
+                await asyncio.sleep(max(0, deadline - time.monotonic()))
+
+                ready = [
+                    (connection_id, ring)
+                    for connection_id, ring in rings.items()
+                    if len(ring) >= frames
+                ]
+                if not ready:
+                    continue
+
+                if len(batch) < len(ready):
+                    batch = np.zeros(
+                        (len(ready), frames, self.channels), dtype=np.float32
+                    )
+                for i, (_, ring) in enumerate(ready):
+                    batch[i] = ring.latest(frames)
+                    ring.consume(len(ring) - frames + hop)
+
+                yield [connection_id for connection_id, _ in ready], batch[: len(ready)]
+        finally:
+            acceptor.cancel()
+            for task in tasks:
+                task.cancel()
+            self.consuming = False
 
     def is_active(self) -> bool:
         return self.server.is_serving()
 
 
+class WebsocketBroadcastClient:
+    def __init__(
+        self,
+        websocket: WebSocketServerProtocol,
+        format: str = "f32",
+        max_queue_size: int = 32,
+        slow_client_policy: str = "drop-oldest",
+        dtx: bool = False,
+    ):
+        self.websocket = websocket
+        self.format = format
+        self.dtx = dtx
+        self.max_queue_size = max_queue_size
+        self.slow_client_policy = slow_client_policy
+        self.queue: Deque[Tuple[float, Union[bytes, str]]] = deque()
+        self.ready = asyncio.Event()
+        self.closing: Optional[asyncio.Task] = None
+        self.sent = 0
+        self.dropped = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+
+    @property
+    def lag(self) -> float:
+        return time.monotonic() - self.queue[0][0] if self.queue else 0.0
+
+    def put(self, data: Union[bytes, str]):
+        if self.closing is not None:
+            return
+
+        if len(self.queue) >= self.max_queue_size:
+            match self.slow_client_policy:
+                case "drop-oldest":
+                    self.queue.popleft()
+                    self.dropped += 1
+                case "skip-to-live":
+                    self.dropped += len(self.queue)
+                    self.queue.clear()
+                case "disconnect":
+                    logger.info(
+                        f"Disconnecting slow client {self.websocket.remote_address}"
+                    )
+                    self.dropped += len(self.queue) + 1
+                    self.queue.clear()
+                    self.closing = asyncio.create_task(
+                        self.websocket.close(1008, "Client too slow")
+                    )
+                    return
+
+        self.queue.append((time.monotonic(), data))
+        self.ready.set()
+
+    async def run(self):
+        try:
+            while True:
+                while not self.queue:
+                    self.ready.clear()
+                    await self.ready.wait()
+
+                queued_at, data = self.queue.popleft()
+                await self.websocket.send(data)
+                self.sent += 1
+                self.last_lag = time.monotonic() - queued_at
+                self.max_lag = max(self.max_lag, self.last_lag)
+        except ConnectionClosed:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(
+            remote_address=self.websocket.remote_address,
+            format=self.format,
+            queued=len(self.queue),
+            lag=self.lag,
+            last_lag=self.last_lag,
+            max_lag=self.max_lag,
+            sent=self.sent,
+            dropped=self.dropped,
+        )
+
+
 class WebsocketServerAudioSink(WebsocketServerAudioMixin, AudioSink):
     def __init__(
-        self, sampling_rate: int, host: str = "localhost", port: int = 8765, **kwargs
+        self,
+        sampling_rate: int,
+        host: str = "localhost",
+        port: int = 8765,
+        client_queue_size: int = 32,
+        slow_client_policy: str = "drop-oldest",
+        **kwargs,
     ):
+        if slow_client_policy not in ("drop-oldest", "skip-to-live", "disconnect"):
+            raise ValueError(f"Unknown slow client policy: {slow_client_policy}")
         super().__init__(sampling_rate, host, port, **kwargs)
-        self.websockets: Set[WebSocketServerProtocol] = set()
-
-    async def _handle(self, websocket: WebSocketServerProtocol):
-        self.websockets.add(websocket)
+        self.client_queue_size = client_queue_size
+        self.slow_client_policy = slow_client_policy
+        self.clients: Dict[WebSocketServerProtocol, WebsocketBroadcastClient] = {}
+        self.codecs: Dict[Tuple[str, bool], WireCodec] = {}
+
+    @property
+    def websockets(self) -> Set[WebSocketServerProtocol]:
+        return set(self.clients)
+
+    async def _handle(
+        self,
+        websocket: WebSocketServerProtocol,
+        peer: WebsocketPeer,
+        pending: Optional[bytes],
+    ):
+        client = WebsocketBroadcastClient(
+            websocket,
+            peer.format,
+            self.client_queue_size,
+            self.slow_client_policy,
+            dtx=peer.dtx,
+        )
+        self.clients[websocket] = client
+        sender = asyncio.create_task(client.run())
         try:
             await websocket.wait_closed()
         finally:
-            self.websockets.remove(websocket)
+            sender.cancel()
+            del self.clients[websocket]
 
     async def write(self, audio: np.ndarray):
-        await asyncio.gather(
-            *[websocket.send(audio.tobytes()) for websocket in self.websockets]
-        )
+        # DTX state advances even without clients so it is current when one
+        # connects.
+        items = self.dtx.process(audio) if self.dtx is not None else None
+        if not self.clients:
+            return
+
+        encoded: Dict[Tuple[str, bool], List[Union[bytes, str]]] = {}
+        for client in self.clients.values():
+            dtx = items is not None and client.dtx
+            key = (client.format, dtx)
+            messages = encoded.get(key)
+            if messages is None:
+                # Stateful codecs must not see both the gated and ungated stream.
+                codec = self.codecs.get(key)
+                if codec is None:
+                    codec = self.codecs[key] = load_codec(
+                        client.format, self.sampling_rate, self.channels
+                    )
+                messages = encoded[key] = [
+                    _message(codec, item) for item in (items if dtx else [audio])
+                ]
+            for message in messages:
+                if message:
+                    client.put(message)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [client.stats() for client in self.clients.values()]
 
 
 class WebsocketClientAudioSource(WebsocketClientAudioMixin, WebsocketAudioSourceMixin):
-    def __init__(self, sampling_rate: int, url: str = "ws://localhost:8765", **kwargs):
-        super().__init__(sampling_rate, url, **kwargs)
-        WebsocketAudioSourceMixin.__init__(self, sampling_rate, **kwargs)
+    def __init__(
+        self,
+        sampling_rate: int,
+        url: str = "ws://localhost:8765",
+        formats: Sequence[str] = ("f32",),
+        jitter_buffer: Optional[JitterBufferConfig] = None,
+        max_queue_size: int = 0,
+        overflow_policy: str = "block",
+        channels: int = 1,
+        vad: Optional[VADConfig] = None,
+        reconnect: Optional[WebsocketReconnectConfig] = None,
+        multiplex: bool = False,
+        **kwargs,
+    ):
+        super().__init__(
+            sampling_rate,
+            url,
+            formats=formats,
+            channels=channels,
+            reconnect=reconnect,
+            multiplex=multiplex,
+            **kwargs,
+        )
+        WebsocketAudioSourceMixin.__init__(
+            self,
+            sampling_rate,
+            jitter_buffer=jitter_buffer,
+            max_queue_size=max_queue_size,
+            overflow_policy=overflow_policy,
+            channels=channels,
+            vad=vad,
+            **kwargs,
+        )
 
-    def _handle(self, websocket: WebSocketProtocol):
-        return WebsocketAudioSourceMixin._handle(self, websocket)
+    def _handle(
+        self,
+        websocket: WebSocketProtocol,
+        peer: WebsocketPeer,
+        pending: Optional[bytes],
+    ):
+        return WebsocketAudioSourceMixin._handle(self, websocket, peer, pending)
 
     def is_active(self) -> bool:
+        if self.reconnect is not None:
+            return not self.closing
         return not self.connection.closed
 
 
 class WebsocketClientAudioSink(WebsocketClientAudioMixin, AudioSink):
+    # With `reconnect`, writes never fail on a lost connection: audio is kept
+    # up to `replay_milliseconds` and sent once the connection is back.
     def __init__(self, sampling_rate: int, url: str = "ws://localhost:8765", **kwargs):
         super().__init__(sampling_rate, url, **kwargs)
+        self.replay: Deque[Union[np.ndarray, SilenceMarker]] = deque()
+        self.replay_frames = 0
+        self.max_replay_frames = (
+            int(self.reconnect.replay_milliseconds * sampling_rate / 1000)
+            if self.reconnect is not None
+            else 0
+        )
+        self.dropped_frames = 0
+
+    async def _handle(
+        self,
+        websocket: WebSocketProtocol,
+        peer: WebsocketPeer,
+        pending: Optional[bytes],
+    ):
+        await websocket.wait_closed()
+
+    async def _send(self, item: Union[np.ndarray, SilenceMarker]):
+        message = _message(self.codec, item)
+        if message:
+            await self.connection.send(message)
+
+    def _buffer(self, item: Union[np.ndarray, SilenceMarker]):
+        # Callers such as PacedAudioSink reuse their buffers.
+        if isinstance(item, np.ndarray):
+            item = item.copy()
+        self.replay.append(item)
+        self.replay_frames += _frames(item)
+        while self.replay_frames > self.max_replay_frames:
+            self.replay_frames -= _frames(self.replay[0])
+            self.dropped_frames += _frames(self.replay.popleft())
+
+    async def _on_connected(self):
+        # Runs before writes resume, so replayed audio keeps its order.
+        while self.replay:
+            await self._send(self.replay[0])
+            self.replay_frames -= _frames(self.replay.popleft())
 
     async def write(self, audio: np.ndarray):
-        await self.connection.send(audio.tobytes())
+        items = (
+            self.dtx.process(audio)
+            if self.dtx is not None and self.peer.dtx
+            else [audio]
+        )
+        if self.reconnect is None:
+            for item in items:
+                await self._send(item)
+            return
+
+        for item in items:
+            if self.connected.is_set():
+                try:
+                    await self._send(item)
+                    continue
+                except ConnectionClosed:
+                    self.connected.clear()
+            self._buffer(item)
+
+
+def _frames(item: Union[np.ndarray, SilenceMarker]) -> int:
+    return item.frames if isinstance(item, SilenceMarker) else len(item)
+
+
+def _message(
+    codec: WireCodec, item: Union[np.ndarray, SilenceMarker]
+) -> Union[bytes, str]:
+    if isinstance(item, SilenceMarker):
+        return silence_message(item)
+    return codec.encode(item)
@@ -1,14 +1,50 @@
-from typing import Literal
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel
 
 from .base_config import AudioSinkBaseModel, AudioSourceBaseModel
+from .jitter_config import JitterBufferConfig
+from .vad_config import VADConfig
+
+WireFormat = Literal["f32", "s16", "mulaw", "alaw", "opus"]
+
+
+class WebsocketReconnectConfig(BaseModel):
+    initial_backoff: float = 0.1
+    max_backoff: float = 10.0
+    # Connections that lasted this long reconnect with the initial backoff.
+    stable_seconds: float = 5.0
+    # Audio written while disconnected that is kept and sent on reconnect.
+    replay_milliseconds: float = 1000
 
 
 class WebsocketServerAudioConfig(AudioSourceBaseModel, AudioSinkBaseModel):
     mode: Literal["websocket-server"] = "websocket-server"
     host: str = "localhost"
     port: int = 8765
+    formats: List[WireFormat] = ["f32"]
+    channels: int = 1
+    jitter_buffer: Optional[JitterBufferConfig] = None
+    max_queue_size: int = 0
+    overflow_policy: Literal["block", "drop-oldest", "coalesce"] = "block"
+    # Marks speech on received frames; sinks also replace silence with markers.
+    vad: Optional[VADConfig] = None
+    client_queue_size: int = 32
+    slow_client_policy: Literal["drop-oldest", "skip-to-live", "disconnect"] = (
+        "drop-oldest"
+    )
 
 
 class WebsocketClientAuduioConfig(AudioSourceBaseModel, AudioSinkBaseModel):
     mode: Literal["websocket-client"] = "websocket-client"
     url: str = "ws://localhost:8765"
+    formats: List[WireFormat] = ["f32"]
+    channels: int = 1
+    jitter_buffer: Optional[JitterBufferConfig] = None
+    max_queue_size: int = 0
+    overflow_policy: Literal["block", "drop-oldest", "coalesce"] = "block"
+    # Marks speech on received frames; sinks also replace silence with markers.
+    vad: Optional[VADConfig] = None
+    reconnect: Optional[WebsocketReconnectConfig] = None
+    # Share one connection per URL with other multiplexed streams.
+    multiplex: bool = False
@@ -0,0 +1,51 @@
+import asyncio
+
+import numpy as np
+
+from aioaudio.file import FileAudioSink, FileAudioSource
+from aioaudio.mixer import AudioMixer, soft_clip
+
+SAMPLING_RATE = 8000
+
+
+async def _write_wav(path, value: float, frames: int):
+    async with FileAudioSink(SAMPLING_RATE, path=str(path), format="wav") as sink:
+        await sink.write(np.full(frames, value, dtype=np.float32))
+
+
+async def _mix(paths, ring_buffer_frames: int):
+    sources = [
+        FileAudioSource(SAMPLING_RATE, path=str(path), pacing="fast") for path in paths
+    ]
+    mixer = AudioMixer(
+        SAMPLING_RATE,
+        sources,
+        frames_per_buffer=160,
+        ring_buffer_frames=ring_buffer_frames,
+        clip_threshold=None,
+    )
+    async with mixer:
+        mixed = np.concatenate([np.asarray(frame) async for frame in mixer])
+    return mixed, mixer.stats()
+
+
+def test_mixer_keeps_every_frame_of_inputs_faster_than_real_time(tmp_path):
+    # Both inputs are far longer than the ring buffer and are read as fast as
+    # possible, constant levels make any lost frame show up in the sum.
+    a, b = tmp_path / "a.wav", tmp_path / "b.wav"
+    asyncio.run(_write_wav(a, 0.25, SAMPLING_RATE))
+    asyncio.run(_write_wav(b, 0.5, SAMPLING_RATE // 2))
+
+    mixed, stats = asyncio.run(_mix([a, b], ring_buffer_frames=1600))
+
+    assert [input["overflowed"] for input in stats] == [0, 0]
+    np.testing.assert_allclose(
+        mixed.sum(), 0.25 * SAMPLING_RATE + 0.5 * SAMPLING_RATE // 2, rtol=1e-4
+    )
+
+
+def test_soft_clip_threshold_one_is_hard_clip():
+    audio = np.array([-2.0, -0.5, 0.0, 0.9, 1.5], dtype=np.float32)
+    clipped = soft_clip(audio, 1.0)
+    assert np.all(np.isfinite(clipped))
+    np.testing.assert_array_equal(clipped, np.clip(audio, -1, 1))